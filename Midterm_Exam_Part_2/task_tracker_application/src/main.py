@@ -1,4 +1,5 @@
 import flet as ft
+from update_scheduler import UpdateScheduler
 
 def main(page: ft.Page):
     page.title = "Regalado Task Tracker"
@@ -7,6 +8,9 @@ def main(page: ft.Page):
     page.padding = 20
     page.theme_mode = ft.ThemeMode.LIGHT
 
+    # Coalesces the updates each handler requests into one per frame
+    updates = UpdateScheduler(page)
+
     tasks = []
     task_list = ft.Column(spacing=5, scroll=ft.ScrollMode.AUTO)
 
@@ -19,7 +23,7 @@ def main(page: ft.Page):
         else:
             progress_text.value = f"{completed} of {total} tasks completed"
             progress_bar.value = completed / total
-        page.update()
+        updates.mark_dirty()
 
     def toggle_task(e):
         checkbox = e.control
@@ -31,7 +35,7 @@ def main(page: ft.Page):
             task_container.bgcolor = ft.Colors.YELLOW_100
             task_container.content.style = ft.TextStyle(decoration=None)
         update_progress()
-        page.update()
+        updates.mark_dirty()
 
     def confirm_delete(e):
         task_row = e.control.data
@@ -47,14 +51,14 @@ def main(page: ft.Page):
         )
         page.dialog = dlg
         dlg.open = True
-        page.update()
+        updates.mark_dirty()
 
     def delete_task(task_row):
         task_list.controls.remove(task_row)
         tasks[:] = [t for t in tasks if t["row"] != task_row]
         page.dialog.open = False
         update_progress()
-        page.update()
+        updates.mark_dirty()
 
     def add_task(e):
         if task_input.value.strip() == "":
@@ -104,7 +108,7 @@ def main(page: ft.Page):
 
         task_input.value = ""
         update_progress()
-        page.update()
+        updates.mark_dirty()
 
     task_input = ft.TextField(
         hint_text="What needs to be done?",
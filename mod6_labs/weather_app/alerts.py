@@ -0,0 +1,547 @@
+# alerts.py
+"""Rule-table driven weather alert evaluation.
+
+Alerts are described declaratively in ``ALERT_RULES`` (which fields to
+check, the thresholds in each temperature unit, the message template and
+the recommendations) and compiled once into predicates at import time.
+``analyze_weather()`` evaluates one payload; ``analyze_weather_batch()``
+evaluates many at once using NumPy column arrays when NumPy is installed
+(falling back to the scalar path otherwise) and returns the same alerts
+as calling ``analyze_weather()`` on each payload. NumPy is imported on
+first batch use so it does not slow down application start.
+
+``diff_alerts()`` compares two alert lists and ``AlertTracker`` keeps the
+last alerts per city, so a refresh only has to act on what changed.
+"""
+
+import importlib
+import operator
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+np = None
+
+
+# Threshold for a unit in which a check never applies
+NEVER = None
+# Default Fahrenheit threshold: the same as the Celsius one (non-temperatures)
+SAME = "same"
+
+
+class Check(NamedTuple):
+    """One condition of a rule.
+
+    The check passes if any of ``fields`` compares true against the
+    threshold. ``value`` is used in Celsius mode and ``value_f`` in
+    Fahrenheit mode (the same as ``value`` unless given; ``NEVER``
+    disables the check in that unit). ``between`` takes a (low, high)
+    pair and is inclusive.
+    """
+    fields: Tuple[str, ...]
+    op: str
+    value: Any
+    value_f: Any = SAME
+
+
+class AlertRule(NamedTuple):
+    """A declarative alert: raised when every check passes."""
+    type: str
+    severity: str
+    checks: Tuple[Check, ...]
+    template: str
+    recommendations: Tuple[str, ...]
+
+
+class AdviceRule(NamedTuple):
+    """General advice given when no alert is raised."""
+    checks: Tuple[Check, ...]
+    recommendations: Tuple[str, ...]
+
+
+ALERT_RULES = (
+    AlertRule(
+        'extreme_heat', 'high',
+        (Check(('temp', 'feels_like'), '>=', 35, 95),),
+        "Temperature is {temp:.0f}°{unit}. Heat index may be dangerous.",
+        (
+            "Stay indoors during peak heat hours",
+            "Drink plenty of water",
+            "Avoid strenuous outdoor activities",
+            "Wear light, breathable clothing",
+            "Use sunscreen (SPF 30+)",
+        ),
+    ),
+    AlertRule(
+        'extreme_cold', 'high',
+        (Check(('temp',), '<=', 0, 32),),
+        "Temperature is {temp:.0f}°{unit}. Risk of hypothermia and frostbite.",
+        (
+            "Bundle up in layers",
+            "Limit time outdoors",
+            "Protect exposed skin",
+            "Watch for signs of frostbite",
+            "Keep your home heated",
+        ),
+    ),
+    AlertRule(
+        'high_wind', 'medium',
+        (Check(('wind_speed',), '>', 15),),  # m/s (~34 mph)
+        "High winds at {wind_speed:.1f} m/s. Potential for damage.",
+        (
+            "Secure loose objects outdoors",
+            "Avoid parking under trees",
+            "Drive carefully, especially high-profile vehicles",
+            "Stay away from coastlines",
+        ),
+    ),
+    AlertRule(
+        'storm', 'high',
+        (Check(('condition',), '==', 'thunderstorm'),),
+        "Thunderstorm conditions detected. Lightning and severe weather possible.",
+        (
+            "Stay indoors and away from windows",
+            "Unplug electronic devices",
+            "Avoid using corded phones",
+            "Do not take a bath or shower",
+            "Stay out of water and off boats",
+        ),
+    ),
+    AlertRule(
+        'heavy_rain', 'medium',
+        (Check(('condition',), '==', 'rain'), Check(('heavy',), '==', True)),
+        "Heavy rainfall expected. Potential for flooding.",
+        (
+            "Avoid flooded areas",
+            "Drive carefully with headlights on",
+            "Stay informed about flash flood warnings",
+            "Keep emergency supplies handy",
+        ),
+    ),
+    AlertRule(
+        'snow', 'medium',
+        (Check(('condition',), '==', 'snow'),),
+        "Snow conditions present. Travel may be hazardous.",
+        (
+            "Drive slowly and carefully",
+            "Keep winter emergency kit in car",
+            "Clear walkways to prevent slips",
+            "Dress warmly in layers",
+            "Check on elderly neighbors",
+        ),
+    ),
+    AlertRule(
+        'high_humidity', 'low',
+        (Check(('humidity',), '>', 80),),  # percent
+        "Humidity at {humidity}%. May feel uncomfortable.",
+        (
+            "Use dehumidifier indoors",
+            "Stay in air-conditioned spaces",
+            "Drink water regularly",
+            "Take cool showers",
+            "Avoid heavy exercise outdoors",
+        ),
+    ),
+    AlertRule(
+        'poor_visibility', 'medium',
+        (Check(('visibility',), '<', 1),),  # km
+        "Visibility reduced to {visibility:.1f} km. Drive with caution.",
+        (
+            "Use fog lights when driving",
+            "Reduce speed significantly",
+            "Increase following distance",
+            "Avoid unnecessary travel",
+            "Stay alert for other vehicles",
+        ),
+    ),
+)
+
+ADVICE_RULES = (
+    AdviceRule(
+        (Check(('condition',), '==', 'clear'), Check(('temp_c',), 'between', (10, 30))),
+        ("Perfect weather! Great day for outdoor activities", "Don't forget sunscreen"),
+    ),
+    AdviceRule(
+        (Check(('condition',), '==', 'rain'), Check(('heavy',), '==', False)),
+        ("Bring an umbrella", "Wear waterproof shoes"),
+    ),
+    AdviceRule(
+        (Check(('condition',), '==', 'clouds'),),
+        ("Comfortable conditions for outdoor activities",),
+    ),
+    AdviceRule(
+        (Check(('temp',), 'between', (20, 28), NEVER),),
+        ("Pleasant temperature for walking",),
+    ),
+)
+
+ADVICE_MESSAGE = "Current conditions are favorable"
+
+# Fields extracted from each payload, in column order
+FIELDS = ('temp', 'feels_like', 'temp_c', 'humidity', 'wind_speed', 'visibility', 'condition', 'heavy')
+NUMERIC_FIELDS = FIELDS[:6]
+
+_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+}
+
+
+def _extract(weather_data: Dict, use_celsius: bool) -> Tuple:
+    """Return the rule fields of a payload as a tuple in FIELDS order."""
+    main = weather_data.get("main", {})
+    condition = (weather_data.get("weather") or [{}])[0]
+    temp = main.get("temp", 0)
+    feels_like = main.get("feels_like", 0)
+    if not use_celsius:
+        temp = (temp * 9/5) + 32
+        feels_like = (feels_like * 9/5) + 32
+    return (
+        temp,
+        feels_like,
+        temp if use_celsius else (temp - 32) * 5/9,
+        main.get("humidity", 0),
+        weather_data.get("wind", {}).get("speed", 0),
+        weather_data.get("visibility", 10000) / 1000,  # km
+        condition.get("main", "").lower(),
+        'heavy' in condition.get("description", "").lower(),
+    )
+
+
+def _threshold(check: Check, use_celsius: bool):
+    """Return the threshold of a check in the given unit."""
+    if use_celsius or check.value_f == SAME:
+        return check.value
+    return check.value_f
+
+
+def _compile_check(check: Check, use_celsius: bool) -> Callable[[Tuple], bool]:
+    """Return a predicate for one check over a FIELDS-ordered row."""
+    threshold = _threshold(check, use_celsius)
+    if threshold is NEVER:
+        return lambda row: False
+    indexes = tuple(FIELDS.index(field) for field in check.fields)
+    if check.op == 'between':
+        low, high = threshold
+        if len(indexes) == 1:
+            index, = indexes
+            return lambda row: low <= row[index] <= high
+        return lambda row: any(low <= row[i] <= high for i in indexes)
+    compare = _OPERATORS[check.op]
+    if len(indexes) == 1:
+        index, = indexes
+        return lambda row: compare(row[index], threshold)
+    return lambda row: any(compare(row[i], threshold) for i in indexes)
+
+
+def _compile_rule(checks: Tuple[Check, ...], use_celsius: bool) -> Callable[[Tuple], bool]:
+    """Return a predicate that passes when every check of a rule passes."""
+    predicates = tuple(_compile_check(check, use_celsius) for check in checks)
+    if len(predicates) == 1:
+        return predicates[0]
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda row: first(row) and second(row)
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+def _compile_alert(rule: AlertRule, use_celsius: bool) -> Callable[[Tuple], Dict]:
+    """Return a function building the alert of a rule from a row."""
+    template = rule.template.replace("{unit}", "C" if use_celsius else "F")
+
+    def make(row: Tuple) -> Dict:
+        return {
+            'type': rule.type,
+            'message': template.format(**dict(zip(FIELDS, row))),
+            'recommendations': list(rule.recommendations),
+        }
+    return make
+
+
+def _compile(use_celsius: bool) -> Tuple[Callable[[Tuple], List[Dict]], List[Callable]]:
+    """
+    Compile the rule tables for one unit.
+
+    Every check becomes a predicate with its threshold and operator bound
+    once, so evaluating a payload never looks anything up in the tables.
+
+    Returns:
+        Tuple of (evaluate(row) -> alerts, one alert builder per
+        ALERT_RULES entry)
+    """
+    makers = [_compile_alert(rule, use_celsius) for rule in ALERT_RULES]
+    alert_rules = [
+        (_compile_rule(rule.checks, use_celsius), make)
+        for rule, make in zip(ALERT_RULES, makers)
+    ]
+    advice_rules = [
+        (_compile_rule(rule.checks, use_celsius), rule.recommendations)
+        for rule in ADVICE_RULES
+    ]
+
+    def evaluate(row: Tuple) -> List[Dict]:
+        alerts = [make(row) for applies, make in alert_rules if applies(row)]
+        if alerts:
+            return alerts
+        advice = []
+        for applies, recommendations in advice_rules:
+            if applies(row):
+                advice.extend(recommendations)
+        if advice:
+            alerts.append({'type': 'general', 'message': ADVICE_MESSAGE, 'recommendations': advice})
+        return alerts
+
+    return evaluate, makers
+
+
+# Rule tables compiled once per unit (keyed by use_celsius)
+_COMPILED = {use_celsius: _compile(use_celsius) for use_celsius in (True, False)}
+
+
+def analyze_weather(weather_data: Dict, use_celsius: bool = True) -> List[Dict]:
+    """
+    Evaluate the alert rules for one weather payload.
+
+    Args:
+        weather_data: Weather API response
+        use_celsius: Evaluate and report temperatures in Celsius
+
+    Returns:
+        List of alert dicts (type, message, recommendations); a single
+        'general' entry with advice when no alert applies
+    """
+    evaluate, _ = _COMPILED[use_celsius]
+    return evaluate(_extract(weather_data, use_celsius))
+
+
+def _mask(check: Check, columns: Dict, use_celsius: bool, size: int):
+    """Evaluate one check over column arrays."""
+    threshold = _threshold(check, use_celsius)
+    mask = np.zeros(size, dtype=bool)
+    if threshold is NEVER:
+        return mask
+    for field in check.fields:
+        column = columns[field]
+        if check.op == 'between':
+            low, high = threshold
+            mask |= (column >= low) & (column <= high)
+        else:
+            mask |= _OPERATORS[check.op](column, threshold)
+    return mask
+
+
+def _rule_mask(checks: Tuple[Check, ...], columns: Dict, use_celsius: bool, size: int):
+    """Evaluate every check of a rule over column arrays."""
+    mask = np.ones(size, dtype=bool)
+    for check in checks:
+        mask &= _mask(check, columns, use_celsius, size)
+    return mask
+
+
+def _load_numpy() -> bool:
+    """Import NumPy on first use; return False if it is not installed."""
+    global np
+    if np is None:
+        try:
+            np = importlib.import_module("numpy")
+        except ImportError:
+            return False
+    return True
+
+
+def _columns(rows: List[Tuple]) -> Dict:
+    """Turn FIELDS-ordered rows into NumPy column arrays."""
+    columns = dict(zip(FIELDS, zip(*rows)))
+    for field in NUMERIC_FIELDS:
+        columns[field] = np.array(columns[field], dtype=np.float64)
+    columns['condition'] = np.array(columns['condition'], dtype=object)
+    columns['heavy'] = np.array(columns['heavy'], dtype=bool)
+    return columns
+
+
+def alert_matrix(payloads: Iterable[Dict], use_celsius: bool = True):
+    """
+    Evaluate which alert rules fire for many payloads, without formatting.
+
+    Useful for cheap aggregate questions over history or a watchlist
+    (e.g. ``matrix.sum(axis=0)`` counts each alert type).
+
+    Args:
+        payloads: Weather API responses
+        use_celsius: Evaluate temperatures in Celsius
+
+    Returns:
+        Boolean NumPy array of shape (len(payloads), len(ALERT_RULES))
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    if not _load_numpy():
+        raise ImportError("alert_matrix requires NumPy")
+    rows = [_extract(data, use_celsius) for data in payloads]
+    return _alert_masks(_columns(rows), use_celsius, len(rows)) if rows else (
+        np.zeros((0, len(ALERT_RULES)), dtype=bool)
+    )
+
+
+def _alert_masks(columns: Dict, use_celsius: bool, size: int):
+    """Return the (size, len(ALERT_RULES)) matrix of fired alert rules."""
+    matrix = np.empty((size, len(ALERT_RULES)), dtype=bool)
+    for index, rule in enumerate(ALERT_RULES):
+        matrix[:, index] = _rule_mask(rule.checks, columns, use_celsius, size)
+    return matrix
+
+
+def analyze_weather_batch(payloads: Iterable[Dict], use_celsius: bool = True) -> List[List[Dict]]:
+    """
+    Evaluate the alert rules for many payloads at once.
+
+    Fields are gathered into NumPy column arrays and each rule is applied
+    to a whole column in one operation; only the alerts that fired are
+    formatted per payload.
+
+    Args:
+        payloads: Weather API responses (e.g. a watchlist or history)
+        use_celsius: Evaluate and report temperatures in Celsius
+
+    Returns:
+        One alert list per payload, identical to analyze_weather()
+    """
+    if not _load_numpy():
+        return [analyze_weather(data, use_celsius) for data in payloads]
+
+    rows = [_extract(data, use_celsius) for data in payloads]
+    size = len(rows)
+    if not size:
+        return []
+
+    columns = _columns(rows)
+    matrix = _alert_masks(columns, use_celsius, size)
+    quiet = ~matrix.any(axis=1)
+    _, makers = _COMPILED[use_celsius]
+
+    results = [[] for _ in range(size)]
+    rows_hit, rules_hit = np.nonzero(matrix)
+    for index, rule_index in zip(rows_hit.tolist(), rules_hit.tolist()):
+        results[index].append(makers[rule_index](rows[index]))
+
+    # Advice only applies where no alert fired; each combination of
+    # advice rules is encoded as a bit pattern and expanded once
+    codes = np.zeros(size, dtype=np.int64)
+    for bit, rule in enumerate(ADVICE_RULES):
+        mask = _rule_mask(rule.checks, columns, use_celsius, size) & quiet
+        codes |= mask.astype(np.int64) << bit
+    advice_for = {}
+    for index in np.flatnonzero(codes).tolist():
+        code = int(codes[index])
+        advice = advice_for.get(code)
+        if advice is None:
+            advice = advice_for[code] = tuple(
+                text
+                for bit, rule in enumerate(ADVICE_RULES) if code >> bit & 1
+                for text in rule.recommendations
+            )
+        results[index].append({
+            'type': 'general',
+            'message': ADVICE_MESSAGE,
+            'recommendations': list(advice),
+        })
+    return results
+
+
+SEVERITY_RANK = {'low': 1, 'medium': 2, 'high': 3}
+RULE_SEVERITY = {rule.type: rule.severity for rule in ALERT_RULES}
+
+
+def severity_rank(alert: Dict) -> int:
+    """Return how severe an alert is (0 for general advice)."""
+    return SEVERITY_RANK.get(RULE_SEVERITY.get(alert.get('type')), 0)
+
+
+class AlertDiff(NamedTuple):
+    """Difference between two alert lists, matched by alert type."""
+    added: List[Dict]
+    removed: List[Dict]
+    changed: List[Dict]  # same type, new message or recommendations
+    escalated: bool  # the most severe alert is now more severe than before
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    @property
+    def notable(self) -> bool:
+        """True if alerts were raised or cleared (worth announcing)."""
+        return bool(self.added or self.removed)
+
+
+def diff_alerts(previous: Iterable[Dict], current: Iterable[Dict]) -> AlertDiff:
+    """
+    Compare two alert lists.
+
+    Args:
+        previous: Alerts shown or announced before
+        current: Alerts just evaluated
+
+    Returns:
+        AlertDiff; ``added`` and ``changed`` hold entries of ``current``,
+        ``removed`` holds entries of ``previous``
+    """
+    before = {alert.get('type'): alert for alert in previous}
+    after = {alert.get('type'): alert for alert in current}
+    top_before = max(map(severity_rank, before.values()), default=0)
+    top_after = max(map(severity_rank, after.values()), default=0)
+    return AlertDiff(
+        added=[alert for kind, alert in after.items() if kind not in before],
+        removed=[alert for kind, alert in before.items() if kind not in after],
+        changed=[
+            alert for kind, alert in after.items()
+            if kind in before and before[kind] != alert
+        ],
+        escalated=top_after > top_before,
+    )
+
+
+class AlertTracker:
+    """Remember the active alerts of each city between refreshes.
+
+    ``update()`` stores a city's latest alerts and returns how they differ
+    from the previous ones, so callers (the search view, the watchlist,
+    notifications) only rebuild or announce what actually changed.
+    General advice is not an alert and is not tracked.
+    """
+
+    def __init__(self):
+        self._alerts: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, key: str, alerts: Iterable[Dict]) -> AlertDiff:
+        """
+        Record a city's current alerts.
+
+        Args:
+            key: City key (e.g. geocode.place_key of "name,country")
+            alerts: Alerts from analyze_weather()
+
+        Returns:
+            AlertDiff against the alerts recorded for the city last time
+        """
+        current = [alert for alert in alerts if alert.get('type') != 'general']
+        with self._lock:
+            previous = self._alerts.get(key, [])
+            self._alerts[key] = current
+        return diff_alerts(previous, current)
+
+    def get(self, key: str) -> List[Dict]:
+        """Return the alerts last recorded for a city."""
+        with self._lock:
+            return list(self._alerts.get(key, []))
+
+    def forget(self, key: Optional[str] = None):
+        """Drop one city's state, or every city's if key is None."""
+        with self._lock:
+            if key is None:
+                self._alerts.clear()
+            else:
+                self._alerts.pop(key, None)
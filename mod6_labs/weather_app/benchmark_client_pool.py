@@ -0,0 +1,126 @@
+# benchmark_client_pool.py
+"""Benchmark per-request latency with and without a pooled HTTP client.
+
+Runs a small local HTTP server that stands in for OpenWeatherMap and
+compares the old client-per-call pattern against the shared client in
+``WeatherService``. New connections can be given an artificial setup
+delay to approximate the TCP+TLS handshake cost of a real upstream.
+
+Usage:
+    python benchmark_client_pool.py --requests 200 --handshake-ms 30
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from config import Config
+from rate_limiter import RateLimiter, TokenBucket
+from weather_service import WeatherService
+
+
+SAMPLE_PAYLOAD = json.dumps({
+    "name": "London",
+    "coord": {"lat": 51.51, "lon": -0.13},
+    "sys": {"country": "GB"},
+    "main": {"temp": 12.3, "feels_like": 11.0, "humidity": 70, "pressure": 1012},
+    "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+    "wind": {"speed": 4.1},
+    "clouds": {"all": 75},
+    "visibility": 10000,
+}).encode()
+
+
+async def start_stand_in_server(handshake_delay: float):
+    """Start a keep-alive HTTP/1.1 server on a random local port."""
+    stats = {"connections": 0}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        # Simulate connection setup cost (handshake) once per connection
+        await asyncio.sleep(handshake_delay)
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(SAMPLE_PAYLOAD)}\r\n\r\n".encode()
+                    + SAMPLE_PAYLOAD
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/data/2.5/weather", stats
+
+
+async def per_call_client(url: str, requests: int) -> list:
+    """Old behaviour: open a fresh AsyncClient for every lookup."""
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=Config.TIMEOUT) as client:
+            response = await client.get(url, params={"q": "London"})
+            response.json()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def pooled_client(url: str, requests: int) -> list:
+    """New behaviour: one long-lived WeatherService client."""
+    latencies = []
+    async with WeatherService(
+        api_key="benchmark",
+        base_url=url,
+        # Measure the transport, not the quota or the response cache
+        rate_limiter=RateLimiter(TokenBucket(rate=1e9, burst=requests)),
+    ) as service:
+        for _ in range(requests):
+            start = time.perf_counter()
+            await service.get_weather("London", force_refresh=True)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(label: str, latencies: list, connections: int):
+    """Print latency summary for one run."""
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{label:<16} mean {statistics.mean(ms):7.2f} ms   "
+        f"p50 {statistics.median(ms):7.2f} ms   "
+        f"p95 {p95:7.2f} ms   connections {connections}"
+    )
+
+
+async def main(requests: int, handshake_ms: float):
+    server, url, stats = await start_stand_in_server(handshake_ms / 1000)
+    async with server:
+        print(f"Benchmarking {requests} sequential lookups against {url}")
+        print(f"Simulated handshake cost: {handshake_ms} ms per connection\n")
+
+        latencies = await per_call_client(url, requests)
+        summarize("per-call client", latencies, stats["connections"])
+
+        stats["connections"] = 0
+        latencies = await pooled_client(url, requests)
+        summarize("pooled client", latencies, stats["connections"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.handshake_ms))
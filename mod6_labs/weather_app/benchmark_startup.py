@@ -0,0 +1,121 @@
+# benchmark_startup.py
+"""Benchmark WeatherApp cold-start time.
+
+Measures, in fresh interpreter processes:
+  * import time of ``main`` (the app module and everything it pulls in)
+  * time-to-first-frame: from ``WeatherApp(page)`` until the UI tree has
+    been handed to ``page.add()``
+
+A recording page object stands in for a connected Flet session so the
+numbers reflect the app's own work, not the client round-trip. Use the
+``--max-*`` options in CI to fail when startup regresses.
+
+Usage:
+    python benchmark_startup.py --runs 5 --max-import-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+import_done = time.perf_counter()
+
+
+class Window:
+    width = height = 0
+    resizable = True
+
+    def center(self):
+        pass
+
+
+class RecordingPage:
+    """Minimal stand-in for ft.Page that records the first add()."""
+
+    def __init__(self):
+        self.window = Window()
+        self.first_frame = None
+        self.voice_at_first_frame = None
+
+    def add(self, *controls):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+            self.voice_at_first_frame = "speech_recognition" in sys.modules
+
+    def update(self):
+        pass
+
+    def run_task(self, handler, *args):
+        pass
+
+
+page = RecordingPage()
+app_start = time.perf_counter()
+main.WeatherApp(page)
+init_done = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (import_done - start) * 1000,
+    "first_frame_ms": (page.first_frame - app_start) * 1000,
+    "init_ms": (init_done - app_start) * 1000,
+    "voice_at_first_frame": page.voice_at_first_frame,
+}))
+'''
+
+
+def run_probe() -> dict:
+    """Run one cold start in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent))
+    # Empty working directory so no history, cache or .env is touched
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int, max_import_ms: float, max_first_frame_ms: float) -> int:
+    samples = [run_probe() for _ in range(runs)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    first_frame_ms = statistics.median(s["first_frame_ms"] for s in samples)
+    init_ms = statistics.median(s["init_ms"] for s in samples)
+
+    print(f"Cold starts: {runs}")
+    print(f"  import main         median {import_ms:8.1f} ms")
+    print(f"  time-to-first-frame median {first_frame_ms:8.1f} ms")
+    print(f"  WeatherApp.__init__ median {init_ms:8.1f} ms")
+    if any(s["voice_at_first_frame"] for s in samples):
+        print("  note: voice stack was imported before the first frame")
+
+    failed = False
+    if max_import_ms and import_ms > max_import_ms:
+        print(f"FAIL: import time exceeds {max_import_ms} ms")
+        failed = True
+    if max_first_frame_ms and first_frame_ms > max_first_frame_ms:
+        print(f"FAIL: time-to-first-frame exceeds {max_first_frame_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=0)
+    parser.add_argument("--max-first-frame-ms", type=float, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.max_import_ms, args.max_first_frame_ms))
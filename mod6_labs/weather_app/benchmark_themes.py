@@ -0,0 +1,87 @@
+# benchmark_themes.py
+"""Benchmark WeatherTheme lookups over every OpenWeatherMap condition code.
+
+Compares the original substring scan (which copied and patched a dict for
+night mode on every call) against the precomputed ``WeatherTheme.LOOKUP``
+table, looked up by condition id and by condition name. Before timing, it
+checks that both give the same colours for every code, day and night.
+
+Usage:
+    python benchmark_themes.py --rounds 2000
+"""
+
+import argparse
+import sys
+import timeit
+
+from main import WeatherTheme
+
+
+def legacy_get_theme(weather_condition: str, is_day: bool = True) -> dict:
+    """The original get_theme: scan palette names, copy, patch for night."""
+    condition = weather_condition.lower()
+    for key in WeatherTheme.THEMES.keys():
+        if key in condition:
+            theme = WeatherTheme.THEMES[key].copy()
+            if not is_day and key in WeatherTheme.NIGHT_THEMES:
+                theme.update(WeatherTheme.NIGHT_THEMES[key])
+            return theme
+    return WeatherTheme.THEMES['default']
+
+
+def samples() -> list:
+    """Return (condition id, condition name, is_day) for every known code."""
+    return [
+        (condition_id, main, is_day)
+        for condition_id, main in WeatherTheme.CONDITION_IDS.items()
+        for is_day in (True, False)
+    ]
+
+
+def check(cases: list) -> list:
+    """Return the cases where the lookup table disagrees with the scan."""
+    mismatches = []
+    for condition_id, main, is_day in cases:
+        expected = legacy_get_theme(main, is_day)
+        expected = dict(expected, gradient=tuple(expected['gradient']))
+        by_id = WeatherTheme.get_theme(main, is_day, condition_id)._asdict()
+        by_name = WeatherTheme.get_theme(main, is_day)._asdict()
+        if by_id != expected or by_name != expected:
+            mismatches.append((condition_id, main, is_day))
+    return mismatches
+
+
+def main(rounds: int) -> int:
+    cases = samples()
+    mismatches = check(cases)
+    if mismatches:
+        print(f"FAIL: lookup table differs from the original for {mismatches}")
+        return 1
+
+    def legacy():
+        for _, main, is_day in cases:
+            legacy_get_theme(main, is_day)
+
+    def by_name():
+        for _, main, is_day in cases:
+            WeatherTheme.get_theme(main, is_day)
+
+    def by_id():
+        for condition_id, main, is_day in cases:
+            WeatherTheme.get_theme(main, is_day, condition_id)
+
+    calls = rounds * len(cases)
+    print(f"{len(cases)} condition/day combinations x {rounds} rounds")
+    for label, run in (("substring scan + copy", legacy),
+                       ("lookup by name", by_name),
+                       ("lookup by id", by_id)):
+        best = min(timeit.repeat(run, number=rounds, repeat=5))
+        print(f"  {label:22} {best / calls * 1e9:8.0f} ns/call")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    sys.exit(main(args.rounds))
@@ -0,0 +1,249 @@
+# city_index.py
+"""Local city name index for autocomplete and spelling correction.
+
+The bundled ``cities.txt`` holds one ``key<TAB>name<TAB>country`` line
+per city, sorted by key, where the key is the lower-cased, accent-free
+name. The file is memory-mapped instead of read into Python objects:
+prefix lookups binary-search the mapped lines directly, and the trigram
+index used for fuzzy matching only stores line numbers.
+"""
+
+import mmap
+import threading
+import unicodedata
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from config import Config
+
+
+def fold(text: str) -> str:
+    """Lower-case text, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.replace(",", " ").split())
+
+
+def trigrams(key: str) -> set:
+    """Return the padded character trigrams of a folded key."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class City(NamedTuple):
+    """One entry of the city index."""
+    name: str
+    country: str
+
+    @property
+    def query(self) -> str:
+        """Search string for the weather API (``name,CC``)."""
+        return f"{self.name},{self.country}"
+
+    @property
+    def label(self) -> str:
+        """Display label for suggestions."""
+        return f"{self.name}, {self.country}"
+
+
+class CityIndex:
+    """Prefix and fuzzy search over a sorted, memory-mapped city list.
+
+    The file is mapped and scanned for line offsets on first use, and the
+    trigram index is built on the first fuzzy query, so constructing the
+    index costs nothing at startup.
+    """
+
+    def __init__(self, path=None, min_similarity: float = Config.CITY_MIN_SIMILARITY):
+        self.path = Path(path) if path else Path(__file__).with_name(Config.CITY_LIST_FILE)
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._offsets: Optional[array] = None
+        self._trigrams: Optional[Dict[str, array]] = None
+
+    def _ensure_loaded(self) -> bool:
+        """Map the city list and index line offsets on first use."""
+        if self._offsets is not None:
+            return True
+        with self._lock:
+            if self._offsets is None:
+                offsets = array("I")
+                try:
+                    self._file = open(self.path, "rb")
+                    if self.path.stat().st_size:
+                        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                        position = 0
+                        size = len(self._map)
+                        while position < size:
+                            offsets.append(position)
+                            end = self._map.find(b"\n", position)
+                            position = size if end == -1 else end + 1
+                except OSError as e:
+                    print(f"City index unavailable: {e}")
+                self._offsets = offsets
+        return bool(self._offsets)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._offsets)
+
+    def _line(self, index: int) -> bytes:
+        """Return line ``index`` without its newline."""
+        start = self._offsets[index]
+        end = self._map.find(b"\n", start)
+        return self._map[start:end if end != -1 else len(self._map)]
+
+    def _key(self, index: int) -> bytes:
+        """Return the sort key of line ``index``."""
+        line = self._line(index)
+        return line[:line.find(b"\t")]
+
+    def _city(self, index: int) -> City:
+        """Decode line ``index`` into a City."""
+        _, name, country = self._line(index).decode("utf-8").split("\t")
+        return City(name, country)
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Return the first line whose key is >= key."""
+        low, high = 0, len(self._offsets)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def prefix(self, text: str, limit: int = 8) -> List[City]:
+        """
+        Return cities whose name starts with text.
+
+        Args:
+            text: Typed prefix (case and accents are ignored)
+            limit: Maximum number of results
+
+        Returns:
+            Matching cities in alphabetical order
+        """
+        key = fold(text).encode("utf-8")
+        if not key or not self._ensure_loaded():
+            return []
+        results = []
+        index = self._lower_bound(key)
+        while index < len(self._offsets) and len(results) < limit:
+            if not self._key(index).startswith(key):
+                break
+            results.append(self._city(index))
+            index += 1
+        return results
+
+    def lookup(self, name: str) -> Optional[City]:
+        """Return the city with exactly this name, if indexed."""
+        key = fold(name).encode("utf-8")
+        if not key or not self._ensure_loaded():
+            return None
+        index = self._lower_bound(key)
+        if index < len(self._offsets) and self._key(index) == key:
+            return self._city(index)
+        return None
+
+    def _build_trigrams(self) -> Dict[str, array]:
+        """Map each trigram to the line numbers containing it."""
+        if self._trigrams is None:
+            with self._lock:
+                if self._trigrams is None:
+                    postings = defaultdict(lambda: array("I"))
+                    for index in range(len(self._offsets)):
+                        key = self._key(index).decode("utf-8")
+                        for gram in trigrams(key):
+                            postings[gram].append(index)
+                    self._trigrams = dict(postings)
+        return self._trigrams
+
+    def fuzzy(self, text: str, limit: int = 5) -> List[tuple]:
+        """
+        Return cities whose names look like text.
+
+        Args:
+            text: Possibly misspelled city name
+            limit: Maximum number of results
+
+        Returns:
+            List of (similarity, City), best first; similarity is the
+            Dice coefficient of the two names' trigram sets
+        """
+        key = fold(text)
+        if not key or not self._ensure_loaded():
+            return []
+        postings = self._build_trigrams()
+        grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for index in postings.get(gram, ()):
+                shared[index] += 1
+
+        scored = []
+        for index, count in shared.items():
+            other = len(trigrams(self._key(index).decode("utf-8")))
+            scored.append((2 * count / (len(grams) + other), index))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self._city(index)) for score, index in scored[:limit]]
+
+    def suggest(self, text: str, limit: int = 6) -> List[City]:
+        """Return prefix matches, topped up with fuzzy matches for typos."""
+        results = self.prefix(text, limit)
+        if len(results) < limit and len(fold(text)) >= 3:
+            for score, city in self.fuzzy(text, limit):
+                if score >= self.min_similarity and city not in results:
+                    results.append(city)
+                    if len(results) == limit:
+                        break
+        return results
+
+    def correct(self, text: str) -> Optional[City]:
+        """
+        Return the indexed city a misspelled name most likely means.
+
+        The list is far from complete, so callers should only offer the
+        result as a suggestion after the weather service reports the name
+        as not found, never rewrite a query with it.
+
+        Only confident, unambiguous corrections are returned: names that
+        are already indexed, or that include a country code, are left
+        alone, as are names whose best match is not clearly ahead of the
+        runner-up.
+        """
+        if "," in text or self.lookup(text) is not None:
+            return None
+        matches = self.fuzzy(text, limit=2)
+        if not matches or matches[0][0] < self.min_similarity:
+            return None
+        if len(matches) > 1 and matches[0][0] - matches[1][0] < 0.1:
+            return None
+        return matches[0][1]
+
+    def warm_up(self) -> threading.Thread:
+        """Load the index and its trigrams in a background daemon thread."""
+        def run():
+            if self._ensure_loaded():
+                self._build_trigrams()
+
+        thread = threading.Thread(target=run, name="city-index-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Unmap the city list."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._offsets = None
+            self._trigrams = None
@@ -1,21 +1,68 @@
 # config.py
 """Configuration management for the Weather App."""
 
+import json
 import os
-from dotenv import load_dotenv
+import threading
+from pathlib import Path
 
-# Load environment variables from .env file
-load_dotenv()
 
-class Config:
-    """Application configuration."""
+def _to_bool(value) -> bool:
+    """Parse a boolean setting."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+class _LazyConfig(type):
+    """Resolve environment-backed settings on first attribute access."""
+
+    def __getattr__(cls, name):
+        settings = cls.__dict__.get("ENV_SETTINGS", {})
+        if name in settings:
+            return cls.load()[name]
+        raise AttributeError(f"Config has no setting '{name}'")
+
+
+class Config(metaclass=_LazyConfig):
+    """Application configuration.
+
+    Plain class attributes are fixed defaults. Settings listed in
+    ``ENV_SETTINGS`` are resolved lazily on first access and cached,
+    layering (lowest to highest priority) built-in defaults, an optional
+    JSON settings file (``WEATHER_CONFIG_FILE``), the ``.env`` file and
+    the process environment. Nothing is read from disk at import time.
+    """
+    
+    # Environment-backed settings: name -> (variable, default, type)
+    ENV_SETTINGS = {
+        "API_KEY": ("OPENWEATHER_API_KEY", "", str),
+        "BASE_URL": (
+            "OPENWEATHER_BASE_URL",
+            "https://api.openweathermap.org/data/2.5/weather",
+            str,
+        ),
+        "MAX_CONNECTIONS": ("OPENWEATHER_MAX_CONNECTIONS", 10, int),
+        "MAX_KEEPALIVE_CONNECTIONS": ("OPENWEATHER_MAX_KEEPALIVE", 5, int),
+        "KEEPALIVE_EXPIRY": ("OPENWEATHER_KEEPALIVE_EXPIRY", 30.0, float),  # seconds
+        "HTTP2": ("OPENWEATHER_HTTP2", False, _to_bool),
+        "RATE_LIMIT_PER_SECOND": ("OPENWEATHER_RATE_LIMIT", 1.0, float),
+        "RATE_LIMIT_BURST": ("OPENWEATHER_RATE_BURST", 10, int),
+        # SQLite file shared by all processes using the same API key ("" = per process)
+        "RATE_LIMIT_SHARED_PATH": ("OPENWEATHER_RATE_LIMIT_DB", "", str),
+        "DISK_CACHE_PATH": ("WEATHER_DISK_CACHE", "weather_cache.db", str),
+        "SPEECH_BACKEND": ("WEATHER_SPEECH_BACKEND", "google", str),  # google or vosk
+        "VOSK_MODEL_PATH": ("VOSK_MODEL_PATH", "", str),
+        # Searches kept in the history journal (oldest dropped first)
+        "HISTORY_MAX_ENTRIES": ("WEATHER_HISTORY_MAX_ENTRIES", 10000, int),
+    }
     
-    # API Configuration
-    API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
-    BASE_URL = os.getenv(
-        "OPENWEATHER_BASE_URL", 
-        "https://api.openweathermap.org/data/2.5/weather"
-    )
+    # .env locations, checked in order (working directory, then app folder)
+    ENV_FILES = (Path(".env"), Path(__file__).with_name(".env"))
+    SETTINGS_FILE_VARIABLE = "WEATHER_CONFIG_FILE"
+    
+    _values = None
+    _lock = threading.Lock()
     
     # App Configuration
     APP_TITLE = "Weather App"
@@ -26,6 +73,121 @@ class Config:
     UNITS = "metric"  # metric, imperial, or standard
     TIMEOUT = 10  # seconds
     
+    # Response Cache Settings
+    CACHE_TTL = 600  # seconds a cached response is considered fresh
+    CACHE_MAX_STALE = 3600  # seconds a stale response may still be served
+    CACHE_MAX_ENTRIES = 128
+    CACHE_STALE_WHILE_REVALIDATE = True
+    
+    # Retry Settings
+    RETRY_MAX_ATTEMPTS = 3
+    RETRY_BACKOFF_BASE = 0.5  # seconds, doubled on each attempt
+    RETRY_BACKOFF_MAX = 8  # seconds
+    RETRY_JITTER = 0.5  # fraction of the backoff randomized away
+    RETRY_ON_STATUS = (429, 500, 502, 503, 504)
+    RETRY_MAX_RETRY_AFTER = 30  # seconds, longer Retry-After fails instead
+    
+    # Circuit Breaker Settings
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before opening
+    BREAKER_RESET_TIMEOUT = 30  # seconds before a trial request
+    
+    # Rate Limit Settings (token bucket)
+    RATE_LIMIT_TIMEOUT = 5  # seconds a request may queue for a token
+    
+    # Batch Fetch Settings
+    BATCH_CONCURRENCY = 5  # simultaneous upstream requests per batch
+    
+    # Watchlist Settings
+    WATCHLIST_FILE = "watchlist.json"
+    WATCHLIST_REFRESH_INTERVAL = 600  # seconds between refreshes per city
+    WATCHLIST_JITTER = 0.1  # +/- fraction applied to each interval
+    WATCHLIST_MAX_BACKOFF = 3600  # seconds, cap for failure backoff
+    
+    # Disk Cache Settings
+    DISK_CACHE_MAX_BYTES = 5 * 1024 * 1024
+    DISK_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+    
+    # Speech Settings
+    SPEECH_CACHE_DIR = "speech_cache"  # pre-rendered WAVs for fixed prompts
+    SPEECH_LISTEN_TIMEOUT = 10  # seconds to wait for speech to start
+    SPEECH_PHRASE_LIMIT = 10  # seconds of speech per phrase
+    SPEECH_CALIBRATION_MAX_AGE = 300  # seconds an ambient-noise calibration is reused
+    
+    # City Search Settings
+    CITY_LIST_FILE = "cities.txt"  # bundled, sorted city list
+    CITY_MIN_SIMILARITY = 0.6  # trigram similarity needed for a fuzzy match
+    
+    # Preferences Settings
+    PREFERENCES_FILE = "user_preferences.json"
+    PREFERENCES_SAVE_DELAY = 0.5  # seconds of quiet before preferences are written
+    
+    # Search History Settings
+    HISTORY_FILE = "search_history.jsonl"  # append-only journal
+    HISTORY_LEGACY_FILE = "search_history.json"  # imported once if present
+    HISTORY_DISPLAY_LIMIT = 10  # entries shown in the history dropdown
+    HISTORY_COMPACT_MIN_LINES = 1000  # journal lines before compaction is considered
+    HISTORY_HALF_LIFE_DAYS = 14  # age at which a search counts half in the ranking
+    HISTORY_SCAN_FACTOR = 32  # prefix matches per result ranked directly
+    
+    @classmethod
+    def load(cls) -> dict:
+        """Resolve environment-backed settings once and cache them."""
+        values = cls._values
+        if values is not None:
+            return values
+        
+        with cls._lock:
+            if cls._values is None:
+                cls._values = cls._resolve()
+            return cls._values
+    
+    @classmethod
+    def _resolve(cls) -> dict:
+        """Merge the configuration sources into typed values."""
+        raw = {}
+        
+        # Optional JSON settings file keyed by variable name
+        settings_file = os.environ.get(cls.SETTINGS_FILE_VARIABLE)
+        if settings_file and Path(settings_file).exists():
+            try:
+                with open(settings_file, 'r') as f:
+                    raw.update(json.load(f))
+            except Exception as e:
+                print(f"Error loading settings file: {e}")
+        
+        # .env file (parsed without touching os.environ)
+        env_file = next((path for path in cls.ENV_FILES if path.exists()), None)
+        if env_file is not None:
+            try:
+                from dotenv import dotenv_values
+                raw.update({
+                    key: value
+                    for key, value in dotenv_values(env_file).items()
+                    if value is not None
+                })
+            except ImportError:
+                print("python-dotenv is not installed; skipping .env file")
+        
+        # Process environment wins
+        raw.update(os.environ)
+        
+        values = {}
+        for name, (variable, default, cast) in cls.ENV_SETTINGS.items():
+            if variable in raw:
+                try:
+                    values[name] = cast(raw[variable])
+                    continue
+                except (TypeError, ValueError):
+                    print(f"Invalid value for {variable}; using default")
+            values[name] = default
+        return values
+    
+    @classmethod
+    def reload(cls):
+        """Forget cached settings so the next access re-reads the sources."""
+        with cls._lock:
+            cls._values = None
+    
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
@@ -34,7 +196,4 @@ class Config:
                 "OPENWEATHER_API_KEY not found. "
                 "Please create a .env file with your API key."
             )
-        return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
+        return True
\ No newline at end of file
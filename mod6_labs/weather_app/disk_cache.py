@@ -0,0 +1,197 @@
+# disk_cache.py
+"""Persistent SQLite cache for raw weather API payloads."""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class DiskCache:
+    """Disk-backed store of weather payloads that survives restarts.
+
+    Each row holds the raw JSON payload, the wall-clock fetch time and
+    the normalized city name reported by the API, so the last-known
+    weather for a city can be shown before the network is available.
+    A second table keeps the coordinates each searched place resolved to
+    (see ``geocode.GeocodeCache``).
+    """
+
+    def __init__(
+        self,
+        path,
+        max_bytes: int = 5 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+        compact_on_open: bool = False,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                key TEXT PRIMARY KEY,
+                city TEXT,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_weather_cache_city "
+            "ON weather_cache (city, fetched_at)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                key TEXT PRIMARY KEY,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                name TEXT NOT NULL,
+                country TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        if compact_on_open:
+            self.compact()
+
+    @staticmethod
+    def _key(key: Tuple) -> str:
+        """Serialize an in-memory cache key."""
+        return "|".join(str(part) for part in key)
+
+    @staticmethod
+    def _city(name: str) -> str:
+        """Normalize a city name for lookups."""
+        return " ".join(name.split()).casefold()
+
+    def get(self, key: Tuple) -> Optional[Tuple[Dict, float]]:
+        """
+        Look up a payload by cache key.
+
+        Args:
+            key: In-memory cache key
+
+        Returns:
+            Tuple of (payload, fetched_at) or None if not stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM weather_cache WHERE key = ?",
+                (self._key(key),),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def last_known(self, city: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Return the most recent payload for a city name.
+
+        Args:
+            city: City name as typed or as reported by the API
+
+        Returns:
+            Tuple of (payload, fetched_at) or None if never fetched
+        """
+        normalized = self._city(city)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT payload, fetched_at FROM weather_cache
+                WHERE city = ? OR key LIKE ?
+                ORDER BY fetched_at DESC LIMIT 1
+                """,
+                (normalized, f"city|{normalized}|%"),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: Tuple, data: Dict, fetched_at: Optional[float] = None):
+        """Store a payload and enforce the size cap."""
+        payload = json.dumps(data, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weather_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._key(key),
+                    self._city(data.get("name", "")),
+                    payload,
+                    fetched_at if fetched_at is not None else time.time(),
+                    len(payload),
+                ),
+            )
+            self._enforce_size_cap()
+            self._conn.commit()
+
+    def places(self) -> List[Tuple[str, Tuple[float, float, str, str]]]:
+        """Return every stored place as (key, (lat, lon, name, country))."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, lat, lon, name, country FROM places"
+            ).fetchall()
+        return [(row[0], tuple(row[1:])) for row in rows]
+
+    def put_places(self, entries: Iterable[Tuple[str, Tuple[float, float, str, str]]]):
+        """Store (key, (lat, lon, name, country)) place entries."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)",
+                [(key, *place) for key, place in entries],
+            )
+            self._conn.commit()
+
+    def _enforce_size_cap(self):
+        """Drop the oldest rows until the stored payloads fit max_bytes."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM weather_cache"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM weather_cache ORDER BY fetched_at ASC"
+        ).fetchall()
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM weather_cache WHERE key = ?", stale_keys)
+
+    def compact(self):
+        """Remove expired rows, enforce the size cap and reclaim file space.
+
+        ``VACUUM`` rewrites the whole file, so callers on a UI thread should
+        run this with ``asyncio.to_thread``.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM weather_cache WHERE fetched_at < ?",
+                (time.time() - self.max_age,),
+            )
+            self._enforce_size_cap()
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def clear(self):
+        """Remove all rows."""
+        with self._lock:
+            self._conn.execute("DELETE FROM weather_cache")
+            self._conn.execute("DELETE FROM places")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,121 @@
+# geocode.py
+"""Persistent map from searched place names to coordinates.
+
+Every weather response carries the station's coordinates, canonical name
+and country. Remembering them lets a repeat search for the same place go
+straight to the coordinate endpoint, and share one cache entry, however
+the name was spelled ("Iriga, PH", "iriga", "IRIGA,ph").
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from city_index import fold
+
+
+class Place(NamedTuple):
+    """Coordinates and canonical name of a searched place."""
+    lat: float
+    lon: float
+    name: str
+    country: str
+
+
+def place_key(query: str) -> str:
+    """
+    Normalize a place query for lookups.
+
+    Case, accents, whitespace and spacing around commas are ignored, so
+    ``"Iriga, PH"`` and ``"iriga,ph"`` share a key.
+    """
+    parts = [fold(part) for part in query.split(",")]
+    return ",".join(part for part in parts if part)
+
+
+def place_from_response(data: Dict) -> Optional[Place]:
+    """Build a Place from a weather response, if it has coordinates."""
+    coord = data.get("coord") or {}
+    if "lat" not in coord or "lon" not in coord or not data.get("name"):
+        return None
+    return Place(
+        float(coord["lat"]),
+        float(coord["lon"]),
+        data["name"],
+        (data.get("sys") or {}).get("country", ""),
+    )
+
+
+class GeocodeCache:
+    """Place name to coordinates map, optionally persisted in a DiskCache.
+
+    Lookups are served from memory; the persisted places are read once,
+    on first use. A response is recorded under the query as typed and
+    under its canonical ``name,country``, so later spellings of either
+    resolve to the same coordinates. A bare name is never aliased to the
+    country of whichever place was searched first.
+    """
+
+    def __init__(self, disk_cache=None):
+        self.disk_cache = disk_cache
+        self._places: Optional[Dict[str, Place]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _loaded(self) -> Dict[str, Place]:
+        """Return the in-memory map, reading persisted places on first use."""
+        if self._places is None:
+            with self._lock:
+                if self._places is None:
+                    places = {}
+                    if self.disk_cache is not None:
+                        try:
+                            for key, row in self.disk_cache.places():
+                                places[key] = Place(*row)
+                        except Exception as e:
+                            print(f"Error reading geocode cache: {e}")
+                    self._places = places
+        return self._places
+
+    def get(self, query: str) -> Optional[Place]:
+        """Return the known place for a query, or None."""
+        place = self._loaded().get(place_key(query))
+        if place is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return place
+
+    def record(self, query: str, data: Dict) -> List[Tuple[str, Place]]:
+        """
+        Remember the place a query resolved to.
+
+        Args:
+            query: Place name as searched
+            data: Weather response for the query
+
+        Returns:
+            List of (key, place) entries that were added or changed, for
+            the caller to persist
+        """
+        place = place_from_response(data)
+        if place is None:
+            return []
+
+        keys = [place_key(query), place_key(f"{place.name},{place.country}")]
+        places = self._loaded()
+
+        changed = []
+        for key in dict.fromkeys(keys):
+            if key and places.get(key) != place:
+                places[key] = place
+                changed.append((key, place))
+        return changed
+
+    def save(self, entries: List[Tuple[str, Place]]):
+        """Persist recorded entries (blocking; run off the event loop)."""
+        if self.disk_cache is not None and entries:
+            self.disk_cache.put_places(entries)
+
+    def __len__(self):
+        return len(self._loaded())
@@ -0,0 +1,446 @@
+# history_store.py
+"""Append-only, crash-safe search history.
+
+History lives in memory as an insertion-ordered map keyed by normalized
+city name, so adding, moving or removing a search is O(1) however long
+the history grows. Every change is also appended to a JSON Lines journal
+by a background writer thread, so the event loop never waits on the disk:
+
+    {"op": "add", "city": "London", "timestamp": "2024-05-01T10:00:00"}
+    {"op": "remove", "city": "London"}
+    {"op": "clear"}
+
+Replaying the journal on start rebuilds the history; a torn last line
+from a crash is skipped and cut off before anything is appended. Once
+the journal holds many more lines than there are entries it is
+compacted: a snapshot is written to a temporary file and atomically
+renamed over the journal.
+
+Entries also count how often a city was searched and carry a frecency
+score: every search adds a weight that halves every
+``Config.HISTORY_HALF_LIFE_DAYS``. The score is stored as
+``log2(sum(2 ** (t / half_life)))`` over the search times ``t``, which
+orders entries exactly as the decayed weight does at any later moment,
+so the ranking never has to be recomputed as time passes. Two sorted
+lists index the entries, one by key for prefix search and one by score,
+and ``search()`` walks whichever is shorter for the query.
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config import Config
+
+
+class HistoryEntry(NamedTuple):
+    """One remembered search."""
+    city: str
+    timestamp: str  # ISO 8601, local time, of the latest search
+    count: int = 1  # times searched
+    score: float = 0.0  # log2 of the summed, time-scaled search weights
+
+
+def history_key(city: str) -> str:
+    """Normalize a city name so repeat searches share one entry."""
+    return " ".join(city.split()).casefold()
+
+
+def _half_life() -> float:
+    """Return the frecency half-life in seconds."""
+    return Config.HISTORY_HALF_LIFE_DAYS * 86400
+
+
+def _search_weight(timestamp: str) -> float:
+    """Return the log2 weight of one search made at ``timestamp``."""
+    try:
+        seconds = datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        seconds = 0.0
+    return seconds / _half_life()
+
+
+def _log2_add(a: float, b: float) -> float:
+    """Return ``log2(2 ** a + 2 ** b)`` without overflowing."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+class HistoryStore:
+    """Search history with an append-only journal on disk.
+
+    Args:
+        path: Journal file (JSON Lines)
+        legacy_path: Old ``search_history.json`` list to import once when
+            no journal exists yet
+        max_entries: Retention limit; the oldest searches beyond it are
+            dropped (defaults to Config.HISTORY_MAX_ENTRIES)
+        compact_min_lines: Journal lines tolerated before compaction is
+            considered (compaction runs once the journal also holds more
+            than twice as many lines as there are entries)
+    """
+
+    def __init__(
+        self,
+        path,
+        legacy_path=None,
+        max_entries: Optional[int] = None,
+        compact_min_lines: int = Config.HISTORY_COMPACT_MIN_LINES,
+    ):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else Config.HISTORY_MAX_ENTRIES
+        )
+        self.compact_min_lines = compact_min_lines
+        # Oldest first
+        self._entries: "OrderedDict[str, HistoryEntry]" = OrderedDict()
+        self._keys: List[str] = []  # sorted, for prefix search
+        self._ranked: List[Tuple[float, str]] = []  # (score, key), ascending
+        self._indexed = False  # indexes are built once the journal is replayed
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[int, Dict]]]" = queue.Queue()
+        self._seq = 0  # number of the last change applied in memory
+        # Changes up to here are in the compacted journal
+        self._snapshot_seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._journal_lines = 0
+
+        # Metrics
+        self.appended = 0
+        self.compactions = 0
+        self.skipped_lines = 0
+
+        self._load()
+
+    # ---------------- Loading ----------------
+
+    def _insert(self, key: str, entry: HistoryEntry):
+        """Add an entry to the map and both indexes."""
+        self._entries[key] = entry
+        if self._indexed:
+            bisect.insort(self._keys, key)
+            bisect.insort(self._ranked, (entry.score, key))
+
+    def _discard(self, key: str) -> Optional[HistoryEntry]:
+        """Remove an entry from the map and both indexes."""
+        entry = self._entries.pop(key, None)
+        if entry is not None and self._indexed:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            index = bisect.bisect_left(self._ranked, (entry.score, key))
+            del self._ranked[index]
+        return entry
+
+    def _build_indexes(self):
+        """Sort the replayed entries into both indexes."""
+        self._keys = sorted(self._entries)
+        self._ranked = sorted(
+            (entry.score, key) for key, entry in self._entries.items()
+        )
+        self._indexed = True
+
+    def _apply(self, record: Dict):
+        """Apply one journal record to the in-memory history.
+
+        An ``add`` record counts one more search, unless it carries
+        ``count`` and ``score`` (written by compaction), which replace the
+        entry's totals.
+        """
+        op = record.get("op")
+        if op == "add":
+            city = record["city"]
+            key = history_key(city)
+            timestamp = record.get("timestamp", "")
+            previous = self._entries.get(key)
+            if "count" in record:
+                count, score = int(record["count"]), float(record["score"])
+            elif previous is not None:
+                count = previous.count + 1
+                score = _log2_add(previous.score, _search_weight(timestamp))
+            else:
+                count, score = 1, _search_weight(timestamp)
+            self._discard(key)
+            self._insert(key, HistoryEntry(city, timestamp, count, score))
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+        elif op == "remove":
+            self._discard(history_key(record["city"]))
+        elif op == "clear":
+            self._entries.clear()
+            self._keys.clear()
+            self._ranked.clear()
+
+    def _load(self):
+        """Replay the journal, or import the legacy JSON list."""
+        try:
+            self._replay()
+        finally:
+            self._build_indexes()
+
+    def _replay(self):
+        """Rebuild the entries from the journal or the legacy JSON list."""
+        if self.path.exists():
+            try:
+                line, parsed, complete = b"", True, 0
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        self._journal_lines += 1
+                        try:
+                            self._apply(json.loads(line))
+                            parsed = True
+                        except (ValueError, KeyError, TypeError,
+                                AttributeError):
+                            self.skipped_lines += 1  # torn or corrupt line
+                            parsed = False
+                        if line.endswith(b"\n"):
+                            complete += len(line)
+                if line and not line.endswith(b"\n"):
+                    # A crash cut the last line short. End it or drop it, so
+                    # the next append starts a line instead of joining it
+                    if parsed:
+                        with open(self.path, "ab") as f:
+                            f.write(b"\n")
+                    else:
+                        os.truncate(self.path, complete)
+                        self._journal_lines -= 1
+            except OSError as e:
+                print(f"Error loading history: {e}")
+            return
+
+        if self.legacy_path and self.legacy_path.exists():
+            try:
+                with open(self.legacy_path, "r") as f:
+                    items = json.load(f)
+                for item in reversed(items):  # stored newest first
+                    if item.get("city"):
+                        self._apply({"op": "add", **item})
+            except Exception as e:
+                print(f"Error importing history: {e}")
+            if self._entries:
+                self._submit({"op": "compact"}, 0)
+
+    # ---------------- Queries ----------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def recent(self, limit: Optional[int] = None) -> List[HistoryEntry]:
+        """Return up to ``limit`` entries, most recent first."""
+        with self._lock:
+            entries = []
+            for entry in reversed(self._entries.values()):
+                if limit is not None and len(entries) >= limit:
+                    break
+                entries.append(entry)
+            return entries
+
+    def latest(self) -> Optional[HistoryEntry]:
+        """Return the most recent search, if any."""
+        recent = self.recent(1)
+        return recent[0] if recent else None
+
+    def get(self, city: str) -> Optional[HistoryEntry]:
+        """Return the entry for a city, if it was searched."""
+        return self._entries.get(history_key(city))
+
+    def search(self, prefix: str = "", limit: int = 10) -> List[HistoryEntry]:
+        """
+        Return the most useful past searches starting with a prefix.
+
+        Args:
+            prefix: Typed text (case and extra whitespace are ignored)
+            limit: Maximum number of results
+
+        Returns:
+            Matching entries, highest frecency first
+        """
+        key = history_key(prefix)
+        with self._lock:
+            low = bisect.bisect_left(self._keys, key)
+            high = (
+                bisect.bisect_left(self._keys, key + "\U0010ffff")
+                if key else len(self._keys)
+            )
+            if high - low <= limit * Config.HISTORY_SCAN_FACTOR:
+                # Few matches: rank them directly
+                keys = heapq.nlargest(
+                    limit,
+                    self._keys[low:high],
+                    key=lambda k: (self._entries[k].score, k),
+                )
+            else:
+                # Many matches: walk the ranking until enough of them match
+                keys = []
+                for _, ranked_key in reversed(self._ranked):
+                    if ranked_key.startswith(key):
+                        keys.append(ranked_key)
+                        if len(keys) == limit:
+                            break
+            return [self._entries[k] for k in keys]
+
+    # ---------------- Changes ----------------
+
+    def add(self, city: str, timestamp: Optional[str] = None) -> HistoryEntry:
+        """Record a search, moving the city to the front."""
+        record = {
+            "op": "add",
+            "city": city,
+            "timestamp": timestamp or datetime.now().isoformat(),
+        }
+        with self._lock:
+            seq = self._change(record)
+            entry = self._entries[history_key(city)]
+        self._submit(record, seq)
+        return entry
+
+    def remove(self, city: str) -> bool:
+        """Forget one city; return False if it was not in the history."""
+        with self._lock:
+            if history_key(city) not in self._entries:
+                return False
+            seq = self._change({"op": "remove", "city": city})
+        self._submit({"op": "remove", "city": city}, seq)
+        return True
+
+    def clear(self):
+        """Forget every search."""
+        with self._lock:
+            seq = self._change({"op": "clear"})
+        self._submit({"op": "clear"}, seq)
+
+    def _change(self, record: Dict) -> int:
+        """Apply a change and return its sequence number (lock held)."""
+        self._apply(record)
+        self._seq += 1
+        return self._seq
+
+    # ---------------- Writer thread ----------------
+
+    def _submit(self, record: Dict, seq: int):
+        """Queue a numbered record, starting the writer thread if needed."""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="history-writer", daemon=True
+                    )
+                    self._thread.start()
+        self._queue.put((seq, record))
+
+    def _run(self):
+        """Append queued records to the journal in batches."""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                stop = self._write(batch)
+            except Exception as e:
+                print(f"Error saving history: {e}")
+                stop = None in batch
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Optional[Tuple[int, Dict]]]) -> bool:
+        """Write one batch; return True if it asked the thread to stop."""
+        lines = []
+        compact = False
+        for item in batch:
+            if item is None:
+                continue
+            seq, record = item
+            if record.get("op") == "compact":
+                compact = True
+            elif seq <= self._snapshot_seq:
+                # Applied before the last compaction took its snapshot
+                continue
+            else:
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+
+        if lines:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.writelines(lines)
+            self._file.flush()
+            self._journal_lines += len(lines)
+            self.appended += len(lines)
+
+        threshold = max(self.compact_min_lines, 2 * len(self._entries))
+        if compact or self._journal_lines > threshold:
+            self.compact()
+
+        if None in batch:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+            return True
+        return False
+
+    def compact(self):
+        """Rewrite the journal as an atomic snapshot (writer thread only)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            # Changes still queued are already in the snapshot; writing them
+            # afterwards would count their searches twice
+            self._snapshot_seq = self._seq
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        temp = self.path.with_name(self.path.name + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(
+                    {
+                        "op": "add",
+                        "city": entry.city,
+                        "timestamp": entry.timestamp,
+                        "count": entry.count,
+                        "score": entry.score,
+                    },
+                    ensure_ascii=False,
+                ) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        self._journal_lines = len(entries)
+        self.compactions += 1
+
+    def flush(self):
+        """Block until every queued change has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Write pending changes, sync the journal and stop the writer."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def metrics(self) -> Dict:
+        """Return entry, journal and compaction counters."""
+        return {
+            "entries": len(self._entries),
+            "journal_lines": self._journal_lines,
+            "appended": self.appended,
+            "compactions": self.compactions,
+            "skipped_lines": self.skipped_lines,
+        }
@@ -2,16 +2,26 @@
 
 import flet as ft
 from weather_service import WeatherService
+from disk_cache import DiskCache
+from watchlist import WatchlistScheduler, load_watchlist
 from config import Config
-import json
-from pathlib import Path
-from weather_service import WeatherServiceError
+from weather_service import NotFoundError, WeatherServiceError
 import asyncio
 from datetime import datetime
-import speech_recognition as sr
-import pyttsx3
-import threading
-import pythoncom
+import voice
+import recognition
+from city_index import CityIndex
+from alerts import (
+    RULE_SEVERITY, SEVERITY_RANK, AlertTracker, analyze_weather, analyze_weather_batch,
+    diff_alerts,
+)
+from geocode import place_key
+from history_store import HistoryStore, history_key
+from preferences import PreferencesStore
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+from view_model import KeyedList, RenderStats, patch
+from update_scheduler import UpdateScheduler
 
 
 class WeatherAlert:
@@ -78,173 +88,33 @@ class WeatherAlert:
     
     @staticmethod
     def analyze_weather(weather_data: dict, use_celsius: bool = True) -> list:
-        """Analyze weather data and return list of alerts."""
-        alerts = []
-        
-        # Extract weather data
-        temp = weather_data.get("main", {}).get("temp", 0)
-        feels_like = weather_data.get("main", {}).get("feels_like", 0)
-        humidity = weather_data.get("main", {}).get("humidity", 0)
-        wind_speed = weather_data.get("wind", {}).get("speed", 0)
-        weather_main = weather_data.get("weather", [{}])[0].get("main", "").lower()
-        description = weather_data.get("weather", [{}])[0].get("description", "").lower()
-        visibility = weather_data.get("visibility", 10000) / 1000  # Convert to km
-        
-        # Convert to Fahrenheit if needed for comparison
-        if not use_celsius:
-            temp = (temp * 9/5) + 32
-            feels_like = (feels_like * 9/5) + 32
-        
-        # Extreme Heat (35°C / 95°F or higher)
-        threshold_heat = 35 if use_celsius else 95
-        if temp >= threshold_heat or feels_like >= threshold_heat:
-            recommendation = [
-                "Stay indoors during peak heat hours",
-                "Drink plenty of water",
-                "Avoid strenuous outdoor activities",
-                "Wear light, breathable clothing",
-                "Use sunscreen (SPF 30+)"
-            ]
-            alerts.append({
-                'type': 'extreme_heat',
-                'message': f"Temperature is {temp:.0f}°{'C' if use_celsius else 'F'}. Heat index may be dangerous.",
-                'recommendations': recommendation
-            })
-        
-        # Extreme Cold (below 0°C / 32°F)
-        threshold_cold = 0 if use_celsius else 32
-        if temp <= threshold_cold:
-            recommendation = [
-                "Bundle up in layers",
-                "Limit time outdoors",
-                "Protect exposed skin",
-                "Watch for signs of frostbite",
-                "Keep your home heated"
-            ]
-            alerts.append({
-                'type': 'extreme_cold',
-                'message': f"Temperature is {temp:.0f}°{'C' if use_celsius else 'F'}. Risk of hypothermia and frostbite.",
-                'recommendations': recommendation
-            })
-        
-        # High Wind (>15 m/s or ~34 mph)
-        if wind_speed > 15:
-            recommendation = [
-                "Secure loose objects outdoors",
-                "Avoid parking under trees",
-                "Drive carefully, especially high-profile vehicles",
-                "Stay away from coastlines"
-            ]
-            alerts.append({
-                'type': 'high_wind',
-                'message': f"High winds at {wind_speed:.1f} m/s. Potential for damage.",
-                'recommendations': recommendation
-            })
-        
-        # Thunderstorm
-        if weather_main == 'thunderstorm':
-            recommendation = [
-                "Stay indoors and away from windows",
-                "Unplug electronic devices",
-                "Avoid using corded phones",
-                "Do not take a bath or shower",
-                "Stay out of water and off boats"
-            ]
-            alerts.append({
-                'type': 'storm',
-                'message': "Thunderstorm conditions detected. Lightning and severe weather possible.",
-                'recommendations': recommendation
-            })
-        
-        # Heavy Rain
-        if weather_main == 'rain' and 'heavy' in description:
-            recommendation = [
-                "Avoid flooded areas",
-                "Drive carefully with headlights on",
-                "Stay informed about flash flood warnings",
-                "Keep emergency supplies handy"
-            ]
-            alerts.append({
-                'type': 'heavy_rain',
-                'message': "Heavy rainfall expected. Potential for flooding.",
-                'recommendations': recommendation
-            })
-        
-        # Snow
-        if weather_main == 'snow':
-            recommendation = [
-                "Drive slowly and carefully",
-                "Keep winter emergency kit in car",
-                "Clear walkways to prevent slips",
-                "Dress warmly in layers",
-                "Check on elderly neighbors"
-            ]
-            alerts.append({
-                'type': 'snow',
-                'message': "Snow conditions present. Travel may be hazardous.",
-                'recommendations': recommendation
-            })
-        
-        # High Humidity (>80%)
-        if humidity > 80:
-            recommendation = [
-                "Use dehumidifier indoors",
-                "Stay in air-conditioned spaces",
-                "Drink water regularly",
-                "Take cool showers",
-                "Avoid heavy exercise outdoors"
-            ]
-            alerts.append({
-                'type': 'high_humidity',
-                'message': f"Humidity at {humidity}%. May feel uncomfortable.",
-                'recommendations': recommendation
-            })
-        
-        # Poor Visibility (< 1 km)
-        if visibility < 1:
-            recommendation = [
-                "Use fog lights when driving",
-                "Reduce speed significantly",
-                "Increase following distance",
-                "Avoid unnecessary travel",
-                "Stay alert for other vehicles"
-            ]
-            alerts.append({
-                'type': 'poor_visibility',
-                'message': f"Visibility reduced to {visibility:.1f} km. Drive with caution.",
-                'recommendations': recommendation
-            })
-        
-        # General weather recommendations (no alert, just advice)
-        general_recommendations = []
-        
-        if weather_main == 'clear' and 10 <= (temp if use_celsius else (temp - 32) * 5/9) <= 30:
-            general_recommendations.append("Perfect weather! Great day for outdoor activities")
-            general_recommendations.append("Don't forget sunscreen")
-        
-        if weather_main == 'rain' and 'heavy' not in description:
-            general_recommendations.append("Bring an umbrella")
-            general_recommendations.append("Wear waterproof shoes")
-        
-        if weather_main == 'clouds':
-            general_recommendations.append("Comfortable conditions for outdoor activities")
-        
-        if 20 <= temp <= 28 and use_celsius:
-            general_recommendations.append("Pleasant temperature for walking")
-        
-        # Add general recommendations if no critical alerts
-        if not alerts and general_recommendations:
-            alerts.append({
-                'type': 'general',
-                'message': "Current conditions are favorable",
-                'recommendations': general_recommendations
-            })
-        
-        return alerts
+        """Analyze weather data and return list of alerts (see alerts.ALERT_RULES)."""
+        return analyze_weather(weather_data, use_celsius)
+    
+    @staticmethod
+    def analyze_many(payloads: list, use_celsius: bool = True) -> list:
+        """Analyze many payloads at once (e.g. the whole watchlist)."""
+        return analyze_weather_batch(payloads, use_celsius)
+
+
+class Theme(NamedTuple):
+    """Resolved (immutable) theme for one condition and time of day."""
+    bg_color: str
+    accent_color: str
+    text_color: str
+    card_bg: str
+    emoji: str
+    gradient: Tuple[str, str]
 
 
 class WeatherTheme:
-    """Weather condition themes with colors and icons."""
+    """Weather condition themes with colors and icons.
+    
+    ``THEMES`` and ``NIGHT_THEMES`` are the source palettes. They are
+    resolved once, at import, into a read-only ``LOOKUP`` table of shared
+    Theme objects keyed by (condition id or lower-cased condition name,
+    is_day), so picking a theme is a single dict lookup.
+    """
     
     THEMES = {
         # Clear/Sunny conditions
@@ -372,69 +242,211 @@ class WeatherTheme:
         }
     }
     
+    # Darker variants for night time; other conditions look the same at night
+    NIGHT_THEMES = {
+        'clear': {
+            'bg_color': '#2C3E50',
+            'accent_color': '#34495E',
+            'text_color': '#ECF0F1',
+            'card_bg': '#34495E',
+            'emoji': '🌙',
+            'gradient': ['#34495E', '#2C3E50']
+        },
+        'clouds': {
+            'bg_color': '#5D6D7E',
+            'text_color': '#ECF0F1',
+            'card_bg': '#7B8A9B',
+            'gradient': ['#7B8A9B', '#5D6D7E']
+        }
+    }
+    
+    # OpenWeatherMap condition ids and the condition group ("main") they belong to
+    CONDITION_IDS = {
+        **dict.fromkeys((200, 201, 202, 210, 211, 212, 221, 230, 231, 232), 'Thunderstorm'),
+        **dict.fromkeys((300, 301, 302, 310, 311, 312, 313, 314, 321), 'Drizzle'),
+        **dict.fromkeys((500, 501, 502, 503, 504, 511, 520, 521, 522, 531), 'Rain'),
+        **dict.fromkeys((600, 601, 602, 611, 612, 613, 615, 616, 620, 621, 622), 'Snow'),
+        701: 'Mist', 711: 'Smoke', 721: 'Haze', 731: 'Dust', 741: 'Fog',
+        751: 'Sand', 761: 'Dust', 762: 'Ash', 771: 'Squall', 781: 'Tornado',
+        800: 'Clear',
+        **dict.fromkeys((801, 802, 803, 804), 'Clouds'),
+    }
+    
+    LOOKUP = MappingProxyType({})
+    DEFAULT: Theme = None
+    
     @staticmethod
-    def get_theme(weather_condition: str, is_day: bool = True):
-        """Get theme based on weather condition."""
+    def match_key(weather_condition: str) -> str:
+        """Return the THEMES key whose name appears in a condition name."""
         condition = weather_condition.lower()
-        
-        # Check for specific conditions
-        for key in WeatherTheme.THEMES.keys():
+        for key in WeatherTheme.THEMES:
             if key in condition:
-                theme = WeatherTheme.THEMES[key].copy()
-                
-                # Adjust for night time (darker colors)
-                if not is_day and key in ['clear', 'clouds']:
-                    if key == 'clear':
-                        theme['bg_color'] = '#2C3E50'
-                        theme['accent_color'] = '#34495E'
-                        theme['text_color'] = '#ECF0F1'
-                        theme['card_bg'] = '#34495E'
-                        theme['emoji'] = '🌙'
-                        theme['gradient'] = ['#34495E', '#2C3E50']
-                    elif key == 'clouds':
-                        theme['bg_color'] = '#5D6D7E'
-                        theme['text_color'] = '#ECF0F1'
-                        theme['card_bg'] = '#7B8A9B'
-                        theme['gradient'] = ['#7B8A9B', '#5D6D7E']
-                
-                return theme
-        
-        return WeatherTheme.THEMES['default']
+                return key
+        return 'default'
+    
+    @classmethod
+    def build_lookup(cls):
+        """Resolve every palette and known condition into LOOKUP (run once)."""
+        resolved = {}
+        for key, palette in cls.THEMES.items():
+            for is_day in (True, False):
+                values = dict(palette)
+                if not is_day:
+                    values.update(cls.NIGHT_THEMES.get(key, {}))
+                values['gradient'] = tuple(values['gradient'])
+                resolved[key, is_day] = Theme(**values)
+        
+        table = dict(resolved)
+        for condition_id, main in cls.CONDITION_IDS.items():
+            for is_day in (True, False):
+                theme = resolved[cls.match_key(main), is_day]
+                table[condition_id, is_day] = theme
+                table[main.lower(), is_day] = theme
+        
+        cls.LOOKUP = MappingProxyType(table)
+        cls.DEFAULT = resolved['default', True]
+    
+    @staticmethod
+    def get_theme(weather_condition: str = "", is_day: bool = True,
+                  condition_id: Optional[int] = None) -> Theme:
+        """Get theme based on weather condition.
+        
+        Args:
+            weather_condition: Condition group, e.g. "Clouds"
+            is_day: Use the day palette (night palettes are darker)
+            condition_id: OpenWeatherMap condition id, preferred when given
+        
+        Returns:
+            Shared Theme; never copy or modify it
+        """
+        lookup = WeatherTheme.LOOKUP
+        theme = None if condition_id is None else lookup.get((condition_id, is_day))
+        if theme is None:
+            theme = lookup.get((weather_condition.lower(), is_day))
+        if theme is None:
+            # Unlisted condition name: fall back to matching palette names
+            theme = lookup[WeatherTheme.match_key(weather_condition), is_day]
+        return theme
+    
+    @staticmethod
+    def for_weather(weather_data: dict) -> Theme:
+        """Get the theme for a weather response (condition id, day/night icon)."""
+        weather = (weather_data.get("weather") or [{}])[0]
+        return WeatherTheme.get_theme(
+            weather.get("main", "Clear"),
+            'd' in weather.get("icon", "01d"),
+            weather.get("id"),
+        )
+
+
+WeatherTheme.build_lookup()
 
 
 class WeatherApp:
     """Main Weather Application class with dynamic themes and alerts."""
     
+    # Spoken often enough to be pre-rendered into the audio cache
+    FIXED_PHRASES = (
+        "Please say the city name",
+        "Please enter a city name",
+        "No speech detected. Please try again.",
+        "Could not understand. Please speak clearly.",
+        recognition.GoogleBackend.service_error_message,
+        recognition.VoskBackend.service_error_message,
+        "An error occurred while fetching weather data",
+    )
+    
+    # Longest wait for a spoken prompt before listening anyway
+    PROMPT_TIMEOUT = 6
+    
+    # Shared by every theme change instead of built per call
+    THEME_ANIMATION = ft.Animation(800, ft.AnimationCurve.EASE_IN_OUT)
+    
     def __init__(self, page: ft.Page):
         self.page = page
-        self.weather_service = WeatherService()
-        self.history_file = Path("search_history.json")
-        self.preferences_file = Path("user_preferences.json")
-        self.search_history = self.load_history()
-        self.preferences = self.load_preferences()
-        self.use_celsius = self.preferences.get("use_celsius", True)
+        self.weather_service = WeatherService(
+            disk_cache=DiskCache(
+                Config.DISK_CACHE_PATH,
+                max_bytes=Config.DISK_CACHE_MAX_BYTES,
+                max_age=Config.DISK_CACHE_MAX_AGE,
+            )
+        )
+        self.history = HistoryStore(Config.HISTORY_FILE, legacy_path=Config.HISTORY_LEGACY_FILE)
+        self.preferences = PreferencesStore(
+            Config.PREFERENCES_FILE,
+            defaults={"use_celsius": True, "dark_mode": False},
+        )
+        self.preferences.subscribe("use_celsius", self.on_unit_change)
+        self.preferences.subscribe("dark_mode", self.on_dark_mode_change)
         self.current_weather_data = None
-        self.current_theme = WeatherTheme.THEMES['default']
+        self.current_theme = WeatherTheme.DEFAULT
+        
+        # Controls built and updates sent, reset at the start of each search
+        self.render_stats = RenderStats()
+        self.last_render_stats = None
         
-        # Initialize speech recognition
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 4000
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8
+        # Page updates requested by handlers are sent at most once per frame
+        self.updates = UpdateScheduler(page, on_flush=self.render_stats.count_update)
+        self.weather_controls = {}
+        
+        # Alert cards by type, and per-city alert state for announcements
+        self.alert_cards = {}
+        self.displayed_alerts = []
+        self.alert_tracker = AlertTracker()
+        self.watchlist_alerts = AlertTracker()
+        
+        # Watchlist
+        self.watchlist_cities = load_watchlist(Config.WATCHLIST_FILE)
+        self.watchlist_cards = {}
+        self.watchlist = None
+        
+        # Bundled city list for suggestions and local spelling correction
+        self.city_index = CityIndex()
+        
+        # Speech recognition backend (created on first voice search)
+        self.recognizer = None
+        self.city_matcher = recognition.CityMatcher()
         self.is_listening = False
+        self.last_voice_trace = None
         
-        # TTS queue
-        self.tts_queue = asyncio.Queue()
+        # Priority TTS queue feeding one long-lived speech engine
+        self.tts_queue = voice.SpeechQueue(maxsize=4)
         self.tts_worker_started = False
+        self.speech_worker = voice.SpeechWorker(
+            rate=150,
+            volume=0.9,
+            audio_cache_dir=Config.SPEECH_CACHE_DIR,
+        )
         
         self.setup_page()
         self.build_ui()
+        
+        # First frame is on screen; load the voice stack off the UI path
+        voice.warm_up()
+        self.city_index.warm_up()
+        self.speech_worker.start()
+        self.speech_worker.prerender(self.FIXED_PHRASES)
+        
+        # Show last-known weather right away instead of waiting on the network
+        self.page.run_task(self.restore_last_session)
+        
+        # Refresh watched cities in the background
+        if self.watchlist_cities:
+            self.watchlist = WatchlistScheduler(
+                self.weather_service,
+                self.watchlist_cities,
+                on_change=self.update_watchlist_cards,
+                on_error=self.show_watchlist_error,
+            )
+            self.page.run_task(self.start_watchlist)
 
     
     def setup_page(self):
         """Configure page settings."""
         self.page.title = Config.APP_TITLE
-        self.page.theme_mode = ft.ThemeMode.LIGHT
+        self.page.theme_mode = (
+            ft.ThemeMode.DARK if self.preferences.get("dark_mode") else ft.ThemeMode.LIGHT
+        )
         self.page.padding = 0
         self.page.scroll = ft.ScrollMode.AUTO
         
@@ -443,22 +455,47 @@ class WeatherApp:
         self.page.window.height = Config.APP_HEIGHT
         self.page.window.resizable = False
         self.page.window.center()
+        
+        # Release pooled HTTP connections when the session ends
+        self.page.on_close = self.on_page_close
+
+
+    async def start_watchlist(self):
+        """Start the watchlist refresh task on the page's event loop."""
+        self.watchlist.start()
+
 
+    def on_page_close(self, e):
+        """Close the shared weather client when the page closes."""
+        if self.watchlist:
+            self.page.run_task(self.watchlist.stop)
+        self.page.run_task(self.weather_service.aclose)
+        self.speech_worker.close()
+        self.city_index.close()
+        self.history.close()
+        self.preferences.close()
 
-    def apply_theme(self, theme: dict, animate: bool = True):
+
+    def update_page(self):
+        """Mark the page dirty; changes are sent with the next frame's update."""
+        self.render_stats.updates_requested += 1
+        self.updates.mark_dirty()
+    
+    
+    def apply_theme(self, theme: Theme, animate: bool = True):
         """Apply weather theme to the page (respects light/dark mode)."""
+        if theme is self.current_theme:
+            return  # themes are shared instances; nothing to change
         self.current_theme = theme
         
         # Only update weather container background, not the main page background
         # Update weather container with themed color
         if hasattr(self, 'weather_container'):
+            self.weather_container.bgcolor = theme.card_bg
             if animate:
-                self.weather_container.bgcolor = theme['card_bg']
-                self.weather_container.animate = ft.Animation(800, ft.AnimationCurve.EASE_IN_OUT)
-            else:
-                self.weather_container.bgcolor = theme['card_bg']
+                self.weather_container.animate = self.THEME_ANIMATION
         
-        self.page.update()
+        self.update_page()
 
 
     def build_ui(self):
@@ -473,7 +510,7 @@ class WeatherApp:
 
         # Theme toggle button
         self.theme_button = ft.IconButton(
-            icon=ft.Icons.DARK_MODE,
+            icon=ft.Icons.LIGHT_MODE if self.preferences.get("dark_mode") else ft.Icons.DARK_MODE,
             tooltip="Toggle theme",
             on_click=self.toggle_theme,
         )
@@ -503,9 +540,13 @@ class WeatherApp:
             prefix_icon=ft.Icons.LOCATION_CITY,
             autofocus=True,
             on_submit=self.on_search,
+            on_change=self.on_city_input_change,
             expand=True,
         )
         
+        # As-you-type city suggestions
+        self.suggestion_list = ft.Column(spacing=0, visible=False)
+        
         # Voice input button
         self.voice_button = ft.IconButton(
             icon=ft.Icons.MIC,
@@ -548,11 +589,12 @@ class WeatherApp:
         
         # Search history section
         self.history_expanded = False
+        self.history_filter = ""
         self.expand_icon = ft.IconButton(
             icon=ft.Icons.EXPAND_MORE,
             tooltip="Show history",
             icon_size=20,
-            icon_color=self.current_theme['text_color'],
+            icon_color=self.current_theme.text_color,
             on_click=self.toggle_history,
         )
         
@@ -591,6 +633,12 @@ class WeatherApp:
         
         # History items list
         self.history_list = ft.Column(spacing=5)
+        self.history_rows = KeyedList(
+            self.history_list,
+            build=self.create_history_item,
+            update=self.render_history_item,
+            stats=self.render_stats,
+        )
         
         self.history_dropdown = ft.Container(
             content=ft.Column(
@@ -619,8 +667,9 @@ class WeatherApp:
         
         # Weather display container
         self.weather_container = ft.Container(
+            content=self.create_weather_card(),
             visible=False,
-            bgcolor=self.current_theme['card_bg'],
+            bgcolor=self.current_theme.card_bg,
             border_radius=10,
             padding=20,
             animate=ft.Animation(800, ft.AnimationCurve.EASE_IN_OUT),
@@ -636,6 +685,31 @@ class WeatherApp:
         # Loading indicator
         self.loading = ft.ProgressRing(visible=False)
         
+        # Watchlist dashboard (one stable card per city)
+        self.watchlist_list = ft.Column(
+            [self.create_watchlist_card(city) for city in self.watchlist_cities],
+            spacing=8,
+        )
+        self.watchlist_section = ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Icon(ft.Icons.STAR, size=20, color=ft.Colors.BLUE_700),
+                        ft.Text(
+                            "Watchlist",
+                            size=16,
+                            weight=ft.FontWeight.BOLD,
+                            color=ft.Colors.BLUE_700,
+                        ),
+                    ],
+                    spacing=8,
+                ),
+                self.watchlist_list,
+            ],
+            spacing=10,
+            visible=bool(self.watchlist_cities),
+        )
+        
         # Title row
         title_row = ft.Row(
             [
@@ -658,6 +732,7 @@ class WeatherApp:
                     title_row,
                     ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
                     search_input_row,
+                    self.suggestion_list,
                     self.voice_status,
                     self.search_button,
                     self.history_header,
@@ -667,6 +742,7 @@ class WeatherApp:
                     self.error_message,
                     self.alert_container,  # Alerts appear above weather
                     self.weather_container,
+                    self.watchlist_section,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=10,
@@ -681,6 +757,162 @@ class WeatherApp:
         self.update_history_display()
 
 
+    def on_city_input_change(self, e):
+        """Show city suggestions and matching past searches for the text typed so far."""
+        self.update_suggestions(self.city_input.value)
+        self.update_history_display(self.city_input.value or "")
+    
+    
+    def create_suggestion_item(self, city, label: str = None) -> ft.Container:
+        """Create a clickable suggestion row that searches for a city."""
+        return ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(ft.Icons.LOCATION_ON, size=16, color=ft.Colors.BLUE_600),
+                    ft.Text(label or city.label, size=14, color=ft.Colors.BLUE_900),
+                ],
+                spacing=8,
+            ),
+            bgcolor=ft.Colors.BLUE_50,
+            padding=ft.padding.symmetric(horizontal=15, vertical=8),
+            on_click=lambda e, c=city: self.select_suggestion(c),
+            ink=True,
+        )
+    
+    
+    def update_suggestions(self, text: str):
+        """Render suggestions from the local city index."""
+        self.suggestion_list.controls = [
+            self.create_suggestion_item(city)
+            for city in (self.city_index.suggest(text.strip()) if text.strip() else [])
+        ]
+        self.suggestion_list.visible = bool(self.suggestion_list.controls)
+        self.update_page()
+    
+    
+    def show_did_you_mean(self, city):
+        """Offer a close match for a city the weather service did not find."""
+        self.suggestion_list.controls = [
+            self.create_suggestion_item(city, f"Did you mean {city.label}?")
+        ]
+        self.suggestion_list.visible = True
+        self.update_page()
+    
+    
+    def select_suggestion(self, city):
+        """Search for a suggested city."""
+        self.city_input.value = city.query
+        self.update_suggestions("")
+        self.page.run_task(self.get_weather)
+    
+    
+    def create_watchlist_card(self, city: str) -> ft.Container:
+        """Create a watchlist card whose controls are updated in place."""
+        controls = {
+            'emoji': ft.Text("🌍", size=28),
+            'city': ft.Text(
+                city,
+                size=14,
+                weight=ft.FontWeight.W_500,
+                color=ft.Colors.BLUE_900,
+            ),
+            'description': ft.Text("Loading...", size=12, color=ft.Colors.GREY_600),
+            'alerts': ft.Text("", size=16, visible=False),
+            'temp': ft.Text(
+                "--",
+                size=20,
+                weight=ft.FontWeight.BOLD,
+                color=ft.Colors.BLUE_900,
+            ),
+        }
+        
+        card = ft.Container(
+            content=ft.Row(
+                [
+                    controls['emoji'],
+                    ft.Column(
+                        [controls['city'], controls['description']],
+                        spacing=2,
+                        expand=True,
+                    ),
+                    controls['alerts'],
+                    controls['temp'],
+                ],
+                spacing=12,
+            ),
+            bgcolor=ft.Colors.BLUE_50,
+            border_radius=10,
+            padding=12,
+            on_click=lambda e, c=city: self.search_from_history(c),
+            ink=True,
+            animate=ft.Animation(400, ft.AnimationCurve.EASE_IN_OUT),
+        )
+        controls['card'] = card
+        self.watchlist_cards[city] = controls
+        return card
+    
+    
+    def render_watchlist_card(self, city: str, data: dict):
+        """Patch a watchlist card's controls with new weather data."""
+        controls = self.watchlist_cards.get(city)
+        if not controls or not data:
+            return
+        
+        weather = data.get("weather", [{}])[0]
+        temp = data.get("main", {}).get("temp", 0)
+        if not self.use_celsius:
+            temp = self.celsius_to_fahrenheit(temp)
+        theme = WeatherTheme.for_weather(data)
+        
+        controls['emoji'].value = theme.emoji
+        controls['city'].value = f"{data.get('name', city)}, {data.get('sys', {}).get('country', '')}"
+        controls['description'].value = weather.get("description", "").title()
+        controls['temp'].value = f"{temp:.0f}{'°C' if self.use_celsius else '°F'}"
+        controls['card'].bgcolor = theme.card_bg
+    
+    
+    def update_watchlist_cards(self, entries: list):
+        """Re-render only the watchlist cards whose data changed."""
+        for entry in entries:
+            self.render_watchlist_card(entry.city, entry.data)
+        
+        # Alert badges only change when a city's alerts were raised or cleared
+        payloads = [entry.data for entry in entries]
+        for entry, alerts in zip(entries, WeatherAlert.analyze_many(payloads, self.use_celsius)):
+            diff = self.watchlist_alerts.update(entry.city, alerts)
+            if diff.notable:
+                self.render_watchlist_alerts(entry.city)
+        self.update_page()
+    
+    
+    def render_watchlist_alerts(self, city: str):
+        """Show the icons of a watchlist city's active alerts on its card."""
+        controls = self.watchlist_cards.get(city)
+        if not controls:
+            return
+        active = self.watchlist_alerts.get(city)
+        controls['alerts'].value = "".join(
+            WeatherAlert.ALERT_TYPES.get(alert['type'], {}).get('icon', '⚠️') for alert in active
+        )
+        controls['alerts'].tooltip = ", ".join(
+            WeatherAlert.ALERT_TYPES.get(alert['type'], {}).get('title', 'WEATHER ADVISORY').title()
+            for alert in active
+        )
+        controls['alerts'].visible = bool(active)
+    
+    
+    def show_watchlist_error(self, entry):
+        """Mark a watchlist card whose refresh failed."""
+        controls = self.watchlist_cards.get(entry.city)
+        if not controls:
+            return
+        if entry.data is None:
+            controls['description'].value = f"⚠️ {entry.error}"
+        else:
+            controls['description'].value = "⚠️ Update failed, showing last data"
+        self.update_page()
+    
+    
     def create_alert_card(self, alert: dict) -> ft.Container:
         """Create a visual alert card."""
         alert_type = alert.get('type', 'general')
@@ -815,106 +1047,155 @@ class WeatherApp:
         return alert_card
 
 
-    def display_alerts(self, alerts: list):
-        """Display weather alerts."""
-        self.alert_container.controls.clear()
+    def create_tips_card(self, general_alert: dict) -> ft.Container:
+        """Create the weather tips card for general recommendations."""
+        rec_chips = []
+        for rec in general_alert.get('recommendations', []):
+            rec_chips.append(
+                ft.Container(
+                    content=ft.Row(
+                        [
+                            ft.Icon(ft.Icons.LIGHTBULB_OUTLINE, size=16, color=ft.Colors.BLUE_700),
+                            ft.Text(rec, size=13, color=ft.Colors.BLUE_900),
+                        ],
+                        spacing=8,
+                    ),
+                    bgcolor=ft.Colors.BLUE_50,
+                    border_radius=20,
+                    padding=ft.padding.symmetric(horizontal=15, vertical=8),
+                    border=ft.border.all(1, ft.Colors.BLUE_200),
+                )
+            )
         
-        if not alerts:
-            self.alert_container.visible = False
-            return
+        if not rec_chips:
+            return None
         
-        # Create alert cards
-        for alert in alerts:
-            alert_card = self.create_alert_card(alert)
-            if alert_card:
-                self.alert_container.controls.append(alert_card)
-        
-        # Show general recommendations if present
-        general_alert = next((a for a in alerts if a.get('type') == 'general'), None)
-        if general_alert and general_alert.get('recommendations'):
-            rec_chips = []
-            for rec in general_alert['recommendations']:
-                rec_chips.append(
-                    ft.Container(
-                        content=ft.Row(
-                            [
-                                ft.Icon(ft.Icons.LIGHTBULB_OUTLINE, size=16, color=ft.Colors.BLUE_700),
-                                ft.Text(rec, size=13, color=ft.Colors.BLUE_900),
-                            ],
-                            spacing=8,
-                        ),
-                        bgcolor=ft.Colors.BLUE_50,
-                        border_radius=20,
-                        padding=ft.padding.symmetric(horizontal=15, vertical=8),
-                        border=ft.border.all(1, ft.Colors.BLUE_200),
-                    )
-                )
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(
+                        "💡 Weather Tips",
+                        size=16,
+                        weight=ft.FontWeight.BOLD,
+                        color=ft.Colors.BLUE_800,
+                    ),
+                    ft.Row(
+                        rec_chips,
+                        wrap=True,
+                        spacing=10,
+                        run_spacing=10,
+                    ),
+                ],
+                spacing=10,
+            ),
+            bgcolor=ft.Colors.BLUE_50,
+            border_radius=12,
+            padding=15,
+            margin=ft.margin.only(top=5),
+        )
+
+
+    def display_alerts(self, alerts: list):
+        """Display weather alerts.
+        
+        Cards are kept per alert type and only the alerts that were added,
+        changed or cleared since the last call are rebuilt; a refresh that
+        raises the same alerts leaves the cards untouched.
+        
+        Returns:
+            alerts.AlertDiff against the previously displayed alerts
+        """
+        diff = diff_alerts(self.displayed_alerts, alerts)
+        self.displayed_alerts = list(alerts)
+        
+        if diff:
+            for alert in diff.removed:
+                self.alert_cards.pop(alert.get('type'), None)
+            for alert in diff.added + diff.changed:
+                if alert.get('type') == 'general':
+                    card = self.create_tips_card(alert)
+                else:
+                    card = self.create_alert_card(alert)
+                self.alert_cards[alert.get('type')] = self.render_stats.created(card)
             
-            if rec_chips:
-                self.alert_container.controls.append(
-                    ft.Container(
-                        content=ft.Column(
-                            [
-                                ft.Text(
-                                    "💡 Weather Tips",
-                                    size=16,
-                                    weight=ft.FontWeight.BOLD,
-                                    color=ft.Colors.BLUE_800,
-                                ),
-                                ft.Row(
-                                    rec_chips,
-                                    wrap=True,
-                                    spacing=10,
-                                    run_spacing=10,
-                                ),
-                            ],
-                            spacing=10,
-                        ),
-                        bgcolor=ft.Colors.BLUE_50,
-                        border_radius=12,
-                        padding=15,
-                        margin=ft.margin.only(top=5),
-                    )
-                )
+            # Alert cards first, in rule order, then the tips card
+            self.alert_container.controls = [
+                self.alert_cards[alert.get('type')]
+                for alert in sorted(alerts, key=lambda a: a.get('type') == 'general')
+                if self.alert_cards.get(alert.get('type'))
+            ]
         
         self.alert_container.visible = len(self.alert_container.controls) > 0
-        self.page.update()
+        self.update_page()
+        return diff
 
 
-    def speak(self, text):
-        """Convert text to speech."""
+    def speak(self, text, kind: str = "readout", supersede: bool = False):
+        """Convert text to speech.
+        
+        ``kind`` sets the message priority (see voice.SpeechQueue). With
+        ``supersede`` the new text replaces anything still queued or
+        playing (e.g. a new search makes the old readout stale).
+        
+        Returns an asyncio future that resolves when the text has been
+        spoken (True) or dropped (False).
+        """
         if not self.tts_worker_started:
             self.tts_worker_started = True
             self.page.run_task(self.tts_worker)
         
-        asyncio.create_task(self.tts_queue.put(text))
+        if supersede:
+            self.tts_queue.clear()
+            self.speech_worker.cancel()
+        
+        return self.tts_queue.put(text, kind)
     
     
     async def tts_worker(self):
         """Worker that processes TTS requests."""
         while True:
+            done = None
             try:
-                text = await self.tts_queue.get()
-                await asyncio.to_thread(self._speak_sync, text)
-                self.tts_queue.task_done()
-                await asyncio.sleep(0.3)
+                kind, text, done = await self.tts_queue.get()
+                # Fixed prompts repeat; readouts and alerts are one-offs
+                future = self.speech_worker.say(text, cache=text in self.FIXED_PHRASES)
+                spoken = await asyncio.wrap_future(future)
+                if not done.done():
+                    done.set_result(spoken)
             except Exception as e:
                 print(f"TTS Worker Error: {e}")
+                if done is not None and not done.done():
+                    done.set_result(False)
     
     
-    def _speak_sync(self, text):
-        """Synchronous speech function."""
-        try:
-            pythoncom.CoInitialize()
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 150)
-            engine.setProperty('volume', 0.9)
-            engine.say(text)
-            engine.runAndWait()
-            engine.stop()
-            pythoncom.CoUninitialize()
-        except Exception as e:
-            print(f"TTS Error: {e}")
+    def get_recognizer(self):
+        """Create the configured recognition backend on first use."""
+        if self.recognizer is None:
+            self.recognizer = recognition.create_backend()
+        return self.recognizer
+    
+    
+    def known_cities(self):
+        """Return city names a voice search can match early."""
+        cities = [entry.city for entry in self.history.search("", Config.HISTORY_DISPLAY_LIMIT)]
+        return cities + list(self.watchlist_cities)
+    
+    
+    def on_partial_transcript(self, text: str, loop):
+        """Handle a partial hypothesis from the recognizer thread.
+        
+        Returns:
+            The matched city, which ends listening early, or None
+        """
+        loop.call_soon_threadsafe(self.show_partial_transcript, text)
+        return self.city_matcher.match(text)
+    
+    
+    def show_partial_transcript(self, text: str):
+        """Show what has been heard so far."""
+        if self.is_listening:
+            self.voice_status.value = f"🎤 Heard: {text}"
+            self.update_page()
 
 
     def start_voice_input(self, e):
@@ -927,19 +1208,42 @@ class WeatherApp:
     async def listen_for_voice(self):
         """Listen for voice input."""
         self.is_listening = True
+        trace = voice.LatencyTrace()
+        readout = None
         
         self.voice_button.icon = ft.Icons.MIC_NONE
         self.voice_button.icon_color = ft.Colors.RED_700
         self.voice_button.disabled = True
         self.voice_status.value = "🎤 Listening... Speak now!"
         self.voice_status.visible = True
-        self.page.update()
+        self.update_page()
         
-        await asyncio.sleep(0.3)
-        self.speak("Please say the city name")
-        await asyncio.sleep(1.5)
+        try:
+            await asyncio.to_thread(voice.load)
+        except ImportError as e:
+            self.voice_status.value = f"❌ Voice input unavailable: {e}"
+            self.is_listening = False
+            self.voice_button.icon = ft.Icons.MIC
+            self.voice_button.icon_color = ft.Colors.BLUE_700
+            self.voice_button.disabled = False
+            self.update_page()
+            return
         
         try:
+            # Inside the try, so a bad backend setting still resets the button
+            recognizer = self.get_recognizer()
+            self.city_matcher.update(self.known_cities())
+            trace.mark("voice stack")
+            
+            # Start listening once the prompt has finished playing, so the
+            # microphone does not pick it up
+            prompt = self.speak("Please say the city name", kind="prompt")
+            try:
+                await asyncio.wait_for(asyncio.shield(prompt), self.PROMPT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            trace.mark("prompt")
+            
             try:
                 import pyaudio
             except ImportError:
@@ -949,62 +1253,44 @@ class WeatherApp:
                 print(error_msg)
                 return
             
-            with sr.Microphone() as source:
-                print("Adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                
-                print("Listening for speech...")
-                audio = await asyncio.to_thread(
-                    self.recognizer.listen,
-                    source,
-                    timeout=10,
-                    phrase_time_limit=10
-                )
-            
-            self.voice_status.value = "🔄 Processing speech to text..."
-            self.page.update()
-            
-            print("Converting speech to text...")
-            city_name = await asyncio.to_thread(
-                self.recognizer.recognize_google,
-                audio
+            # Partial hypotheses that name a known city end listening early
+            loop = asyncio.get_running_loop()
+            transcript = await asyncio.to_thread(
+                recognizer.listen,
+                lambda text: self.on_partial_transcript(text, loop),
+                trace,
             )
             
-            print(f"Recognized city: {city_name}")
-            city_name = city_name.title()
+            print(f"Recognized city: {transcript}")
+            city_name = self.city_matcher.match(transcript) or transcript.title()
             
             self.city_input.value = city_name
             self.voice_status.value = f"✓ Recognized: {city_name}"
-            self.page.update()
-            
-            await asyncio.sleep(0.3)
-            self.speak(f"Searching weather for {city_name}")
-            await asyncio.sleep(2)
+            self.update_page()
             
-            await self.get_weather()
+            # Search right away; the readout supersedes this prompt
+            self.speak(f"Searching weather for {city_name}", kind="prompt")
+            readout = await self.get_weather(trace)
             
-        except sr.WaitTimeoutError:
+        except recognition.SpeechTimeoutError:
             error_msg = "No speech detected. Please try again."
             self.voice_status.value = f"⏱️ {error_msg}"
             self.voice_status.visible = True
-            await asyncio.sleep(0.3)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
             print("Timeout: No speech detected")
             
-        except sr.UnknownValueError:
+        except recognition.SpeechNotUnderstoodError:
             error_msg = "Could not understand. Please speak clearly."
             self.voice_status.value = f"❓ {error_msg}"
             self.voice_status.visible = True
-            await asyncio.sleep(0.3)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
             print("Error: Speech not understood")
             
-        except sr.RequestError as e:
-            error_msg = "Speech service error. Check your internet."
+        except recognition.RecognitionServiceError as e:
+            error_msg = self.recognizer.service_error_message
             self.voice_status.value = f"❌ {error_msg}"
             self.voice_status.visible = True
-            await asyncio.sleep(0.3)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
             print(f"Request error: {e}")
             
         except Exception as e:
@@ -1015,33 +1301,66 @@ class WeatherApp:
         
         finally:
             self.is_listening = False
+            self.last_voice_trace = trace
+            if readout is None:
+                print(trace.report())
+            else:
+                readout.add_done_callback(lambda _: self.finish_voice_trace(trace))
             self.voice_button.icon = ft.Icons.MIC
             self.voice_button.icon_color = ft.Colors.BLUE_700
             self.voice_button.disabled = False
-            self.page.update()
+            self.update_page()
             
             await asyncio.sleep(5)
             self.voice_status.visible = False
-            self.page.update()
+            self.update_page()
 
 
+    def finish_voice_trace(self, trace):
+        """Record the spoken readout and log the finished voice search trace."""
+        trace.mark("speak")
+        print(trace.report())
+
+
+    @property
+    def use_celsius(self) -> bool:
+        """Current temperature unit preference."""
+        return self.preferences.get("use_celsius")
+    
+    
     def toggle_theme(self, e):
         """Toggle between light and dark theme."""
-        if self.page.theme_mode == ft.ThemeMode.LIGHT:
+        self.preferences.set("dark_mode", not self.preferences.get("dark_mode"))
+    
+    
+    def on_dark_mode_change(self, key: str, dark: bool):
+        """Apply the light/dark preference."""
+        if dark:
             self.page.theme_mode = ft.ThemeMode.DARK
             self.theme_button.icon = ft.Icons.LIGHT_MODE
         else:
             self.page.theme_mode = ft.ThemeMode.LIGHT
             self.theme_button.icon = ft.Icons.DARK_MODE
-        self.page.update()
+        self.update_page()
 
     
     def toggle_temperature_unit(self, e):
         """Toggle between Celsius and Fahrenheit."""
-        self.use_celsius = self.temp_toggle.value
-        self.save_preferences()
+        self.preferences.set("use_celsius", self.temp_toggle.value)
+    
+    
+    def on_unit_change(self, key: str, use_celsius: bool):
+        """Re-render temperatures in the new unit."""
+        self.temp_toggle.value = use_celsius
+        
+        if self.watchlist:
+            for entry in self.watchlist.entries.values():
+                self.render_watchlist_card(entry.city, entry.data)
+            self.update_page()
         
         if self.current_weather_data:
+            # Only alerts that quote a temperature are rebuilt
+            self.display_alerts(WeatherAlert.analyze_weather(self.current_weather_data, self.use_celsius))
             self.page.run_task(self.display_weather, self.current_weather_data)
     
     
@@ -1050,60 +1369,10 @@ class WeatherApp:
         return (celsius * 9/5) + 32
     
     
-    def load_preferences(self):
-        """Load user preferences."""
-        if self.preferences_file.exists():
-            try:
-                with open(self.preferences_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    
-    def save_preferences(self):
-        """Save user preferences."""
-        try:
-            self.preferences["use_celsius"] = self.use_celsius
-            with open(self.preferences_file, 'w') as f:
-                json.dump(self.preferences, f, indent=2)
-        except Exception as e:
-            print(f"Error saving preferences: {e}")
-
-
-    def load_history(self):
-        """Load search history."""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    
-    def save_history(self):
-        """Save search history."""
-        try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.search_history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving history: {e}")
-    
-    
     def add_to_history(self, city: str):
-        """Add city to history."""
-        self.search_history = [item for item in self.search_history 
-                               if item.get('city', '').lower() != city.lower()]
-        
-        self.search_history.insert(0, {
-            'city': city,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        self.search_history = self.search_history[:10]
-        self.save_history()
-        self.update_history_display()
+        """Add city to history (written to the journal in the background)."""
+        self.history.add(city)
+        self.update_history_display("")
     
     
     def toggle_history(self, e):
@@ -1113,101 +1382,118 @@ class WeatherApp:
         if self.history_expanded:
             self.expand_icon.icon = ft.Icons.EXPAND_LESS
             self.history_dropdown.visible = True
-            self.history_dropdown.height = min(300, len(self.search_history) * 70 + 30)
+            self.history_dropdown.height = min(300, len(self.history_list.controls) * 70 + 30)
         else:
             self.expand_icon.icon = ft.Icons.EXPAND_MORE
             self.history_dropdown.height = 0
         
-        self.page.update()
+        self.update_page()
+    
+    
+    def create_history_item(self, entry) -> ft.Container:
+        """Create a history row; its controls are kept in the row's data."""
+        controls = {
+            'city': ft.Text(
+                "",
+                size=14,
+                weight=ft.FontWeight.W_500,
+                color=ft.Colors.BLUE_900,
+            ),
+            'time': ft.Text(
+                "",
+                size=11,
+                color=ft.Colors.GREY_600,
+            ),
+        }
+        
+        return ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(
+                        ft.Icons.LOCATION_ON,
+                        size=16,
+                        color=ft.Colors.BLUE_600,
+                    ),
+                    ft.Column(
+                        [controls['city'], controls['time']],
+                        spacing=2,
+                        expand=True,
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.CLOSE,
+                        icon_size=16,
+                        tooltip="Remove from history",
+                        on_click=lambda e: self.remove_from_history(controls['city'].value),
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            bgcolor=ft.Colors.WHITE,
+            border_radius=8,
+            padding=10,
+            on_click=lambda e: self.search_from_history(controls['city'].value),
+            ink=True,
+            data=controls,
+        )
     
     
-    def update_history_display(self):
-        """Update history display."""
-        self.history_list.controls.clear()
+    def render_history_item(self, row: ft.Container, entry):
+        """Patch a history row with its history_store.HistoryEntry."""
+        try:
+            dt = datetime.fromisoformat(entry.timestamp)
+            time_str = dt.strftime("%b %d, %I:%M %p")
+        except:
+            time_str = ""
+        if entry.count > 1:
+            time_str = f"{time_str} · {entry.count} searches" if time_str else f"{entry.count} searches"
+        
+        controls = row.data
+        patch(controls['city'], self.render_stats, value=entry.city)
+        patch(controls['time'], self.render_stats, value=time_str, visible=bool(time_str))
+    
+    
+    def update_history_display(self, prefix: Optional[str] = None):
+        """
+        Show past searches, most frequent and recent first, reusing rows.
+        
+        Args:
+            prefix: Only list cities starting with this text; None keeps
+                the current filter
+        """
+        if prefix is not None:
+            self.history_filter = prefix
+        self.history_rows.render(
+            self.history.search(self.history_filter, Config.HISTORY_DISPLAY_LIMIT),
+            key=lambda entry: history_key(entry.city),
+        )
         
-        if not self.search_history:
+        if not len(self.history):
             self.history_header.visible = False
             self.history_dropdown.visible = False
-            self.page.update()
-            return
-        
-        self.history_header.visible = True
-        
-        for item in self.search_history:
-            city = item.get('city', '')
-            timestamp = item.get('timestamp', '')
-            
-            try:
-                dt = datetime.fromisoformat(timestamp)
-                time_str = dt.strftime("%b %d, %I:%M %p")
-            except:
-                time_str = ""
-            
-            history_item = ft.Container(
-                content=ft.Row(
-                    [
-                        ft.Icon(
-                            ft.Icons.LOCATION_ON,
-                            size=16,
-                            color=ft.Colors.BLUE_600,
-                        ),
-                        ft.Column(
-                            [
-                                ft.Text(
-                                    city,
-                                    size=14,
-                                    weight=ft.FontWeight.W_500,
-                                    color=ft.Colors.BLUE_900,
-                                ),
-                                ft.Text(
-                                    time_str,
-                                    size=11,
-                                    color=ft.Colors.GREY_600,
-                                ) if time_str else ft.Container(),
-                            ],
-                            spacing=2,
-                            expand=True,
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.CLOSE,
-                            icon_size=16,
-                            tooltip="Remove from history",
-                            on_click=lambda e, c=city: self.remove_from_history(c),
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                ),
-                bgcolor=ft.Colors.WHITE,
-                border_radius=8,
-                padding=10,
-                on_click=lambda e, c=city: self.search_from_history(c),
-                ink=True,
-            )
-            
-            self.history_list.controls.append(history_item)
+        else:
+            self.history_header.visible = True
+            if self.history_expanded:
+                self.history_dropdown.height = min(300, len(self.history_list.controls) * 70 + 30)
         
-        self.page.update()
+        self.update_page()
     
     
     def search_from_history(self, city: str):
         """Search from history."""
         self.city_input.value = city
-        self.page.update()
+        self.update_page()
         self.page.run_task(self.get_weather)
     
     
     def remove_from_history(self, city: str):
         """Remove from history."""
-        self.search_history = [item for item in self.search_history 
-                               if item.get('city', '').lower() != city.lower()]
-        self.save_history()
+        self.history.remove(city)
         self.update_history_display()
     
     
     def clear_history(self, e):
         """Clear all history."""
-        self.search_history = []
-        self.save_history()
+        self.history.clear()
         self.update_history_display()
     
     
@@ -1216,37 +1502,45 @@ class WeatherApp:
         self.page.run_task(self.get_weather)
 
 
-    async def get_weather(self):
-        """Fetch and display weather."""
+    async def get_weather(self, trace=None):
+        """Fetch and display weather.
+        
+        Args:
+            trace: Optional voice.LatencyTrace to record fetch and render
+                stages in
+        
+        Returns:
+            Future for the spoken readout, or None if the search failed
+        """
+        self.render_stats.reset()
         city = self.city_input.value.strip()
         
         if not city:
             error_msg = "Please enter a city name"
             self.show_error(error_msg)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
             return
         
         self.loading.visible = True
         self.error_message.visible = False
         self.weather_container.visible = False
         self.alert_container.visible = False
-        self.page.update()
+        if not self.is_listening:
+            self.voice_status.visible = False
+        self.suggestion_list.visible = False
+        self.update_page()
         
         try:
             weather_data = await self.weather_service.get_weather(city)
+            if trace:
+                trace.mark("fetch")
             self.current_weather_data = weather_data
             
             actual_city_name = weather_data.get("name", city)
             self.add_to_history(actual_city_name)
             
-            # Get weather condition and apply theme
-            weather_condition = weather_data.get("weather", [{}])[0].get("main", "Clear")
-            icon_code = weather_data.get("weather", [{}])[0].get("icon", "01d")
-            is_day = 'd' in icon_code
-            
-            # Get and apply appropriate theme
-            theme = WeatherTheme.get_theme(weather_condition, is_day)
-            self.apply_theme(theme, animate=True)
+            # Get and apply the theme for the weather condition
+            self.apply_theme(WeatherTheme.for_weather(weather_data), animate=True)
             
             # Analyze weather and get alerts
             alerts = WeatherAlert.analyze_weather(weather_data, self.use_celsius)
@@ -1256,6 +1550,8 @@ class WeatherApp:
             
             # Display weather
             await self.display_weather(weather_data)
+            if trace:
+                trace.mark("render")
             
             # Voice feedback with alert info
             temp_celsius = weather_data.get("main", {}).get("temp", 0)
@@ -1275,153 +1571,193 @@ class WeatherApp:
                 f"Humidity {humidity} percent."
             )
             
-            # Add alert info to voice feedback
-            critical_alerts = [a for a in alerts if a.get('type') != 'general']
-            if critical_alerts:
-                alert_count = len(critical_alerts)
-                feedback += f" Warning: {alert_count} weather alert{'s' if alert_count > 1 else ''} detected. Please check the screen for details."
+            readout = self.speak(feedback, supersede=True)
+            
+            # Alert info is spoken ahead of the routine readout, but only
+            # when alerts were raised, changed or cleared since this city's
+            # last check
+            announcement = self.describe_alert_changes(
+                actual_city_name,
+                self.alert_tracker.update(self.alert_key(weather_data), alerts),
+            )
+            if announcement:
+                self.speak(announcement, kind="alert")
             
-            await asyncio.sleep(0.5)
-            self.speak(feedback)
+            return readout
+        
+        except NotFoundError as e:
+            error_msg = str(e)
+            self.show_error(error_msg)
+            # Only now consult the local list, and let the user decide
+            suggestion = self.city_index.correct(city)
+            if suggestion:
+                self.show_did_you_mean(suggestion)
+                error_msg += f" Did you mean {suggestion.name}?"
+            self.speak(error_msg, kind="error")
         
         except WeatherServiceError as e:
             error_msg = str(e)
             self.show_error(error_msg)
-            await asyncio.sleep(0.3)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
 
         except Exception as e:
             error_msg = "An error occurred while fetching weather data"
             self.show_error(str(e))
-            await asyncio.sleep(0.3)
-            self.speak(error_msg)
+            self.speak(error_msg, kind="error")
         
         finally:
             self.loading.visible = False
-            self.page.update()
+            self.update_page()
+            self.updates.flush()  # the result paints now, not a frame later
+            self.last_render_stats = self.render_stats.snapshot()
     
     
-    async def display_weather(self, data: dict):
-        """Display weather information with themed styling."""
-        # Extract data
-        city_name = data.get("name", "Unknown")
-        country = data.get("sys", {}).get("country", "")
-        temp_celsius = data.get("main", {}).get("temp", 0)
-        feels_like_celsius = data.get("main", {}).get("feels_like", 0)
-        humidity = data.get("main", {}).get("humidity", 0)
-        description = data.get("weather", [{}])[0].get("description", "").title()
-        weather_main = data.get("weather", [{}])[0].get("main", "Clear")
-        icon_code = data.get("weather", [{}])[0].get("icon", "01d")
-        wind_speed = data.get("wind", {}).get("speed", 0)
-        pressure = data.get("main", {}).get("pressure", 0)
-        cloudiness = data.get("clouds", {}).get("all", 0)
+    @staticmethod
+    def alert_key(data: dict) -> str:
+        """Key alert state by the place a response is for."""
+        return place_key(f"{data.get('name', '')},{data.get('sys', {}).get('country', '')}")
+    
+    
+    @staticmethod
+    def describe_alert_changes(city: str, diff) -> str:
+        """Return the spoken summary of an AlertDiff, or '' if nothing changed.
+        
+        New alerts are announced (with the new alert level when it rose),
+        then alerts whose details changed (e.g. the heat got worse), then
+        cleared alerts.
+        """
+        parts = []
+        if diff.added:
+            count = len(diff.added)
+            parts.append(
+                f"Warning: {count} new weather alert{'s' if count > 1 else ''} "
+                f"detected for {city}."
+            )
+            if diff.escalated:
+                level = max(
+                    (RULE_SEVERITY.get(alert['type'], 'low') for alert in diff.added),
+                    key=SEVERITY_RANK.get,
+                )
+                parts.append(f"Alert level is now {level}.")
+        for alert in diff.changed:
+            title = WeatherAlert.ALERT_TYPES.get(alert['type'], {}).get('title', 'WEATHER ADVISORY')
+            parts.append(f"{title.title()} for {city} updated: {alert['message']}")
+        if diff.added or diff.changed:
+            parts.append("Please check the screen for details.")
+        elif diff.removed:
+            count = len(diff.removed)
+            parts.append(f"{count} weather alert{'s' if count > 1 else ''} cleared for {city}.")
+        return " ".join(parts)
+    
+    
+    async def restore_last_session(self):
+        """Paint cached weather, then compact the disk cache in the background."""
+        await self.show_last_known_weather()
+        if self.weather_service.disk_cache is not None:
+            await asyncio.to_thread(self.weather_service.disk_cache.compact)
+    
+    
+    async def show_last_known_weather(self):
+        """Display cached weather for the most recent search, if any."""
+        latest = self.history.latest()
+        if latest is None:
+            return
         
-        # Get weather emoji
-        is_day = 'd' in icon_code
-        theme = WeatherTheme.get_theme(weather_main, is_day)
-        weather_emoji = theme['emoji']
+        cached = self.weather_service.get_last_known(latest.city)
+        if not cached:
+            return
         
-        # Convert temperature
-        if self.use_celsius:
-            temp = temp_celsius
-            feels_like = feels_like_celsius
-            unit = "°C"
-        else:
-            temp = self.celsius_to_fahrenheit(temp_celsius)
-            feels_like = self.celsius_to_fahrenheit(feels_like_celsius)
-            unit = "°F"
+        weather_data, fetched_at = cached
+        self.current_weather_data = weather_data
         
-        # Build weather display with themed colors
-        self.weather_container.content = ft.Column(
+        self.apply_theme(WeatherTheme.for_weather(weather_data), animate=False)
+        self.display_alerts(WeatherAlert.analyze_weather(weather_data, self.use_celsius))
+        await self.display_weather(weather_data)
+        
+        updated = datetime.fromtimestamp(fetched_at).strftime("%b %d, %I:%M %p")
+        self.voice_status.value = f"🕒 Last updated {updated}"
+        self.voice_status.visible = True
+        self.update_page()
+    
+    
+    def create_weather_card(self) -> ft.Column:
+        """Build the weather card once; display_weather patches its controls."""
+        controls = {
+            'emoji': ft.Text("", size=80),
+            'location': ft.Text(
+                "",
+                size=24,
+                weight=ft.FontWeight.BOLD,
+                color=self.current_theme.text_color,
+            ),
+            'icon': ft.Image(
+                src="https://openweathermap.org/img/wn/01d@2x.png",
+                width=100,
+                height=100,
+            ),
+            'description': ft.Text(
+                "",
+                size=20,
+                italic=True,
+                color=self.current_theme.text_color,
+            ),
+            'temp': ft.Text(
+                "",
+                size=48,
+                weight=ft.FontWeight.BOLD,
+                color=ft.Colors.BLUE_900,
+            ),
+            'feels_like': ft.Text(
+                "",
+                size=16,
+                color=ft.Colors.GREY_700,
+            ),
+            'divider': ft.Divider(color=self.current_theme.accent_color),
+        }
+        
+        humidity = self.create_info_card(ft.Icons.WATER_DROP, "Humidity", "", ft.Colors.BLUE_400)
+        wind = self.create_info_card(ft.Icons.AIR, "Wind Speed", "", ft.Colors.CYAN_400)
+        pressure = self.create_info_card(ft.Icons.COMPRESS, "Pressure", "", ft.Colors.PURPLE_400)
+        cloudiness = self.create_info_card(ft.Icons.CLOUD, "Cloudiness", "", ft.Colors.BLUE_GREY_400)
+        for name, card in (('humidity', humidity), ('wind', wind),
+                           ('pressure', pressure), ('cloudiness', cloudiness)):
+            controls[name] = card.content.controls[2]  # the value text
+        self.weather_controls = controls
+        
+        card = ft.Column(
             [
                 # Weather emoji banner
                 ft.Container(
-                    content=ft.Text(
-                        weather_emoji,
-                        size=80,
-                    ),
+                    content=controls['emoji'],
                     alignment=ft.alignment.center,
                     padding=10,
                 ),
                 
                 # Location
-                ft.Text(
-                    f"{city_name}, {country}",
-                    size=24,
-                    weight=ft.FontWeight.BOLD,
-                    color=self.current_theme['text_color'],
-                ),
+                controls['location'],
                 
                 # Weather description with icon
                 ft.Row(
-                    [
-                        ft.Image(
-                            src=f"https://openweathermap.org/img/wn/{icon_code}@2x.png",
-                            width=100,
-                            height=100,
-                        ),
-                        ft.Text(
-                            description,
-                            size=20,
-                            italic=True,
-                            color=self.current_theme['text_color'],
-                        ),
-                    ],
+                    [controls['icon'], controls['description']],
                     alignment=ft.MainAxisAlignment.CENTER,
                 ),
                 
                 # Temperature
-                ft.Text(
-                    f"{temp:.1f}{unit}",
-                    size=48,
-                    weight=ft.FontWeight.BOLD,
-                    color=ft.Colors.BLUE_900,
-                ),
+                controls['temp'],
+                controls['feels_like'],
                 
-                ft.Text(
-                    f"Feels like {feels_like:.1f}{unit}",
-                    size=16,
-                    color=ft.Colors.GREY_700,
-                ),
-                
-                ft.Divider(color=self.current_theme['accent_color']),
+                controls['divider'],
                 
                 # Additional info - First row
                 ft.Row(
-                    [
-                        self.create_info_card(
-                            ft.Icons.WATER_DROP,
-                            "Humidity",
-                            f"{humidity}%",
-                            ft.Colors.BLUE_400,
-                        ),
-                        self.create_info_card(
-                            ft.Icons.AIR,
-                            "Wind Speed",
-                            f"{wind_speed} m/s",
-                            ft.Colors.CYAN_400,
-                        ),
-                    ],
+                    [humidity, wind],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=20,
                 ),
                 
                 # Additional info - Second row
                 ft.Row(
-                    [
-                        self.create_info_card(
-                            ft.Icons.COMPRESS,
-                            "Pressure",
-                            f"{pressure} hPa",
-                            ft.Colors.PURPLE_400,
-                        ),
-                        self.create_info_card(
-                            ft.Icons.CLOUD,
-                            "Cloudiness",
-                            f"{cloudiness}%",
-                            ft.Colors.BLUE_GREY_400,
-                        ),
-                    ],
+                    [pressure, cloudiness],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=20,
                 ),
@@ -1429,22 +1765,74 @@ class WeatherApp:
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             spacing=10,
         )
+        return self.render_stats.created(card)
+    
+    
+    async def display_weather(self, data: dict):
+        """Display weather information with themed styling.
+        
+        The card's controls are built once; each call only patches the
+        properties that changed, so Flet sends a small diff instead of a
+        new control tree.
+        """
+        # Extract data
+        city_name = data.get("name", "Unknown")
+        country = data.get("sys", {}).get("country", "")
+        temp_celsius = data.get("main", {}).get("temp", 0)
+        feels_like_celsius = data.get("main", {}).get("feels_like", 0)
+        humidity = data.get("main", {}).get("humidity", 0)
+        description = data.get("weather", [{}])[0].get("description", "").title()
+        icon_code = data.get("weather", [{}])[0].get("icon", "01d")
+        wind_speed = data.get("wind", {}).get("speed", 0)
+        pressure = data.get("main", {}).get("pressure", 0)
+        cloudiness = data.get("clouds", {}).get("all", 0)
+        
+        # Convert temperature
+        if self.use_celsius:
+            temp = temp_celsius
+            feels_like = feels_like_celsius
+            unit = "°C"
+        else:
+            temp = self.celsius_to_fahrenheit(temp_celsius)
+            feels_like = self.celsius_to_fahrenheit(feels_like_celsius)
+            unit = "°F"
+        
+        # Patch the card with themed colors
+        controls = self.weather_controls
+        theme = self.current_theme
+        stats = self.render_stats
+        patch(controls['emoji'], stats, value=WeatherTheme.for_weather(data).emoji)
+        patch(controls['location'], stats, value=f"{city_name}, {country}", color=theme.text_color)
+        patch(controls['icon'], stats, src=f"https://openweathermap.org/img/wn/{icon_code}@2x.png")
+        patch(controls['description'], stats, value=description, color=theme.text_color)
+        patch(controls['temp'], stats, value=f"{temp:.1f}{unit}")
+        patch(controls['feels_like'], stats, value=f"Feels like {feels_like:.1f}{unit}")
+        patch(controls['divider'], stats, color=theme.accent_color)
+        patch(controls['humidity'], stats, value=f"{humidity}%")
+        patch(controls['wind'], stats, value=f"{wind_speed} m/s")
+        patch(controls['pressure'], stats, value=f"{pressure} hPa")
+        patch(controls['cloudiness'], stats, value=f"{cloudiness}%")
         
         # Update container background
-        self.weather_container.bgcolor = self.current_theme['card_bg']
+        patch(self.weather_container, stats, bgcolor=theme.card_bg)
+        self.error_message.visible = False
+        
+        if self.weather_container.visible and self.weather_container.opacity == 1:
+            # Already on screen (e.g. unit toggle): one update, no fade
+            self.update_page()
+            return
         
         # Animate container appearance
         self.weather_container.animate_opacity = 300
         self.weather_container.opacity = 0
         self.weather_container.visible = True
-        self.page.update()
-
-        # Fade in
-        await asyncio.sleep(0.1)
+        self.update_page()
+        
+        # Fade in: paint the transparent frame now so that the opacity
+        # change goes out in a later frame and animates
+        self.updates.flush()
         self.weather_container.opacity = 1
-        self.page.update()
-
-        self.error_message.visible = False
+        self.update_page()
     
     
     def create_info_card(self, icon, label, value, icon_color):
@@ -1490,7 +1878,7 @@ class WeatherApp:
         self.error_message.visible = True
         self.weather_container.visible = False
         self.alert_container.visible = False
-        self.page.update()
+        self.update_page()
 
 
 def main(page: ft.Page):
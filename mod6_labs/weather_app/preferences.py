@@ -0,0 +1,185 @@
+# preferences.py
+"""User preferences kept in memory and saved to disk in the background.
+
+``PreferencesStore`` is the single owner of the preferences file: it is
+read once, every change is applied in memory and announced to
+subscribers straight away, and the file is rewritten only after changes
+have settled for ``save_delay`` seconds. Ten rapid toggles therefore cost
+one write, made on a timer thread rather than the UI loop, and a write
+that would not change the file is skipped. Writes go to a temporary file
+that is atomically renamed over the old one, so a crash never leaves a
+half-written file behind.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+Subscriber = Callable[[str, Any], None]
+
+
+class PreferencesStore:
+    """In-memory preferences with debounced, atomic persistence."""
+
+    def __init__(
+        self,
+        path,
+        defaults: Optional[Dict[str, Any]] = None,
+        save_delay: float = Config.PREFERENCES_SAVE_DELAY,
+    ):
+        """
+        Args:
+            path: JSON file the preferences are stored in
+            defaults: Values used for keys missing from the file
+            save_delay: Seconds without changes before the file is written
+        """
+        self.path = Path(path)
+        self.defaults = dict(defaults or {})
+        self.save_delay = save_delay
+        self._values: Dict[str, Any] = {}
+        self._subscribers: Dict[Optional[str], List[Subscriber]] = {}
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._saved: Optional[str] = None
+
+        # Metrics
+        self.changes = 0
+        self.writes = 0
+
+        self._load()
+
+    def _load(self):
+        """Read the preferences file once."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+            values = json.loads(text)
+            if isinstance(values, dict):
+                self._values = values
+                self._saved = self._serialize(values)
+        except Exception as e:
+            print(f"Error loading preferences: {e}")
+
+    @staticmethod
+    def _serialize(values: Dict[str, Any]) -> str:
+        """Return the file contents for a set of values."""
+        return json.dumps(values, indent=2, sort_keys=True)
+
+    # ---------------- Values ----------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a preference, falling back to the defaults."""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+        return self.defaults.get(key, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of every preference, defaults included."""
+        with self._lock:
+            return {**self.defaults, **self._values}
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Change a preference.
+
+        Subscribers are notified before this returns; the file is written
+        later (see ``save_delay``).
+
+        Returns:
+            False if the value was already set
+        """
+        with self._lock:
+            if key in self._values and self._values[key] == value:
+                return False
+            self._values[key] = value
+            self.changes += 1
+            subscribers = self._subscribers.get(key, []) + self._subscribers.get(None, [])
+            self._schedule_save()
+
+        for callback in subscribers:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"Error in preferences subscriber: {e}")
+        return True
+
+    def subscribe(self, key: Optional[str], callback: Subscriber) -> Callable[[], None]:
+        """
+        Call ``callback(key, value)`` whenever a preference changes.
+
+        Args:
+            key: Preference to watch, or None for every preference
+            callback: Called on the thread that made the change
+
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+    # ---------------- Persistence ----------------
+
+    def _schedule_save(self):
+        """(Re)start the debounce timer; call with the lock held."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        Write pending changes now (blocking).
+
+        Returns:
+            True if the file was written, False if it was already current
+        """
+        # Serialize under the write lock so an older snapshot can never be
+        # written after a newer one
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                text = self._serialize(self._values)
+                if text == self._saved:
+                    return False
+
+            temp = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(temp, "w") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp, self.path)
+            except Exception as e:
+                print(f"Error saving preferences: {e}")
+                return False
+            self._saved = text
+            self.writes += 1
+        return True
+
+    def close(self):
+        """Write pending changes and stop the debounce timer."""
+        self.flush()
+
+    def metrics(self) -> Dict:
+        """Return change and write counters."""
+        return {"changes": self.changes, "writes": self.writes}
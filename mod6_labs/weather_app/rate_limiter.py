@@ -0,0 +1,239 @@
+# rate_limiter.py
+"""Client-side token-bucket rate limiting for OpenWeatherMap requests."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+
+class TokenBucket:
+    """In-process token bucket.
+
+    Tokens refill at ``rate`` per second up to ``burst``. ``reserve()``
+    takes a token immediately and returns how long the caller must wait
+    for it, so queued callers are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, tokens: float, updated_at: float, now: float) -> float:
+        """Return the token count after refilling up to now."""
+        return min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Reserve one token.
+
+        Args:
+            timeout: Longest acceptable wait in seconds (None waits forever)
+
+        Returns:
+            Seconds to wait before using the token, or None if the wait
+            would exceed the timeout (nothing is reserved in that case)
+        """
+        with self._lock:
+            now = self.clock()
+            tokens = self._refill(self._tokens, self._updated_at, now)
+            wait = max(0.0, (1 - tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens = tokens - 1
+            self._updated_at = now
+            return wait
+
+    def peek_wait(self) -> float:
+        """Return the wait a new caller would face right now."""
+        with self._lock:
+            tokens = self._refill(self._tokens, self._updated_at, self.clock())
+            return max(0.0, (1 - tokens) / self.rate)
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state lives in SQLite so processes share a quota.
+
+    Each reservation runs inside an ``IMMEDIATE`` transaction, which holds
+    the database write lock, so concurrent processes see a consistent
+    token count. Wall-clock time is used because it is shared between
+    processes.
+    """
+
+    def __init__(self, path, rate: float, burst: int, name: str = "openweathermap"):
+        super().__init__(rate, burst, clock=time.time)
+        self.path = Path(path)
+        self.name = name
+        self._conn = sqlite3.connect(
+            str(self.path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO rate_limit VALUES (?, ?, ?)",
+            (self.name, float(self.burst), self.clock()),
+        )
+
+    def _load(self):
+        """Read the shared bucket state (call inside a transaction)."""
+        return self._conn.execute(
+            "SELECT tokens, updated_at FROM rate_limit WHERE name = ?",
+            (self.name,),
+        ).fetchone()
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Reserve one token from the shared bucket (see TokenBucket.reserve)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored_tokens, updated_at = self._load()
+                now = self.clock()
+                tokens = self._refill(stored_tokens, updated_at, now)
+                wait = max(0.0, (1 - tokens) / self.rate)
+                if timeout is not None and wait > timeout:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                self._conn.execute(
+                    "UPDATE rate_limit SET tokens = ?, updated_at = ? WHERE name = ?",
+                    (tokens - 1, now, self.name),
+                )
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def peek_wait(self) -> float:
+        """Return the wait a new caller would face right now."""
+        with self._lock:
+            stored_tokens, updated_at = self._load()
+            tokens = self._refill(stored_tokens, updated_at, self.clock())
+            return max(0.0, (1 - tokens) / self.rate)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a token cannot be obtained within the timeout."""
+    pass
+
+
+class RateLimiter:
+    """Async front-end that queues callers on a token bucket.
+
+    Callers wait for their reserved token instead of bursting past the
+    quota, and give up with ``RateLimitTimeout`` if the wait would be
+    longer than ``timeout``.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        timeout: Optional[float] = Config.RATE_LIMIT_TIMEOUT,
+    ):
+        self.bucket = bucket
+        self.timeout = timeout
+        self._sleep = asyncio.sleep
+
+        # Metrics
+        self.acquired = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    @classmethod
+    def from_config(cls) -> "RateLimiter":
+        """Build a limiter from Config, shared across processes if configured."""
+        if Config.RATE_LIMIT_SHARED_PATH:
+            bucket = SharedTokenBucket(
+                Config.RATE_LIMIT_SHARED_PATH,
+                Config.RATE_LIMIT_PER_SECOND,
+                Config.RATE_LIMIT_BURST,
+            )
+        else:
+            bucket = TokenBucket(Config.RATE_LIMIT_PER_SECOND, Config.RATE_LIMIT_BURST)
+        return cls(bucket)
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait for a token.
+
+        Args:
+            timeout: Override for the maximum wait in seconds
+
+        Raises:
+            RateLimitTimeout: If the wait would exceed the timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if isinstance(self.bucket, SharedTokenBucket):
+            wait = await asyncio.to_thread(self.bucket.reserve, timeout)
+        else:
+            wait = self.bucket.reserve(timeout)
+
+        if wait is None:
+            self.timeouts += 1
+            raise RateLimitTimeout(
+                f"Rate limit wait exceeds {timeout:.1f}s"
+            )
+
+        self.acquired += 1
+        self.last_wait = wait
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await self._sleep(wait)
+            finally:
+                self.waiting -= 1
+
+    def current_wait(self) -> float:
+        """Return the wait in seconds a new request would face now."""
+        return self.bucket.peek_wait()
+
+    def metrics(self) -> Dict:
+        """Return rate limiter metrics."""
+        return {
+            "current_wait": self.current_wait(),
+            "last_wait": self.last_wait,
+            "max_wait": self.max_wait,
+            "average_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "timeouts": self.timeouts,
+        }
+
+    def close(self):
+        """Release the shared bucket, if any."""
+        if isinstance(self.bucket, SharedTokenBucket):
+            self.bucket.close()
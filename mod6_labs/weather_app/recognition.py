@@ -0,0 +1,335 @@
+# recognition.py
+"""Pluggable speech recognition backends for voice search.
+
+Each backend listens on the microphone and returns the recognized text.
+``GoogleBackend`` wraps ``speech_recognition`` and the Google Web Speech
+API (one network round-trip after the phrase ends). ``VoskBackend`` runs
+an offline Vosk model and streams partial hypotheses while the user is
+still speaking; ``CityMatcher`` checks those partials against known city
+names so the search can start as soon as the city is unambiguous.
+
+Backends are blocking and meant to be run with ``asyncio.to_thread``.
+Their modules are imported on first use, like the rest of the voice stack.
+"""
+
+import importlib
+import json
+from abc import ABC, abstractmethod
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+import voice
+from config import Config
+
+
+class RecognitionError(Exception):
+    """Base exception for speech recognition failures."""
+    pass
+
+
+class SpeechTimeoutError(RecognitionError):
+    """Raised when no speech starts before the listen timeout."""
+    pass
+
+
+class SpeechNotUnderstoodError(RecognitionError):
+    """Raised when speech was heard but could not be transcribed."""
+    pass
+
+
+class RecognitionServiceError(RecognitionError):
+    """Raised when the recognition engine or service is unavailable."""
+    pass
+
+
+def normalize(text: str) -> str:
+    """Lower-case text and collapse punctuation and whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class CityMatcher:
+    """Match (partial) transcripts against known city names.
+
+    A transcript matches when it equals a known city and no other known
+    city continues it (``"new"`` waits for ``"new york"``), so matching a
+    growing partial hypothesis never commits to a city too early.
+    """
+
+    def __init__(self, cities: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._names = {}
+        self._keys = []
+        self.update(cities)
+
+    def update(self, cities: Iterable[str]):
+        """Replace the known city names."""
+        names = {}
+        for city in cities:
+            key = normalize(city)
+            if key:
+                names.setdefault(key, city)
+        with self._lock:
+            self._names = names
+            self._keys = sorted(names)
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Return the known city a transcript names unambiguously.
+
+        Args:
+            text: Partial or final transcript
+
+        Returns:
+            Canonical city name, or None if there is no unambiguous match
+        """
+        key = normalize(text)
+        with self._lock:
+            city = self._names.get(key)
+            if city is None:
+                return None
+            # Any longer name starting with "<key> " sorts right after it
+            index = bisect_left(self._keys, key + " ")
+            if index < len(self._keys) and self._keys[index].startswith(key + " "):
+                return None
+            return city
+
+
+class RecognitionBackend(ABC):
+    """Interface for speech recognition backends."""
+
+    name = "base"
+    # Shown and spoken when listen() raises RecognitionServiceError
+    service_error_message = "Speech service error. Please try again."
+
+    def __init__(
+        self,
+        timeout: float = Config.SPEECH_LISTEN_TIMEOUT,
+        phrase_time_limit: float = Config.SPEECH_PHRASE_LIMIT,
+    ):
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+
+    @abstractmethod
+    def listen(
+        self,
+        on_partial: Optional[Callable[[str], Optional[str]]] = None,
+        trace: Optional[voice.LatencyTrace] = None,
+    ) -> str:
+        """
+        Listen for one phrase and return its transcript.
+
+        Args:
+            on_partial: Called with each hypothesis; returning a city name
+                ends listening early with that name as the result
+            trace: Optional latency trace to record stages in
+
+        Returns:
+            Recognized text
+
+        Raises:
+            SpeechTimeoutError: If nobody spoke in time
+            SpeechNotUnderstoodError: If the speech could not be transcribed
+            RecognitionServiceError: If the engine or service failed
+        """
+
+
+class GoogleBackend(RecognitionBackend):
+    """Online recognition through the Google Web Speech API.
+
+    The microphone's ambient-noise calibration is kept for
+    ``calibration_max_age`` seconds instead of being redone for a full
+    second on every press; the recognizer's dynamic threshold keeps
+    adapting in between.
+    """
+
+    name = "google"
+    service_error_message = "Speech service error. Check your internet."
+
+    def __init__(
+        self,
+        calibration_max_age: float = Config.SPEECH_CALIBRATION_MAX_AGE,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.calibration_max_age = calibration_max_age
+        self.calibrated_at: Optional[float] = None
+        self.recognizer = None
+
+    def get_recognizer(self):
+        """Create the speech recognizer on first use."""
+        if self.recognizer is None:
+            sr = voice.load().sr
+            self.recognizer = sr.Recognizer()
+            self.recognizer.energy_threshold = 4000
+            self.recognizer.dynamic_energy_threshold = True
+            self.recognizer.pause_threshold = 0.8
+        return self.recognizer
+
+    def needs_calibration(self) -> bool:
+        """Return True if the ambient-noise level should be measured again."""
+        return (
+            self.calibrated_at is None
+            or time.monotonic() - self.calibrated_at > self.calibration_max_age
+        )
+
+    def listen(self, on_partial=None, trace=None) -> str:
+        """Listen for one phrase (see RecognitionBackend.listen)."""
+        sr = voice.load().sr
+        recognizer = self.get_recognizer()
+
+        try:
+            with sr.Microphone() as source:
+                if self.needs_calibration():
+                    print("Adjusting for ambient noise...")
+                    recognizer.adjust_for_ambient_noise(source, duration=1)
+                    self.calibrated_at = time.monotonic()
+                if trace:
+                    trace.mark("calibrate")
+
+                print("Listening for speech...")
+                audio = recognizer.listen(
+                    source,
+                    timeout=self.timeout,
+                    phrase_time_limit=self.phrase_time_limit,
+                )
+                if trace:
+                    trace.mark("listen")
+
+            print("Converting speech to text...")
+            text = recognizer.recognize_google(audio)
+            if trace:
+                trace.mark("recognize")
+        except sr.WaitTimeoutError as e:
+            raise SpeechTimeoutError("No speech detected") from e
+        except sr.UnknownValueError as e:
+            raise SpeechNotUnderstoodError("Speech not understood") from e
+        except sr.RequestError as e:
+            raise RecognitionServiceError(str(e)) from e
+
+        if on_partial:
+            return on_partial(text) or text
+        return text
+
+
+class VoskBackend(RecognitionBackend):
+    """Offline recognition with a local Vosk model.
+
+    Audio is fed to the recognizer in small chunks while it is captured,
+    so partial hypotheses are available during speech and there is no
+    network round-trip at the end. The model is loaded once and reused.
+    """
+
+    name = "vosk"
+    service_error_message = "Offline speech model unavailable. Check VOSK_MODEL_PATH."
+    SAMPLE_RATE = 16000
+    CHUNK_FRAMES = 4000  # 0.25 s of audio per read
+
+    def __init__(self, model_path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.model_path = model_path
+        self._model = None
+
+    def get_model(self):
+        """Load the Vosk model on first use."""
+        if self._model is None:
+            if self.model_path is None:
+                self.model_path = Config.VOSK_MODEL_PATH
+            if not self.model_path:
+                raise RecognitionServiceError(
+                    "No Vosk model configured. Set VOSK_MODEL_PATH."
+                )
+            try:
+                vosk = importlib.import_module("vosk")
+            except ImportError as e:
+                raise RecognitionServiceError(
+                    "Vosk is not installed. Please install it using: pip install vosk"
+                ) from e
+            vosk.SetLogLevel(-1)
+            self._model = vosk.Model(self.model_path)
+        return self._model
+
+    def listen(self, on_partial=None, trace=None) -> str:
+        """Listen for one phrase (see RecognitionBackend.listen)."""
+        model = self.get_model()
+        vosk = importlib.import_module("vosk")
+        pyaudio = importlib.import_module("pyaudio")
+        recognizer = vosk.KaldiRecognizer(model, self.SAMPLE_RATE)
+        if trace:
+            trace.mark("calibrate")  # model load; Vosk needs no calibration
+
+        audio = pyaudio.PyAudio()
+        stream = audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=self.CHUNK_FRAMES,
+        )
+        print("Listening for speech...")
+        started = time.monotonic()
+        heard_at = None
+        last_partial = ""
+        text = ""
+        try:
+            while True:
+                data = stream.read(self.CHUNK_FRAMES, exception_on_overflow=False)
+                if recognizer.AcceptWaveform(data):
+                    text = json.loads(recognizer.Result()).get("text", "")
+                    if text:
+                        break
+                else:
+                    partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                    if partial and partial != last_partial:
+                        last_partial = partial
+                        heard_at = heard_at or time.monotonic()
+                        city = on_partial(partial) if on_partial else None
+                        if city:
+                            if trace:
+                                trace.mark("listen")
+                            return city
+
+                now = time.monotonic()
+                if heard_at is None and now - started > self.timeout:
+                    raise SpeechTimeoutError("No speech detected")
+                if heard_at is not None and now - heard_at > self.phrase_time_limit:
+                    text = json.loads(recognizer.FinalResult()).get("text", "")
+                    break
+        finally:
+            stream.stop_stream()
+            stream.close()
+            audio.terminate()
+
+        if trace:
+            trace.mark("listen")
+        if not text:
+            raise SpeechNotUnderstoodError("Speech not understood")
+        if on_partial:
+            return on_partial(text) or text
+        return text
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> RecognitionBackend:
+    """
+    Create the configured recognition backend.
+
+    Args:
+        name: Backend name (defaults to Config.SPEECH_BACKEND)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or Config.SPEECH_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown speech backend '{name}'. Choose from: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name]()
@@ -0,0 +1,156 @@
+# resilience.py
+"""Retry policy and circuit breaker for upstream weather requests."""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Optional
+
+from config import Config
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for transient upstream failures.
+
+    ``delay()`` returns how long to wait before the next attempt, or None
+    when the caller should give up. A ``Retry-After`` value from the
+    server takes precedence over the computed backoff, but is not honored
+    past ``max_retry_after`` seconds (the request fails instead).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = Config.RETRY_MAX_ATTEMPTS,
+        backoff_base: float = Config.RETRY_BACKOFF_BASE,
+        backoff_max: float = Config.RETRY_BACKOFF_MAX,
+        jitter: float = Config.RETRY_JITTER,
+        retry_on_status: Iterable[int] = Config.RETRY_ON_STATUS,
+        respect_retry_after: bool = True,
+        max_retry_after: float = Config.RETRY_MAX_RETRY_AFTER,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.retry_on_status = frozenset(retry_on_status)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.rng = rng
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Return True if a response status is worth retrying."""
+        return status_code in self.retry_on_status
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Compute the wait before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            retry_after: Server-requested wait in seconds, if any
+
+        Returns:
+            Seconds to wait, or None if no further attempt should be made
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if retry_after is not None and self.respect_retry_after:
+            if retry_after > self.max_retry_after:
+                return None
+            return max(0.0, retry_after)
+
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return backoff * (1 - self.jitter * self.rng())
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures.
+
+    The breaker opens after ``failure_threshold`` consecutive failures.
+    While open every call is rejected until ``reset_timeout`` has passed;
+    then a single trial call is let through (half-open). A success closes
+    the breaker and a failure opens it again. ``allow()`` hands out a
+    permit that every call gives back with ``release()`` when it ends; only
+    the trial's own permit lets the next trial through, so a trial that
+    ended without an outcome does not keep the breaker half-open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Permit for calls made while the breaker is closed
+    _CLOSED_PERMIT = object()
+
+    def __init__(
+        self,
+        failure_threshold: int = Config.BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = Config.BREAKER_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial: Optional[object] = None  # permit of the half-open trial
+
+    def allow(self) -> Optional[object]:
+        """
+        Ask to send a request now.
+
+        Returns:
+            A permit to pass to ``release()`` once the request ends, or
+            None if the request must be rejected
+        """
+        if self.state == self.CLOSED:
+            return self._CLOSED_PERMIT
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return None
+            self.state = self.HALF_OPEN
+            self._trial = None
+        # Half-open: allow exactly one trial request
+        if self._trial is not None:
+            return None
+        self._trial = object()
+        return self._trial
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial = None
+
+    def release(self, permit: Optional[object]):
+        """Give back a permit; a trial's permit lets the next trial through."""
+        if permit is not None and permit is self._trial:
+            self._trial = None
+
+    def record_failure(self):
+        """Count a failure and open the breaker if needed."""
+        self.failures += 1
+        self._trial = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
@@ -2,7 +2,56 @@
 """Simple tests for weather service."""
 
 import asyncio
-from weather_service import WeatherService, WeatherServiceError
+import tempfile
+import threading
+import wave
+import flet as ft
+import httpx
+from datetime import datetime, timedelta
+from pathlib import Path
+from alerts import AlertTracker, analyze_weather, analyze_weather_batch
+from benchmark_themes import check, samples
+from city_index import CityIndex
+from disk_cache import DiskCache
+from history_store import HistoryStore
+from main import WeatherApp, WeatherTheme
+from preferences import PreferencesStore
+from recognition import (
+    CityMatcher,
+    GoogleBackend,
+    RecognitionBackend,
+    RecognitionServiceError,
+    VoskBackend,
+)
+from view_model import KeyedList, RenderStats, patch
+from voice import AudioCache, LatencyTrace, SpeechQueue, SpeechWorker
+from watchlist import WatchlistScheduler
+from rate_limiter import RateLimiter, SharedTokenBucket, TokenBucket
+from resilience import CircuitBreaker, RetryPolicy
+from update_scheduler import UpdateScheduler
+from weather_service import (
+    CircuitOpenError, NotFoundError, ResponseCache, WeatherService, WeatherServiceError
+)
+
+
+SAMPLE_WEATHER = {
+    "name": "London",
+    "coord": {"lat": 51.51, "lon": -0.13},
+    "sys": {"country": "GB"},
+    "main": {"temp": 12.3, "feels_like": 11.0, "humidity": 70},
+    "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+    "wind": {"speed": 4.1},
+}
+
+
+def mock_transport(calls: list, status_code: int = 200, missing=()):
+    """Build an offline transport that records each request."""
+    def handler(request):
+        calls.append(request)
+        if request.url.params.get("q") in missing:
+            return httpx.Response(404, json={"message": "city not found"})
+        return httpx.Response(status_code, json=SAMPLE_WEATHER)
+    return httpx.MockTransport(handler)
 
 
 async def test_valid_city():
@@ -20,14 +69,19 @@ async def test_valid_city():
 
 async def test_invalid_city():
     """Test handling of invalid city."""
-    service = WeatherService()
-    try:
-        await service.get_weather("InvalidCityXYZ123")
-        print("❌ Should have raised an error")
-        return False
-    except WeatherServiceError as e:
-        print(f"✅ Correctly handled error: {e}")
-        return True
+    calls = []
+    transport = mock_transport(calls, missing={"InvalidCityXYZ123"})
+    async with WeatherService(api_key="test", transport=transport) as service:
+        try:
+            await service.get_weather("InvalidCityXYZ123")
+            print("❌ Should have raised an error")
+            return False
+        except WeatherServiceError as e:
+            if len(calls) == 1 and str(e).startswith("City 'InvalidCityXYZ123' not found"):
+                print(f"✅ Correctly handled error: {e}")
+                return True
+            print(f"❌ Unexpected error: {e}")
+            return False
 
 
 async def test_empty_city():
@@ -42,6 +96,800 @@ async def test_empty_city():
         return True
 
 
+async def test_pooled_client_reused():
+    """Test that lookups share one pooled client until closed."""
+    calls = []
+    async with WeatherService(api_key="test", transport=mock_transport(calls)) as service:
+        first_client = service.client
+        await service.get_weather("London")
+        await service.get_weather_by_coordinates(35.68, 139.69)
+        reused = service.client is first_client
+    if reused and len(calls) == 2 and first_client.is_closed:
+        print("✅ Pooled client reused across lookups and closed on exit")
+        return True
+    print("❌ Pooled client was not reused or not closed")
+    return False
+
+
+async def test_not_found_message():
+    """Test that a 404 keeps its friendly error message."""
+    calls = []
+    async with WeatherService(api_key="test", transport=mock_transport(calls, 404)) as service:
+        try:
+            await service.get_weather("Atlantis")
+            print("❌ Should have raised an error")
+            return False
+        except WeatherServiceError as e:
+            if isinstance(e, NotFoundError) and str(e).startswith("City 'Atlantis' not found"):
+                print(f"✅ Correctly handled error: {e}")
+                return True
+            print(f"❌ Unexpected error message: {e}")
+            return False
+
+
+async def test_cache_hit_and_revalidate():
+    """Test TTL cache hits and stale-while-revalidate refresh."""
+    calls = []
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, ttl=60, max_stale=600, clock=lambda: now[0])
+    async with WeatherService(
+        api_key="test",
+        transport=mock_transport(calls),
+        cache=cache,
+        stale_while_revalidate=True,
+    ) as service:
+        await service.get_weather("London")
+        await service.get_weather("  london ")  # normalized to same key
+        fresh_calls = len(calls)
+
+        now[0] = 120.0  # past TTL, within max_stale
+        await service.get_weather("London")
+        await asyncio.sleep(0)  # let the background refresh run
+        await asyncio.sleep(0)
+
+    stats = cache.stats()
+    if fresh_calls == 1 and len(calls) == 2 and stats["hits"] == 1 and stats["stale_hits"] == 1:
+        print(f"✅ Cache served repeat lookups: {stats}")
+        return True
+    print(f"❌ Unexpected cache behaviour: calls={len(calls)} stats={stats}")
+    return False
+
+
+async def test_disk_cache_survives_restart():
+    """Test that payloads persist across service instances."""
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "weather_cache.db"
+        async with WeatherService(
+            api_key="test",
+            transport=mock_transport(calls),
+            disk_cache=DiskCache(db_path),
+        ) as service:
+            await service.get_weather("London")
+
+        # Simulate a restart with an empty in-memory cache
+        async with WeatherService(
+            api_key="test",
+            transport=mock_transport(calls),
+            disk_cache=DiskCache(db_path),
+        ) as service:
+            last_known = service.get_last_known("london")
+            await service.get_weather("London")
+
+    if last_known and last_known[0]["name"] == "London" and len(calls) == 1:
+        print("✅ Disk cache served last-known weather after restart")
+        return True
+    print(f"❌ Disk cache miss after restart: calls={len(calls)}")
+    return False
+
+
+async def test_geocode_shared_by_spellings():
+    """Test repeat searches resolve locally and share one cache entry."""
+    calls = []
+    async with WeatherService(api_key="test", transport=mock_transport(calls)) as service:
+        await service.get_weather("London")
+        for spelling in ["london", "LONDON,gb", " London "]:
+            data = await service.get_weather(spelling)
+        await service.get_weather("London", force_refresh=True)
+        coordinate_call = calls[-1].url.params
+        # Another country's London must not reuse the bare name's place
+        await service.get_weather("London, CA")
+
+    if (
+        len(calls) == 3
+        and "q" not in coordinate_call
+        and coordinate_call.get("lat") == "51.51"
+        and calls[-1].url.params.get("q") == "London, CA"
+        and data["name"] == "London"
+    ):
+        print("✅ Repeat spellings resolved locally to one coordinate lookup")
+        return True
+    print(f"❌ Unexpected geocode behaviour: {[str(c.url) for c in calls]}")
+    return False
+
+
+async def test_concurrent_lookups_coalesced():
+    """Test that concurrent lookups for one city share a single request."""
+    calls = []
+    async with WeatherService(api_key="test", transport=mock_transport(calls)) as service:
+        results = await asyncio.gather(
+            *(service.get_weather(city) for city in ["Tokyo", "tokyo", " Tokyo"])
+        )
+        coalesced = service.coalesced_requests
+
+    if len(calls) == 1 and coalesced == 2 and all(r == results[0] for r in results):
+        print(f"✅ {coalesced} concurrent lookups coalesced into one request")
+        return True
+    print(f"❌ Expected one request, got {len(calls)} (coalesced={coalesced})")
+    return False
+
+
+async def test_batch_fetch_in_order():
+    """Test batch lookups keep input order and report per-city errors."""
+    calls = []
+    cities = ["Iriga", "Atlantis", "Nabua"]
+    async with WeatherService(api_key="test", transport=mock_transport(calls, missing={"Atlantis"})) as service:
+        results = await service.get_weather_many(cities, concurrency=2)
+
+    ordered = [r.city for r in results] == cities
+    errors = [r.city for r in results if not r.ok]
+    if ordered and errors == ["Atlantis"] and len(calls) == 3:
+        print("✅ Batch fetch returned results and errors in input order")
+        return True
+    print(f"❌ Unexpected batch results: {results}")
+    return False
+
+
+async def test_watchlist_reports_only_changes():
+    """Test that watchlist refreshes only report changed cities and back off."""
+    calls = []
+    now = [0.0]
+    changes = []
+    outage = [False]
+
+    def handler(request):
+        calls.append(request)
+        if outage[0] or request.url.params.get("q") == "Atlantis":
+            return httpx.Response(404, json={"message": "city not found"})
+        return httpx.Response(200, json=SAMPLE_WEATHER)
+
+    async with WeatherService(api_key="test", transport=httpx.MockTransport(handler)) as service:
+        scheduler = WatchlistScheduler(
+            service,
+            ["Iriga", "Atlantis"],
+            on_change=changes.append,
+            interval=600,
+            clock=lambda: now[0],
+            rng=lambda: 0.5,
+        )
+        first = await scheduler.refresh_due()
+        now[0] = 700.0
+        second = await scheduler.refresh_due()
+        failed = scheduler.entries["Atlantis"]
+        backoff_due = failed.next_due
+        # Iriga fails once, then recovers with unchanged weather
+        now[0] = 1400.0
+        outage[0] = True
+        await scheduler.refresh_due()
+        now[0] = 1500.0
+        outage[0] = False
+        recovered = await scheduler.refresh_due()
+
+    if (
+        [e.city for e in first] == ["Iriga"]
+        and second == []
+        and len(changes) == 2
+        and backoff_due == 700.0 + 60.0
+        and [e.city for e in recovered] == ["Iriga"]
+        and recovered[0].error is None
+    ):
+        print("✅ Watchlist re-rendered only changed cities and backed off failures")
+        return True
+    print(f"❌ Unexpected watchlist behaviour: first={first} second={second}")
+    return False
+
+
+async def test_retry_then_circuit_breaker():
+    """Test retries honor Retry-After and the breaker serves cached data."""
+    statuses = [503, 200, 500, 500, 500]
+    calls = []
+    sleeps = []
+
+    def handler(request):
+        calls.append(request)
+        status = statuses.pop(0) if statuses else 500
+        return httpx.Response(status, json=SAMPLE_WEATHER, headers={"Retry-After": "2"})
+
+    service = WeatherService(
+        api_key="test",
+        transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(max_attempts=2),
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    service._sleep = lambda delay: sleeps.append(delay) or asyncio.sleep(0)
+    async with service:
+        first = await service.get_weather("London", force_refresh=True)
+        # Two failed attempts open the breaker; the cached copy is served
+        second = await service.get_weather("London", force_refresh=True)
+        requests_before = len(calls)
+        tokens_before = service.rate_limiter.acquired
+        try:
+            await service.get_weather("Paris")
+            fail_fast = False
+        except CircuitOpenError:
+            # Rejected without a request and without spending a token
+            fail_fast = (len(calls) == requests_before
+                         and service.rate_limiter.acquired == tokens_before)
+
+    if first == second and sleeps[0] == 2.0 and fail_fast and service.fallback_responses == 1:
+        print("✅ Retried transient errors, then failed fast and served cache")
+        return True
+    print(f"❌ Unexpected retry behaviour: calls={len(calls)} sleeps={sleeps}")
+    return False
+
+
+async def test_breaker_trial_always_resolved():
+    """Test a half-open trial that fails without a 5xx does not wedge the breaker."""
+    responses = [503, "error", 404, 200]
+    now = [0.0]
+
+    def handler(request):
+        status = responses.pop(0)
+        if status == "error":
+            raise httpx.DecodingError("bad body")
+        return httpx.Response(status, json=SAMPLE_WEATHER)
+
+    service = WeatherService(
+        api_key="test",
+        transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0]),
+    )
+    errors = []
+    async with service:
+        for city in ["London", "Paris", "Atlantis", "Tokyo"]:
+            now[0] += 20  # past the reset timeout: the next call is a trial
+            try:
+                await service.get_weather(city, force_refresh=True)
+            except WeatherServiceError as e:
+                errors.append(type(e).__name__)
+
+    # Only the trial's own permit lets the next trial through
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    earlier = breaker.allow()  # a request started while closed
+    breaker.record_failure()
+    now[0] += 20
+    trial = breaker.allow()
+    breaker.release(earlier)
+    blocked = breaker.allow() is None
+    breaker.release(trial)
+    permits_ok = blocked and breaker.allow() is not None
+
+    expected = ["UpstreamUnavailableError", "WeatherServiceError", "NotFoundError"]
+    if (errors == expected and service.circuit_breaker.state == CircuitBreaker.CLOSED
+            and permits_ok):
+        print("✅ Breaker trials released after client errors and 404s")
+        return True
+    print(f"❌ Breaker stuck: {errors} state={service.circuit_breaker.state}")
+    return False
+
+
+async def test_rate_limiter_queues_requests():
+    """Test the token bucket queues bursts and shares state via SQLite."""
+    now = [0.0]
+    limiter = RateLimiter(TokenBucket(rate=2, burst=2, clock=lambda: now[0]), timeout=0.9)
+    sleeps = []
+    limiter._sleep = lambda delay: sleeps.append(delay) or asyncio.sleep(0)
+    for _ in range(3):
+        await limiter.acquire()
+    try:
+        await limiter.acquire()  # would need to wait 1.0s behind the queue
+        timed_out = False
+    except Exception:
+        timed_out = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "rate_limit.db"
+        first = SharedTokenBucket(db_path, rate=1, burst=1)
+        second = SharedTokenBucket(db_path, rate=1, burst=1)
+        shared_waits = [first.reserve(), second.reserve(timeout=0)]
+        first.close()
+        second.close()
+
+    if sleeps == [0.5] and timed_out and shared_waits[0] == 0 and shared_waits[1] is None:
+        print(f"✅ Rate limiter queued bursts: {limiter.metrics()}")
+        return True
+    print(f"❌ Unexpected rate limiting: sleeps={sleeps} shared={shared_waits}")
+    return False
+
+
+async def test_config_is_lazy():
+    """Test that a fresh import resolves nothing until first access."""
+    import os
+    import subprocess
+    import sys
+    
+    script = (
+        "from config import Config\n"
+        "import weather_service\n"
+        "Config.ENV_FILES = ()\n"
+        "assert Config._values is None, 'resolved on import'\n"
+        "assert Config.HISTORY_MAX_ENTRIES == 10000, 'invalid value kept'\n"
+        "assert Config._values is not None, 'not resolved on access'\n"
+        "assert Config.API_KEY == ''\n"
+        "try:\n"
+        "    Config.validate()\n"
+        "except ValueError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise AssertionError('missing key passed validation')\n"
+    )
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("OPENWEATHER_", "WEATHER_"))
+    }
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parent)
+    env["WEATHER_HISTORY_MAX_ENTRIES"] = "not-a-number"
+    
+    # Fresh interpreter in an empty directory: no .env and no API key
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=tmp, env=env, capture_output=True, text=True, timeout=60,
+        )
+    
+    service = WeatherService(api_key="override", units="imperial")
+    if (result.returncode == 0 and service.api_key == "override"
+            and service.units == "imperial"):
+        print("✅ Config resolved lazily with per-instance overrides")
+        return True
+    print(f"❌ Config was not lazy: {result.stderr.strip()[-200:]}")
+    return False
+
+
+async def test_partial_transcript_matching():
+    """Test partial transcripts only match once the city is unambiguous."""
+    matcher = CityMatcher(["New York", "Newcastle", "London"])
+    partials = ["new", "new york", "LONDON.", "lond"]
+    matches = [matcher.match(text) for text in partials]
+    if matches == [None, "New York", "London", None]:
+        print("✅ Partial transcripts matched known cities")
+        return True
+    print(f"❌ Unexpected matches: {matches}")
+    return False
+
+
+async def test_city_index_suggests_and_corrects():
+    """Test prefix suggestions and local spelling correction."""
+    index = CityIndex()
+    suggestions = [city.name for city in index.suggest("new y")]
+    corrected = index.correct("Barcelonna")
+    untouched = [index.correct("London"), index.correct("Springfield"), index.correct("Berln")]
+    index.close()
+    if suggestions == ["New York"] and corrected.name == "Barcelona" and untouched == [None] * 3:
+        print("✅ City index suggested and corrected names locally")
+        return True
+    print(f"❌ Unexpected index results: {suggestions} {corrected} {untouched}")
+    return False
+
+
+async def test_alert_batch_matches_scalar():
+    """Test batch alert evaluation matches evaluating each payload."""
+    hot = {**SAMPLE_WEATHER, "main": {"temp": 38, "feels_like": 42, "humidity": 85}}
+    storm = {**SAMPLE_WEATHER, "weather": [{"main": "Thunderstorm", "description": "storm"}],
+             "wind": {"speed": 16}, "visibility": 500}
+    payloads = [SAMPLE_WEATHER, hot, storm]
+    scalar = [analyze_weather(data) for data in payloads]
+    batch = analyze_weather_batch(payloads)
+    types = [[alert["type"] for alert in alerts] for alerts in batch]
+    if batch == scalar and types == [
+        ["general"], ["extreme_heat", "high_humidity"], ["high_wind", "storm", "poor_visibility"]
+    ]:
+        print("✅ Batch alert evaluation matched per-payload results")
+        return True
+    print(f"❌ Unexpected alerts: {types}")
+    return False
+
+
+async def test_alert_tracker_reports_changes():
+    """Test refreshes only report raised, changed or cleared alerts."""
+    tracker = AlertTracker()
+    hot = {**SAMPLE_WEATHER, "main": {"temp": 36, "feels_like": 36, "humidity": 50}}
+    hotter = {**hot, "main": {"temp": 39, "feels_like": 39, "humidity": 85}}
+    first = tracker.update("london,gb", analyze_weather(hot))
+    repeat = tracker.update("london,gb", analyze_weather(hot))
+    worse = tracker.update("london,gb", analyze_weather(hotter))
+    cleared = tracker.update("london,gb", analyze_weather(SAMPLE_WEATHER))
+    summary = [
+        [a["type"] for a in first.added], bool(repeat),
+        [a["type"] for a in worse.added], [a["type"] for a in worse.changed],
+        [a["type"] for a in cleared.removed], first.escalated, worse.escalated,
+    ]
+    expected = [
+        ["extreme_heat"], False, ["high_humidity"], ["extreme_heat"],
+        ["extreme_heat", "high_humidity"], True, False,
+    ]
+    describe = WeatherApp.describe_alert_changes
+    announced = (
+        "Alert level is now high." in describe("London", first)
+        and describe("London", repeat) == ""
+        and "Extreme Heat Warning for London updated: Temperature is 39°C" in describe("London", worse)
+        and describe("London", cleared) == "2 weather alerts cleared for London."
+    )
+    if summary == expected and announced:
+        print("✅ Alert tracker reported only changed alerts")
+        return True
+    print(f"❌ Unexpected alert diffs: {summary}")
+    return False
+
+
+async def test_keyed_list_reuses_rows():
+    """Test re-rendering a keyed list only builds rows for new keys."""
+    stats = RenderStats()
+    column = ft.Column()
+    rows = KeyedList(
+        column,
+        build=lambda city: ft.Text(city),
+        update=lambda row, city: patch(row, stats, value=city),
+        stats=stats,
+    )
+    rows.render(["London", "Paris"], key=str.lower)
+    first = list(column.controls)
+    rows.render(["paris", "London", "Rome"], key=str.lower)
+    reused = column.controls[0] is first[1] and column.controls[1] is first[0]
+    if reused and stats.controls_created == 3 and stats.properties_patched == 1:
+        print("✅ Keyed list reused rows and patched only changed values")
+        return True
+    print(f"❌ Unexpected render stats: {stats.snapshot()}")
+    return False
+
+
+async def test_update_scheduler_coalesces():
+    """Test updates in one frame coalesce and flush() sends them at once."""
+    class Page:
+        loop = asyncio.get_running_loop()
+        sent = 0
+
+        def update(self):
+            self.sent += 1
+
+    page = Page()
+    flushed = []
+    scheduler = UpdateScheduler(
+        page, frame_interval=0.01, on_flush=lambda: flushed.append(page.sent)
+    )
+    for _ in range(5):
+        scheduler.mark_dirty()
+    await asyncio.to_thread(scheduler.mark_dirty)  # from a handler thread
+    await asyncio.sleep(0.05)
+    coalesced = page.sent == 1
+    
+    # flush() paints now; the frame already scheduled finds nothing to send
+    scheduler.mark_dirty()
+    scheduler.flush()
+    flushed_now = page.sent == 2
+    scheduler.flush()
+    await asyncio.sleep(0.05)
+    
+    # Without a running loop every request updates immediately
+    idle = Page()
+    idle.loop = None
+    fallback = UpdateScheduler(idle)
+    fallback.mark_dirty()
+    fallback.mark_dirty()
+    
+    if (coalesced and flushed_now and page.sent == 2 and flushed == [1, 2]
+            and scheduler.metrics() == {"requested": 7, "sent": 2}
+            and idle.sent == 2):
+        print("✅ Update scheduler coalesced requests into one update per frame")
+        return True
+    print(f"❌ Unexpected updates: {page.sent} {scheduler.metrics()} {idle.sent}")
+    return False
+
+
+async def test_history_journal_replays_and_compacts():
+    """Test history survives a restart, a torn write and compaction."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.jsonl"
+        store = HistoryStore(path, max_entries=3, compact_min_lines=5)
+        for city in ["London", "Paris", "Tokyo", "london", "Rome"]:
+            store.add(city)
+        store.remove("Tokyo")
+        store.close()
+        with open(path, "a") as f:
+            f.write('{"op": "add", "ci')  # crash mid-write
+
+        reopened = HistoryStore(path, max_entries=3)
+        cities = [entry.city for entry in reopened.recent()]
+        lines = len(path.read_text().splitlines())
+        reopened.add("Paris")  # first write after the torn line
+        reopened.close()
+
+        after_crash = [entry.city for entry in HistoryStore(path, max_entries=3).recent()]
+
+    if (cities == ["Rome", "london"] and store.compactions == 1 and lines <= 4
+            and after_crash == ["Paris", "Rome", "london"]):
+        print("✅ History journal replayed, dropped torn line and compacted")
+        return True
+    print(f"❌ Unexpected history: {cities} {after_crash} {store.metrics()} lines={lines}")
+    return False
+
+
+async def test_history_search_ranks_by_frecency():
+    """Test prefix search ranks by frequency and recency, across compaction."""
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.jsonl"
+        store = HistoryStore(path, compact_min_lines=1)
+        old = (now - timedelta(days=60)).isoformat()
+        for _ in range(3):
+            store.add("Lagos", old)  # often, but long ago
+        store.add("London", (now - timedelta(days=1)).isoformat())
+        store.add("London", now.isoformat())
+        store.add("Lima", now.isoformat())
+        store.add("Paris", now.isoformat())
+        first = [entry.city for entry in store.search("l")]
+        store.close()
+
+        reopened = HistoryStore(path)
+        second = [entry.city for entry in reopened.search(" L", limit=2)]
+        counts = reopened.get("london").count, reopened.get("lagos").count
+        reopened.close()
+
+    if first == ["London", "Lima", "Lagos"] and second == ["London", "Lima"] and counts == (2, 3):
+        print("✅ History search ranked by frecency and survived compaction")
+        return True
+    print(f"❌ Unexpected history search: {first} {second} {counts}")
+    return False
+
+
+async def test_preferences_debounced_write():
+    """Test rapid preference changes notify at once but write once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prefs.json"
+        prefs = PreferencesStore(path, defaults={"use_celsius": True}, save_delay=0.05)
+        seen = []
+        prefs.subscribe("use_celsius", lambda key, value: seen.append(value))
+        for _ in range(10):
+            prefs.set("use_celsius", not prefs.get("use_celsius"))
+        written_early = path.exists()
+        await asyncio.sleep(0.2)
+        reloaded = PreferencesStore(path).get("use_celsius")
+        prefs.close()
+
+    if len(seen) == 10 and not written_early and prefs.writes == 1 and reloaded is True:
+        print("✅ Preferences notified every change and wrote once")
+        return True
+    print(f"❌ Unexpected preferences: {len(seen)} {written_early} {prefs.metrics()} {reloaded}")
+    return False
+
+
+async def test_speech_queue_priority_and_backpressure():
+    """Test speech queue priority, replacement, clearing and drops."""
+    queue = SpeechQueue(maxsize=3)
+    readout = queue.put("Weather for London")
+    alert = queue.put("Storm warning", kind="alert")
+    error = queue.put("City not found", kind="error")
+    first = [(await queue.get())[:2] for _ in range(3)]
+
+    # A newer readout replaces the queued one
+    stale = queue.put("Weather for Paris")
+    fresh = queue.put("Weather for Rome")
+    replaced = stale.done() and stale.result() is False and queue.qsize() == 1
+    # A full queue drops its least important message
+    queue.put("Say the city", kind="prompt")
+    queue.put("Heat alert", kind="alert")
+    queue.put("Network error", kind="error")
+    dropped = fresh.done() and fresh.result() is False
+    # supersede (clear) drops everything still queued
+    cleared = queue.clear()
+    metrics = queue.metrics()
+
+    if (
+        first == [("alert", "Storm warning"), ("error", "City not found"),
+                  ("readout", "Weather for London")]
+        and not readout.done() and not alert.done() and not error.done()
+        and replaced and dropped and cleared == 3 and queue.qsize() == 0
+        and metrics["replaced"] == 1 and metrics["dropped"] == 4
+        and metrics["enqueued"] == 8 and metrics["max_depth"] == 3
+    ):
+        print("✅ Speech queue ordered by priority and shed stale messages")
+        return True
+    print(f"❌ Unexpected speech queue behaviour: {first} {metrics}")
+    return False
+
+
+class FakeSpeechEngine:
+    """Offline stand-in for a pyttsx3 engine."""
+
+    def __init__(self, render=True):
+        self.render = render
+        self.said = []
+        self.saved = []
+        self.pending = []
+        self.callbacks = {}
+        self.properties = {"voice": "fake"}
+        self.speaking = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def connect(self, topic, callback):
+        self.callbacks[topic] = callback
+
+    def say(self, text):
+        self.pending.append(("say", text, None))
+
+    def save_to_file(self, text, path):
+        self.pending.append(("save", text, path))
+
+    def runAndWait(self):
+        for action, text, path in self.pending:
+            if action == "save":
+                self.saved.append(text)
+                if self.render:
+                    with wave.open(path, "wb") as wav:
+                        wav.setnchannels(1)
+                        wav.setsampwidth(2)
+                        wav.setframerate(8000)
+                        wav.writeframes(b"\0\0" * 80)  # 10 ms of silence
+            else:
+                self.callbacks["started-utterance"](None)
+                self.speaking.set()
+                self.gate.wait(2)
+                self.said.append(text)
+        self.pending = []
+
+    def stop(self):
+        pass
+
+
+async def test_speech_worker_skips_superseded():
+    """Test a superseded utterance is never spoken and metrics count it."""
+    engine = FakeSpeechEngine()
+    engine.gate.clear()  # hold the first utterance "on air"
+    worker = SpeechWorker(engine_factory=lambda: engine)
+    first = worker.say("Weather for London")
+    await asyncio.to_thread(engine.speaking.wait, 2)
+    stale = worker.say("Weather for Paris")
+    fresh = worker.say("Weather for Rome", supersede=True)
+    engine.gate.set()
+    results = [await asyncio.wrap_future(f) for f in (first, stale, fresh)]
+    worker.close()
+    metrics = worker.metrics()
+
+    if (
+        engine.said == ["Weather for London", "Weather for Rome"]
+        and results == [False, False, True]
+        and metrics["spoken"] == 1 and metrics["skipped"] == 2
+        and metrics["queued"] == 0
+        and metrics["last_time_to_first_audio"] is not None
+    ):
+        print("✅ Speech worker skipped superseded text and counted it")
+        return True
+    print(f"❌ Unexpected speech worker behaviour: {engine.said} {results} {metrics}")
+    return False
+
+
+class FakePlayer:
+    """Records WAV files instead of playing them."""
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, path):
+        self.played.append(Path(path).name)
+
+    def stop(self):
+        pass
+
+
+async def test_audio_cache_reuses_renders():
+    """Test audio cache keys, reuse of rendered phrases and live fallback."""
+    phrase = "Please say the city name"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AudioCache(tmp, voice_id="v1", rate=150)
+        keyed = (
+            cache.path_for(phrase) == AudioCache(tmp, "v1", 150).path_for(phrase)
+            and cache.path_for(phrase) != AudioCache(tmp, "v2", 150).path_for(phrase)
+            and cache.path_for(phrase) != AudioCache(tmp, "v1", 180).path_for(phrase)
+            and cache.path_for(phrase) != cache.path_for("Searching")
+        )
+
+        engine, player = FakeSpeechEngine(), FakePlayer()
+        worker = SpeechWorker(
+            audio_cache_dir=tmp, engine_factory=lambda: engine, player=player
+        )
+        first = await asyncio.wrap_future(worker.say(phrase, cache=True))
+        second = await asyncio.wrap_future(worker.say(phrase, cache=True))
+        worker.close()
+        metrics = worker.metrics()
+
+        # A phrase that cannot be rendered is spoken live instead
+        broken = FakeSpeechEngine(render=False)
+        fallback = SpeechWorker(
+            audio_cache_dir=tmp, engine_factory=lambda: broken, player=FakePlayer()
+        )
+        live = await asyncio.wrap_future(fallback.say("Searching", cache=True))
+        fallback.close()
+
+    if (
+        keyed and first and second and live
+        and engine.saved == [phrase] and engine.said == []
+        and len(player.played) == 2 and len(set(player.played)) == 1
+        and metrics["audio_cache_renders"] == 1 and metrics["audio_cache_hits"] == 1
+        and broken.said == ["Searching"] and fallback._player.played == []
+    ):
+        print("✅ Audio cache rendered once, replayed, and fell back to live speech")
+        return True
+    print(f"❌ Unexpected audio cache behaviour: {engine.saved} {player.played} {metrics} {broken.said}")
+    return False
+
+
+async def test_latency_trace_stages():
+    """Test the per-stage breakdown and total of a latency trace."""
+    ticks = iter([10.0, 10.25, 11.0, 11.5, 13.0])
+    trace = LatencyTrace(clock=lambda: next(ticks))
+    durations = [trace.mark(stage) for stage in ("voice stack", "prompt", "listen", "fetch")]
+    metrics = trace.metrics()
+    report = trace.report().splitlines()
+
+    if (
+        durations == [0.25, 0.75, 0.5, 1.5]
+        and metrics == {"voice stack": 250.0, "prompt": 750.0, "listen": 500.0,
+                        "fetch": 1500.0, "total": 3000.0}
+        and report[-1].split() == ["total", "3000.0", "ms"]
+    ):
+        print("✅ Latency trace attributed time to each stage")
+        return True
+    print(f"❌ Unexpected latency trace: {durations} {metrics}")
+    return False
+
+
+async def test_recognition_backend_errors():
+    """Test that backends implement listen and describe their own failures."""
+    try:
+        RecognitionBackend()
+        abstract = False
+    except TypeError:
+        abstract = True
+    
+    # An unconfigured Vosk backend fails before touching the microphone
+    try:
+        VoskBackend(model_path="").listen()
+        vosk_failed = False
+    except RecognitionServiceError:
+        vosk_failed = True
+    
+    messages = {backend.service_error_message for backend in (GoogleBackend, VoskBackend)}
+    if abstract and vosk_failed and len(messages) == 2:
+        print("✅ Recognition backends are abstract with per-backend errors")
+        return True
+    print("❌ Recognition backend interface or error messages are wrong")
+    return False
+
+
+async def test_theme_lookup_matches_scan():
+    """Test the theme table agrees with the original scan for every condition."""
+    cases = samples() + [
+        (999, name, is_day)
+        for name in ("Unknown", "", "light rain", "Heavy Snow")
+        for is_day in (True, False)
+    ]
+    mismatches = check(cases)
+    unknown = WeatherTheme.get_theme("Unknown", False, 999)
+    if not mismatches and unknown == WeatherTheme.DEFAULT:
+        print(f"✅ Theme lookup matched the scan for {len(cases)} conditions")
+        return True
+    print(f"❌ Theme lookup differs from the scan for {mismatches}")
+    return False
+
+
 async def run_tests():
     """Run all tests."""
     print("Running Weather Service Tests\n")
@@ -51,6 +899,33 @@ async def run_tests():
     results.append(await test_valid_city())
     results.append(await test_invalid_city())
     results.append(await test_empty_city())
+    results.append(await test_pooled_client_reused())
+    results.append(await test_not_found_message())
+    results.append(await test_cache_hit_and_revalidate())
+    results.append(await test_disk_cache_survives_restart())
+    results.append(await test_geocode_shared_by_spellings())
+    results.append(await test_concurrent_lookups_coalesced())
+    results.append(await test_batch_fetch_in_order())
+    results.append(await test_watchlist_reports_only_changes())
+    results.append(await test_retry_then_circuit_breaker())
+    results.append(await test_breaker_trial_always_resolved())
+    results.append(await test_rate_limiter_queues_requests())
+    results.append(await test_config_is_lazy())
+    results.append(await test_partial_transcript_matching())
+    results.append(await test_city_index_suggests_and_corrects())
+    results.append(await test_alert_batch_matches_scalar())
+    results.append(await test_alert_tracker_reports_changes())
+    results.append(await test_keyed_list_reuses_rows())
+    results.append(await test_update_scheduler_coalesces())
+    results.append(await test_history_journal_replays_and_compacts())
+    results.append(await test_preferences_debounced_write())
+    results.append(await test_history_search_ranks_by_frecency())
+    results.append(await test_speech_queue_priority_and_backpressure())
+    results.append(await test_speech_worker_skips_superseded())
+    results.append(await test_audio_cache_reuses_renders())
+    results.append(await test_latency_trace_stages())
+    results.append(await test_recognition_backend_errors())
+    results.append(await test_theme_lookup_matches_scan())
     
     print("\n" + "=" * 50)
     passed = sum(results)
@@ -0,0 +1,113 @@
+# update_scheduler.py
+"""Coalesce Flet ``page.update()`` calls into at most one per frame.
+
+Every ``page.update()`` diffs the control tree and sends a websocket
+message to the client, and event handlers often trigger several in a
+row. Handlers call ``UpdateScheduler.mark_dirty()`` instead; the first
+call in a frame schedules a single ``page.update()`` on the page's event
+loop one frame later, and later calls in the same frame are absorbed.
+``flush()`` sends pending changes immediately, for the cases that must
+paint before continuing (e.g. the first frame of an animation).
+
+The scheduler is safe to use from Flet's handler threads. Without a
+running event loop (tests, scripts) it falls back to updating at once.
+Code that only has the page at hand can use ``scheduler_for(page)`` to
+share one scheduler per page.
+
+This is the canonical copy, tested in ``test_weather_service.py``.
+``week4_labs/contact_book_app/src`` and
+``Midterm_Exam_Part_2/task_tracker_application/src`` carry identical
+copies; change this file first, then copy it over to keep them in sync.
+"""
+
+import threading
+from typing import Callable, Optional
+
+
+class UpdateScheduler:
+    """Batch page updates into one per animation frame."""
+
+    def __init__(
+        self,
+        page,
+        frame_interval: float = 1 / 60,
+        on_flush: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            page: Flet page (anything with ``update()``; ``loop`` is optional)
+            frame_interval: Seconds to collect changes before updating
+            on_flush: Called after every update actually sent
+        """
+        self.page = page
+        self.frame_interval = frame_interval
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._dirty = False
+        self.requested = 0
+        self.sent = 0
+
+    def _loop(self):
+        """Return the page's running event loop, or None."""
+        loop = getattr(self.page, "loop", None)
+        if loop is None or loop.is_closed() or not loop.is_running():
+            return None
+        return loop
+
+    def mark_dirty(self):
+        """Request an update; several requests in one frame send one update."""
+        with self._lock:
+            self.requested += 1
+            self._dirty = True
+            if self._scheduled:
+                return
+            loop = self._loop()
+            if loop is not None:
+                self._scheduled = True
+        if loop is None:
+            self.flush()
+        else:
+            loop.call_soon_threadsafe(loop.call_later, self.frame_interval, self._on_frame)
+
+    def _on_frame(self):
+        """Send the update scheduled for this frame."""
+        with self._lock:
+            self._scheduled = False
+        self.flush()
+
+    def flush(self):
+        """Send pending changes now (no-op if nothing was marked dirty)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self.sent += 1
+        try:
+            self.page.update()
+        except Exception as e:
+            print(f"Error updating page: {e}")
+            return
+        if self.on_flush:
+            self.on_flush()
+
+    def metrics(self) -> dict:
+        """Return how many updates were requested and how many were sent."""
+        return {"requested": self.requested, "sent": self.sent}
+
+
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for(page) -> UpdateScheduler:
+    """Return the shared scheduler of a page, creating it on first use.
+
+    The scheduler is stored on the page itself, so it lives and dies with
+    the page's session.
+    """
+    with _schedulers_lock:
+        scheduler = getattr(page, "_update_scheduler", None)
+        if scheduler is None:
+            scheduler = UpdateScheduler(page)
+            page._update_scheduler = scheduler
+        return scheduler
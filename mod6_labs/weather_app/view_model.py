@@ -0,0 +1,142 @@
+# view_model.py
+"""Helpers for patching long-lived Flet controls instead of rebuilding them.
+
+Flet sends the whole subtree of every newly created control to the client,
+but only the changed properties of controls it has already seen. Views
+therefore build their controls once and, on later renders, ``patch()``
+only the properties whose values differ. ``KeyedList`` does the same for
+lists of rows (history, suggestions): rows are kept per key and only rows
+for new keys are built. ``RenderStats`` counts what a render cost so the
+saving can be checked.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+import flet as ft
+
+
+def count_controls(control) -> int:
+    """Return the number of controls in a tree (the root included)."""
+    if not isinstance(control, ft.Control):
+        return 0
+    total = 1
+    content = getattr(control, "content", None)
+    if isinstance(content, ft.Control):
+        total += count_controls(content)
+    for child in getattr(control, "controls", None) or ():
+        total += count_controls(child)
+    return total
+
+
+class RenderStats:
+    """Counters for controls built, properties patched and page updates.
+
+    ``updates_requested`` counts calls asking for an update and
+    ``updates_sent`` the updates actually sent after coalescing.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start counting from zero (e.g. at the start of a search)."""
+        self.controls_created = 0
+        self.properties_patched = 0
+        self.updates_requested = 0
+        self.updates_sent = 0
+
+    def created(self, control):
+        """Count a newly built control tree and return it."""
+        self.controls_created += count_controls(control)
+        return control
+
+    def count_update(self):
+        """Count one page update sent to the client."""
+        self.updates_sent += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the counters as a dict."""
+        return {
+            "controls_created": self.controls_created,
+            "properties_patched": self.properties_patched,
+            "updates_requested": self.updates_requested,
+            "updates_sent": self.updates_sent,
+        }
+
+
+def patch(control, stats: Optional[RenderStats] = None, **properties) -> int:
+    """
+    Set only the properties of a control whose values changed.
+
+    Args:
+        control: Control to update
+        stats: Optional counters to add the number of patched properties to
+        **properties: Property names and their new values
+
+    Returns:
+        Number of properties that changed
+    """
+    changed = 0
+    for name, value in properties.items():
+        if getattr(control, name) != value:
+            setattr(control, name, value)
+            changed += 1
+    if stats is not None:
+        stats.properties_patched += changed
+    return changed
+
+
+class KeyedList:
+    """Keep one control per key in a container's ``controls`` list.
+
+    ``render()`` reuses the control built for a key the last time, builds
+    controls only for new keys, and drops controls whose key went away;
+    ``update`` is then called on every row to patch it with its item.
+    """
+
+    def __init__(
+        self,
+        container,
+        build: Callable[[Any], Any],
+        update: Optional[Callable[[Any, Any], None]] = None,
+        stats: Optional[RenderStats] = None,
+    ):
+        self.container = container
+        self.build = build
+        self.update = update
+        self.stats = stats
+        self.rows: Dict[Hashable, Any] = {}
+
+    def render(self, items: Iterable, key: Callable[[Any], Hashable]) -> bool:
+        """
+        Show items in order, one row per key.
+
+        Args:
+            items: Items to show
+            key: Returns the identity of an item
+
+        Returns:
+            True if the list of rows changed (added, removed or reordered)
+        """
+        rows = {}
+        ordered: List[Any] = []
+        for item in items:
+            item_key = key(item)
+            if item_key in rows:
+                continue
+            row = self.rows.get(item_key)
+            if row is None:
+                row = self.build(item)
+                if self.stats is not None:
+                    self.stats.created(row)
+            if self.update is not None:
+                self.update(row, item)
+            rows[item_key] = row
+            ordered.append(row)
+
+        self.rows = rows
+        current = self.container.controls
+        if len(current) == len(ordered) and all(a is b for a, b in zip(current, ordered)):
+            return False
+        self.container.controls = ordered
+        return True
@@ -0,0 +1,640 @@
+# voice.py
+"""Lazy loading of the speech recognition and text-to-speech stack.
+
+``speech_recognition``, ``pyttsx3`` and ``pythoncom`` are only needed
+once the user presses the mic button or a readout is spoken, so they are
+imported on first use instead of at application start. ``warm_up()``
+loads them in a background thread after the first frame is on screen so
+the first voice interaction does not pay the import cost either.
+
+``SpeechWorker`` owns a single text-to-speech engine for the lifetime of
+the app on a dedicated thread, instead of initializing one per message.
+``SpeechQueue`` sits in front of it and keeps only the messages that are
+still worth saying. ``AudioCache`` keeps recurring phrases rendered to WAV
+so they play back without being synthesized again, through ``winsound``
+on Windows or ``afplay``/``paplay``/``aplay`` elsewhere; without a player
+those phrases are simply spoken live.
+"""
+
+import asyncio
+import hashlib
+import importlib
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class VoiceStack:
+    """Imported voice modules (``pythoncom`` is None off Windows)."""
+
+    def __init__(self, sr, pyttsx3, pythoncom):
+        self.sr = sr
+        self.pyttsx3 = pyttsx3
+        self.pythoncom = pythoncom
+
+
+_stack: Optional[VoiceStack] = None
+_lock = threading.Lock()
+_warm_thread: Optional[threading.Thread] = None
+
+
+def load() -> VoiceStack:
+    """
+    Import the voice modules once and return them.
+
+    Returns:
+        VoiceStack with the imported modules
+
+    Raises:
+        ImportError: If speech_recognition or pyttsx3 is not installed
+    """
+    global _stack
+    if _stack is not None:
+        return _stack
+
+    with _lock:
+        if _stack is None:
+            sr = importlib.import_module("speech_recognition")
+            pyttsx3 = importlib.import_module("pyttsx3")
+            try:
+                pythoncom = importlib.import_module("pythoncom")
+            except ImportError:
+                pythoncom = None  # COM setup is only needed on Windows
+            _stack = VoiceStack(sr, pyttsx3, pythoncom)
+    return _stack
+
+
+def warm_up() -> threading.Thread:
+    """Import the voice modules in a background daemon thread."""
+    global _warm_thread
+    if _warm_thread is None:
+        def run():
+            try:
+                load()
+            except ImportError as e:
+                print(f"Voice features unavailable: {e}")
+
+        _warm_thread = threading.Thread(target=run, name="voice-warmup", daemon=True)
+        _warm_thread.start()
+    return _warm_thread
+
+
+class AudioCache:
+    """On-disk cache of phrases pre-rendered to WAV files.
+
+    Files are keyed by a hash of the text, voice id and speech rate, so a
+    change of voice or rate renders fresh audio instead of replaying the
+    old one.
+    """
+
+    def __init__(self, directory, voice_id: str = "", rate: int = 150):
+        self.directory = Path(directory)
+        self.voice_id = voice_id
+        self.rate = rate
+        self.hits = 0
+        self.renders = 0
+
+    def path_for(self, text: str) -> Path:
+        """Return the WAV path for a phrase."""
+        key = f"{text}|{self.voice_id}|{self.rate}".encode("utf-8")
+        return self.directory / f"{hashlib.sha1(key).hexdigest()}.wav"
+
+    def get(self, text: str) -> Optional[Path]:
+        """Return the cached WAV for a phrase, if rendered."""
+        path = self.path_for(text)
+        if path.exists() and path.stat().st_size > 0:
+            self.hits += 1
+            return path
+        return None
+
+    def render(self, engine, text: str) -> Optional[Path]:
+        """
+        Render a phrase to WAV with the given engine.
+
+        Args:
+            engine: pyttsx3 engine owned by the calling thread
+            text: Phrase to render
+
+        Returns:
+            Path of the rendered file, or None if rendering failed
+        """
+        path = self.path_for(text)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp.wav")
+        try:
+            engine.save_to_file(text, str(tmp_path))
+            engine.runAndWait()
+            if not tmp_path.exists() or tmp_path.stat().st_size == 0:
+                return None
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Audio cache render error: {e}")
+            return None
+        self.renders += 1
+        return path
+
+
+def _wav_duration(path: Path) -> float:
+    """Return the length of a WAV file in seconds."""
+    with wave.open(str(path), "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate() or 1)
+
+
+class _WinsoundPlayer:
+    """Asynchronous WAV playback through Windows' ``winsound``."""
+
+    def __init__(self, winsound):
+        self.winsound = winsound
+
+    def play(self, path: Path):
+        self.winsound.PlaySound(
+            str(path), self.winsound.SND_FILENAME | self.winsound.SND_ASYNC
+        )
+
+    def stop(self):
+        self.winsound.PlaySound(None, 0)
+
+
+class _CommandPlayer:
+    """Asynchronous WAV playback through a command-line player."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self._process: Optional[subprocess.Popen] = None
+
+    def play(self, path: Path):
+        self._process = subprocess.Popen(
+            [self.command, str(path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def stop(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+
+
+# Command-line WAV players tried off Windows, in order (macOS, then Linux)
+PLAYER_COMMANDS = ("afplay", "paplay", "aplay")
+
+
+def _load_player():
+    """
+    Return a WAV player for this platform, or None if there is none.
+
+    Windows uses ``winsound``; elsewhere the first of PLAYER_COMMANDS found
+    on the PATH is run in a subprocess.
+    """
+    try:
+        return _WinsoundPlayer(importlib.import_module("winsound"))
+    except ImportError:
+        pass
+    for command in PLAYER_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return _CommandPlayer(path)
+    return None
+
+
+class SpeechRequest:
+    """A queued utterance and the future resolved when it finishes."""
+
+    __slots__ = ("text", "generation", "enqueued_at", "future", "cacheable")
+
+    def __init__(self, text: str, generation: int, cacheable: bool = False):
+        self.text = text
+        self.generation = generation
+        self.enqueued_at = time.perf_counter()
+        self.future: Future = Future()
+        self.cacheable = cacheable
+
+
+# Queue token that wakes the worker to render pending phrases
+_WAKE = object()
+
+
+class SpeechWorker:
+    """Long-lived speech thread that owns one pyttsx3 engine.
+
+    ``say()`` queues text and returns a future that resolves to True once
+    the text has been spoken, or False if it was skipped or cancelled.
+    ``cancel()`` stops the current utterance and drops everything queued;
+    ``supersede=True`` does the same before queueing new text, so a fresh
+    readout replaces a stale one.
+
+    With an ``AudioCache`` and a WAV player (see ``_load_player()``)
+    cacheable text is rendered once and then played from disk, and
+    ``prerender()`` fills the cache while the worker is otherwise idle.
+    Without a player, or if rendering fails, cacheable text is spoken live
+    and ``prerender()`` does nothing.
+    """
+
+    def __init__(
+        self,
+        rate: int = 150,
+        volume: float = 0.9,
+        audio_cache_dir=None,
+        engine_factory: Optional[Callable[[], Any]] = None,
+        player=None,
+    ):
+        """
+        Args:
+            rate: Speech rate in words per minute
+            volume: Speech volume from 0 to 1
+            audio_cache_dir: Directory for pre-rendered phrases (None
+                disables the audio cache)
+            engine_factory: Creates the speech engine on the worker thread
+                (defaults to ``pyttsx3.init``)
+            player: WAV player with ``play(path)`` and ``stop()`` (defaults
+                to the platform's, see ``_load_player()``)
+        """
+        self.rate = rate
+        self.volume = volume
+        self.engine_factory = engine_factory
+        self.audio_cache_dir = audio_cache_dir
+        self.audio_cache: Optional[AudioCache] = None
+        self._player = None
+        if audio_cache_dir:
+            self._player = player if player is not None else _load_player()
+        self._pending_renders = deque()
+        self._queue: "queue.Queue[Optional[SpeechRequest]]" = queue.Queue()
+        self._generation = 0
+        self._current: Optional[SpeechRequest] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.spoken = 0
+        self.skipped = 0
+        self.first_audio_times: List[float] = []
+
+    def start(self):
+        """Start the speech thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="speech-worker", daemon=True
+                )
+                self._thread.start()
+
+    def say(self, text: str, supersede: bool = False, cache: bool = False) -> Future:
+        """
+        Queue text to be spoken.
+
+        Args:
+            text: Text to speak
+            supersede: Cancel the current and queued utterances first
+            cache: Play from (and add to) the audio cache when possible
+
+        Returns:
+            Future resolved with True when spoken, False if skipped
+        """
+        self.start()
+        if supersede:
+            self.cancel()
+        with self._lock:
+            request = SpeechRequest(text, self._generation, cacheable=cache)
+        self._queue.put(request)
+        return request.future
+
+    def prerender(self, phrases: Iterable[str]):
+        """Render phrases into the audio cache in the background."""
+        if not self.audio_cache_dir or self._player is None:
+            return
+        self.start()
+        self._pending_renders.extend(phrases)
+        self._queue.put(_WAKE)
+
+    def cancel(self):
+        """Stop the current utterance and skip everything already queued."""
+        with self._lock:
+            self._generation += 1
+
+    def _is_stale(self, request: SpeechRequest) -> bool:
+        """Return True if a request was queued before the last cancel."""
+        return request.generation < self._generation
+
+    def _finish(self, request: SpeechRequest, spoken: bool):
+        """Resolve a request's future and update counters."""
+        if spoken:
+            self.spoken += 1
+        else:
+            self.skipped += 1
+        if not request.future.done():
+            request.future.set_result(spoken)
+
+    def _run(self):
+        """Thread body: own one engine and speak requests in order."""
+        pythoncom = None
+        try:
+            if self.engine_factory is not None:
+                engine = self.engine_factory()
+            else:
+                stack = load()
+                pythoncom = stack.pythoncom
+                if pythoncom:
+                    pythoncom.CoInitialize()
+                engine = stack.pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+        except Exception as e:
+            print(f"TTS Error: {e}")
+            engine = None
+
+        if engine is not None and self.audio_cache_dir:
+            self.audio_cache = AudioCache(
+                self.audio_cache_dir,
+                voice_id=str(engine.getProperty('voice')),
+                rate=self.rate,
+            )
+
+        def on_start(name):
+            request = self._current
+            if request is not None:
+                self._record_first_audio(request)
+
+        def on_word(name, location, length):
+            request = self._current
+            if request is not None and self._is_stale(request):
+                engine.stop()
+
+        if engine is not None:
+            engine.connect('started-utterance', on_start)
+            engine.connect('started-word', on_word)
+
+        try:
+            while True:
+                try:
+                    # Only block when there is no background rendering to do
+                    request = self._queue.get(block=not self._pending_renders)
+                except queue.Empty:
+                    self._render_pending(engine)
+                    continue
+                if request is None:
+                    break
+                if request is _WAKE:
+                    continue
+                if engine is None or self._is_stale(request):
+                    self._finish(request, False)
+                    continue
+
+                try:
+                    if request.cacheable and self._play_cached(engine, request):
+                        self._finish(request, not self._is_stale(request))
+                        continue
+
+                    self._current = request
+                    engine.say(request.text)
+                    engine.runAndWait()
+                    self._finish(request, not self._is_stale(request))
+                except Exception as e:
+                    print(f"TTS Error: {e}")
+                    self._finish(request, False)
+                finally:
+                    self._current = None
+        finally:
+            # Release anything still waiting
+            while not self._queue.empty():
+                request = self._queue.get_nowait()
+                if isinstance(request, SpeechRequest):
+                    self._finish(request, False)
+            if engine is not None:
+                engine.stop()
+            if pythoncom:
+                pythoncom.CoUninitialize()
+
+    def _record_first_audio(self, request: SpeechRequest):
+        """Record the delay between queueing a request and hearing it."""
+        self.first_audio_times.append(time.perf_counter() - request.enqueued_at)
+
+    def _render_pending(self, engine):
+        """Render one pending phrase into the audio cache."""
+        text = self._pending_renders.popleft()
+        if engine is not None and self.audio_cache is not None:
+            if self.audio_cache.get(text) is None:
+                self.audio_cache.render(engine, text)
+
+    def _play_cached(self, engine, request: SpeechRequest) -> bool:
+        """
+        Play a request from the audio cache, rendering it on first use.
+
+        Returns:
+            True if the request was handled by WAV playback
+        """
+        if self.audio_cache is None or self._player is None:
+            return False
+
+        path = self.audio_cache.get(request.text)
+        if path is None:
+            path = self.audio_cache.render(engine, request.text)
+            if path is None:
+                return False
+
+        try:
+            self._player.play(path)
+        except OSError as e:
+            print(f"Audio playback error: {e}")
+            return False  # speak it live instead
+        self._record_first_audio(request)
+
+        # Wait for playback to end, stopping early if superseded
+        deadline = time.perf_counter() + _wav_duration(path)
+        while time.perf_counter() < deadline:
+            if self._is_stale(request):
+                self._player.stop()
+                break
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout: float = 2.0):
+        """Stop the speech thread."""
+        self.cancel()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def metrics(self) -> Dict:
+        """Return speech metrics (time-to-first-audio in seconds)."""
+        times = self.first_audio_times
+        return {
+            "spoken": self.spoken,
+            "skipped": self.skipped,
+            "queued": self._queue.qsize(),
+            "audio_cache_hits": self.audio_cache.hits if self.audio_cache else 0,
+            "audio_cache_renders": self.audio_cache.renders if self.audio_cache else 0,
+            "last_time_to_first_audio": times[-1] if times else None,
+            "average_time_to_first_audio": sum(times) / len(times) if times else None,
+        }
+
+
+def _resolve(future: asyncio.Future, value: bool):
+    """Set a future's result unless it is already done."""
+    if not future.done():
+        future.set_result(value)
+
+
+class SpeechQueue:
+    """Bounded, priority-aware queue of messages waiting to be spoken.
+
+    Each message has a kind. Kinds with a lower priority number are spoken
+    first (alerts before routine readouts) and messages of equal priority
+    keep their arrival order. A new message replaces a queued message of
+    the same kind, so rapid searches never build a backlog of outdated
+    readouts. When the queue is full the least important message is
+    dropped.
+
+    ``put()`` returns a future that resolves once the message has been
+    spoken (True) or dropped (False), so callers can sequence on the
+    speech itself instead of guessing how long it takes.
+    """
+
+    PRIORITIES = {
+        "alert": 0,
+        "error": 1,
+        "prompt": 1,
+        "readout": 2,
+    }
+
+    def __init__(self, maxsize: int = 4):
+        self.maxsize = max(1, maxsize)
+        self._items: List[Tuple[int, int, str, str, asyncio.Future]] = []
+        self._seq = 0
+        self._available = asyncio.Event()
+
+        # Backpressure metrics
+        self.enqueued = 0
+        self.replaced = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, text: str, kind: str = "readout") -> asyncio.Future:
+        """
+        Queue a message without blocking.
+
+        Args:
+            text: Text to speak
+            kind: Message kind (see PRIORITIES); unknown kinds are routine
+
+        Returns:
+            Future resolved with True when spoken, False if dropped
+        """
+        priority = self.PRIORITIES.get(kind, self.PRIORITIES["readout"])
+        self.enqueued += 1
+
+        # Newer messages of the same kind replace older ones
+        kept = []
+        for item in self._items:
+            if item[2] == kind:
+                _resolve(item[4], False)
+                self.replaced += 1
+            else:
+                kept.append(item)
+        self._items = kept
+
+        self._seq += 1
+        done = asyncio.get_running_loop().create_future()
+        self._items.append((priority, self._seq, kind, text, done))
+
+        if len(self._items) > self.maxsize:
+            # Drop the least important, oldest message
+            victim = max(self._items, key=lambda item: (item[0], -item[1]))
+            self._items.remove(victim)
+            _resolve(victim[4], False)
+            self.dropped += 1
+
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._available.set()
+        return done
+
+    async def get(self) -> Tuple[str, str, asyncio.Future]:
+        """
+        Wait for the most important queued message.
+
+        Returns:
+            Tuple of (kind, text, done); the consumer resolves ``done``
+            with whether the message was actually spoken
+        """
+        while not self._items:
+            self._available.clear()
+            await self._available.wait()
+
+        item = min(self._items)
+        self._items.remove(item)
+        return item[2], item[3], item[4]
+
+    def clear(self) -> int:
+        """Drop every queued message and return how many were dropped."""
+        count = len(self._items)
+        for item in self._items:
+            _resolve(item[4], False)
+        self._items.clear()
+        self.dropped += count
+        return count
+
+    def qsize(self) -> int:
+        """Return the number of queued messages."""
+        return len(self._items)
+
+    def metrics(self) -> Dict:
+        """Return queue depth and drop counters."""
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "replaced": self.replaced,
+            "dropped": self.dropped,
+        }
+
+
+class LatencyTrace:
+    """Per-stage timing of one voice search.
+
+    Call ``mark(stage)`` as each stage finishes; the time since the
+    previous mark is attributed to that stage.
+    """
+
+    def __init__(
+        self,
+        name: str = "voice search",
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.name = name
+        self.clock = clock
+        self.started_at = clock()
+        self._last = self.started_at
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str) -> float:
+        """Close a stage and return its duration in seconds."""
+        now = self.clock()
+        duration = now - self._last
+        self.stages.append((stage, duration))
+        self._last = now
+        return duration
+
+    @property
+    def total(self) -> float:
+        """Seconds from the start of the trace to the last mark."""
+        return self._last - self.started_at
+
+    def metrics(self) -> Dict:
+        """Return stage durations in milliseconds."""
+        stages = {stage: duration * 1000 for stage, duration in self.stages}
+        stages["total"] = self.total * 1000
+        return stages
+
+    def report(self) -> str:
+        """Format the trace as one line per stage."""
+        lines = [f"{self.name} latency:"]
+        for stage, duration in self.stages:
+            lines.append(f"  {stage:<12} {duration * 1000:8.1f} ms")
+        lines.append(f"  {'total':<12} {self.total * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,202 @@
+# watchlist.py
+"""Watchlist loading and background refresh scheduling."""
+
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from weather_service import WeatherService, WeatherServiceError
+
+
+def load_watchlist(path) -> List[str]:
+    """
+    Load watched city names from a JSON list.
+
+    Args:
+        path: Path to the watchlist file
+
+    Returns:
+        City names in file order, without blanks or duplicates
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    try:
+        with open(path, 'r') as f:
+            raw = json.load(f)
+    except Exception as e:
+        print(f"Error loading watchlist: {e}")
+        return []
+
+    cities = []
+    seen = set()
+    for item in raw if isinstance(raw, list) else []:
+        city = " ".join(str(item).split())
+        if city and city.casefold() not in seen:
+            seen.add(city.casefold())
+            cities.append(city)
+    return cities
+
+
+def weather_signature(data: Dict) -> Tuple:
+    """Return the fields a watchlist card shows, for change detection."""
+    main = data.get("main", {})
+    weather = data.get("weather", [{}])[0]
+    return (
+        data.get("name"),
+        main.get("temp"),
+        main.get("feels_like"),
+        main.get("humidity"),
+        data.get("wind", {}).get("speed"),
+        weather.get("main"),
+        weather.get("description"),
+        weather.get("icon"),
+    )
+
+
+class WatchlistEntry:
+    """Refresh state for one watched city."""
+
+    __slots__ = ("city", "data", "signature", "failures", "next_due", "error")
+
+    def __init__(self, city: str):
+        self.city = city
+        self.data: Optional[Dict] = None
+        self.signature: Optional[Tuple] = None
+        self.failures = 0
+        self.next_due = 0.0
+        self.error: Optional[WeatherServiceError] = None
+
+
+class WatchlistScheduler:
+    """Periodically refresh watched cities and report only real changes.
+
+    Each city keeps its own due time. Successful refreshes are rescheduled
+    after a jittered interval so a large watchlist does not hit the API in
+    lock-step; failures back off exponentially up to ``max_backoff``.
+    ``on_change`` is called once per refresh pass with the cities whose
+    displayed data actually changed, including cities that recovered from
+    an error (so their error state can be cleared).
+    """
+
+    def __init__(
+        self,
+        service: WeatherService,
+        cities: List[str],
+        on_change: Callable[[List[WatchlistEntry]], None],
+        on_error: Optional[Callable[[WatchlistEntry], None]] = None,
+        interval: float = Config.WATCHLIST_REFRESH_INTERVAL,
+        jitter: float = Config.WATCHLIST_JITTER,
+        max_backoff: float = Config.WATCHLIST_MAX_BACKOFF,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.service = service
+        self.entries: Dict[str, WatchlistEntry] = {
+            city: WatchlistEntry(city) for city in cities
+        }
+        self.on_change = on_change
+        self.on_error = on_error
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.rng = rng
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def _jittered(self, delay: float) -> float:
+        """Spread a delay by +/- jitter."""
+        return delay * (1 + self.jitter * (2 * self.rng() - 1))
+
+    def _backoff(self, failures: int) -> float:
+        """Return the retry delay after consecutive failures."""
+        base = min(self.interval, 30.0)
+        return min(self.max_backoff, base * (2 ** (failures - 1)))
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Return cities whose refresh is due."""
+        now = self.clock() if now is None else now
+        return [city for city, entry in self.entries.items() if entry.next_due <= now]
+
+    async def refresh_due(self) -> List[WatchlistEntry]:
+        """
+        Refresh every due city in one batch.
+
+        Returns:
+            Entries whose displayed weather changed or that recovered
+        """
+        cities = self.due()
+        if not cities:
+            return []
+
+        changed = []
+        async for result in self.service.iter_weather_many(cities, force_refresh=True):
+            entry = self.entries[result.city]
+            now = self.clock()
+            if result.ok:
+                recovered = entry.error is not None
+                entry.failures = 0
+                entry.error = None
+                entry.next_due = now + self._jittered(self.interval)
+                signature = weather_signature(result.data)
+                entry.data = result.data
+                if signature != entry.signature or recovered:
+                    entry.signature = signature
+                    changed.append(entry)
+            else:
+                entry.failures += 1
+                entry.error = result.error
+                entry.next_due = now + self._jittered(self._backoff(entry.failures))
+                if self.on_error:
+                    self.on_error(entry)
+
+        if changed:
+            self.on_change(changed)
+        return changed
+
+    def next_wakeup(self) -> float:
+        """Return seconds until the next city is due."""
+        if not self.entries:
+            return self.interval
+        soonest = min(entry.next_due for entry in self.entries.values())
+        return max(0.0, soonest - self.clock())
+
+    async def run(self):
+        """Refresh due cities forever, sleeping until the next one is due."""
+        while True:
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                print(f"Watchlist refresh error: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.next_wakeup())
+            except asyncio.TimeoutError:
+                pass
+
+    def refresh_now(self):
+        """Mark every city due and wake the scheduler."""
+        for entry in self.entries.values():
+            entry.next_due = 0.0
+        self._wakeup.set()
+
+    def start(self):
+        """Start the refresh loop as a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        """Cancel the refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,9 +1,19 @@
 # weather_service.py
 """Weather API service layer."""
 
+import asyncio
+import importlib.util
+import time
 import httpx
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import (
+    AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+)
 from config import Config
+from disk_cache import DiskCache
+from geocode import GeocodeCache, Place, place_key
+from rate_limiter import RateLimiter, RateLimitTimeout
+from resilience import CircuitBreaker, RetryPolicy
 
 
 class WeatherServiceError(Exception):
@@ -11,90 +21,349 @@ class WeatherServiceError(Exception):
     pass
 
 
+class NotFoundError(WeatherServiceError):
+    """The weather service has no data for the requested place (404)."""
+    pass
+
+
+class UpstreamUnavailableError(WeatherServiceError):
+    """Transient upstream failure (timeout, network error, 5xx or 429)."""
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised without contacting upstream while the circuit breaker is open."""
+    pass
+
+
+class RateLimitedError(UpstreamUnavailableError):
+    """Raised when the client-side rate limiter cannot grant a request in time."""
+    pass
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one city in a batch lookup."""
+
+    index: int
+    city: str
+    data: Optional[Dict]
+    error: Optional[WeatherServiceError]
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the lookup succeeded."""
+        return self.error is None
+
+
+class CacheEntry:
+    """A cached API response with its fetch time."""
+
+    __slots__ = ("data", "fetched_at")
+
+    def __init__(self, data: Dict, fetched_at: float):
+        self.data = data
+        self.fetched_at = fetched_at
+
+    def age(self, now: float) -> float:
+        """Return the entry age in seconds."""
+        return now - self.fetched_at
+
+
+class ResponseCache:
+    """Bounded LRU cache of weather responses with per-entry TTL.
+
+    Entries younger than ``ttl`` are fresh. Older entries are stale but
+    may still be returned (for stale-while-revalidate) until they reach
+    ``max_stale`` seconds, after which they are dropped.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = Config.CACHE_MAX_ENTRIES,
+        ttl: float = Config.CACHE_TTL,
+        max_stale: float = Config.CACHE_MAX_STALE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def city_key(city: str, units: str) -> Tuple:
+        """Build a cache key from a city name (case/accent/space insensitive)."""
+        return ("city", place_key(city), units)
+
+    @staticmethod
+    def coord_key(lat: float, lon: float, units: str) -> Tuple:
+        """Build a cache key from coordinates rounded to ~1 km."""
+        return ("coord", round(float(lat), 2), round(float(lon), 2), units)
+
+    def get(self, key: Tuple, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Look up a cached entry.
+
+        Args:
+            key: Cache key
+            allow_stale: Return entries past their TTL (but within max_stale)
+
+        Returns:
+            The cache entry, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        age = entry.age(self.clock())
+        if age >= self.max_stale:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        if age >= self.ttl and not allow_stale:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if age >= self.ttl:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def peek(self, key: Tuple) -> Optional[CacheEntry]:
+        """Return an entry regardless of age, without touching counters."""
+        return self._entries.get(key)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Return True if the entry is still within its TTL."""
+        return entry.age(self.clock()) < self.ttl
+
+    def set(self, key: Tuple, data: Dict, age: float = 0.0):
+        """Store a response, evicting the least recently used entries."""
+        self._entries[key] = CacheEntry(data, self.clock() - age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Return cache counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
-    
-    def __init__(self):
-        self.api_key = Config.API_KEY
-        self.base_url = Config.BASE_URL
-        self.timeout = Config.TIMEOUT
-    
-    async def get_weather(self, city: str) -> Dict:
+    """Service for fetching weather data from OpenWeatherMap API.
+
+    A single pooled ``httpx.AsyncClient`` is shared by every lookup so
+    repeated searches reuse open connections instead of paying a new
+    TCP/TLS handshake each time. Close the service with ``aclose()`` or
+    use it as an async context manager.
+
+    Responses are kept in a ``ResponseCache``. With stale-while-revalidate
+    enabled, an expired entry is returned immediately while a background
+    task refreshes it. An optional ``DiskCache`` keeps raw payloads across
+    restarts and backs the in-memory cache on a miss.
+
+    Concurrent lookups for the same key are coalesced: only the first
+    caller goes upstream and the rest await its result.
+
+    Transient failures are retried according to a ``RetryPolicy``. A
+    ``CircuitBreaker`` stops sending requests after repeated failures;
+    while upstream is unavailable the last cached response is served.
+
+    Every upstream attempt first takes a token from a ``RateLimiter`` so
+    the shared API key stays under its quota.
+
+    The coordinates of every place searched by name are kept in a
+    ``GeocodeCache``; repeat searches resolve locally and use the
+    coordinate endpoint, so different spellings of one place share a
+    cache entry.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        units: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[ResponseCache] = None,
+        stale_while_revalidate: Optional[bool] = None,
+        disk_cache: Optional[DiskCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        geocode_cache: Optional[GeocodeCache] = None,
+    ):
+        # Per-instance overrides fall back to the shared lazy Config
+        self.api_key = Config.API_KEY if api_key is None else api_key
+        self.base_url = Config.BASE_URL if base_url is None else base_url
+        self.units = Config.UNITS if units is None else units
+        self.timeout = Config.TIMEOUT if timeout is None else timeout
+
+        # Connection pool settings (fall back to Config defaults)
+        self.limits = httpx.Limits(
+            max_connections=(
+                max_connections if max_connections is not None
+                else Config.MAX_CONNECTIONS
+            ),
+            max_keepalive_connections=(
+                max_keepalive_connections if max_keepalive_connections is not None
+                else Config.MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=(
+                keepalive_expiry if keepalive_expiry is not None
+                else Config.KEEPALIVE_EXPIRY
+            ),
+        )
+        self.http2 = Config.HTTP2 if http2 is None else http2
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            # httpx needs the optional h2 package for HTTP/2
+            print("HTTP/2 requested but the 'h2' package is not installed "
+                  "(pip install 'httpx[http2]'); using HTTP/1.1")
+            self.http2 = False
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Response cache
+        self.cache = cache if cache is not None else ResponseCache()
+        self.stale_while_revalidate = (
+            Config.CACHE_STALE_WHILE_REVALIDATE
+            if stale_while_revalidate is None else stale_while_revalidate
+        )
+        self.disk_cache = disk_cache
+        self.geocode = (
+            geocode_cache if geocode_cache is not None else GeocodeCache(disk_cache)
+        )
+
+        # In-flight requests shared by concurrent callers (single-flight)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.coalesced_requests = 0
+
+        # Failure handling
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        )
+        self.retries = 0
+        self.fallback_responses = 0
+        self._sleep = asyncio.sleep
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None else RateLimiter.from_config()
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client and release pooled connections."""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        self._inflight.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+            self.disk_cache = None
+        self.rate_limiter.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def get_weather(self, city: str, force_refresh: bool = False) -> Dict:
         """
         Fetch weather data for a given city.
-        
+
         Args:
             city: Name of the city
-            
+            force_refresh: Skip cached responses and go upstream
+
         Returns:
             Dictionary containing weather data
-            
+
         Raises:
             WeatherServiceError: If the request fails
         """
         if not city:
             raise WeatherServiceError("City name cannot be empty")
-        
+
+        # Places searched before resolve locally to coordinates
+        place = self.geocode.get(city)
+        if place is not None:
+            data = await self.get_weather_by_coordinates(
+                place.lat, place.lon, force_refresh=force_refresh
+            )
+            return self._with_place_name(data, place)
+
         # Build request parameters
         params = {
             "q": city,
             "appid": self.api_key,
-            "units": Config.UNITS,
+            "units": self.units,
         }
-        
-        try:
-            # Make async HTTP request
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                
-                # Check for HTTP errors
-                if response.status_code == 404:
-                    raise WeatherServiceError(
-                        f"City '{city}' not found. Please check the spelling."
-                    )
-                elif response.status_code == 401:
-                    raise WeatherServiceError(
-                        "Invalid API key. Please check your configuration."
-                    )
-                elif response.status_code >= 500:
-                    raise WeatherServiceError(
-                        "Weather service is currently unavailable. "
-                        "Please try again later."
-                    )
-                elif response.status_code != 200:
-                    raise WeatherServiceError(
-                        f"Error fetching weather data: {response.status_code}"
-                    )
-                
-                # Parse JSON response
-                data = response.json()
-                return data
-                
-        except httpx.TimeoutException:
-            raise WeatherServiceError(
-                "Request timed out. Please check your internet connection."
-            )
-        except httpx.NetworkError:
-            raise WeatherServiceError(
-                "Network error. Please check your internet connection."
-            )
-        except httpx.HTTPError as e:
-            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
-        except Exception as e:
-            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
-    
+
+        key = ResponseCache.city_key(city, self.units)
+        data = await self._cached_request(
+            key,
+            params,
+            not_found_message=f"City '{city}' not found. Please check the spelling.",
+            force_refresh=force_refresh,
+        )
+        await self._remember_place(city, key, data)
+        return data
+
     async def get_weather_by_coordinates(
-        self, 
-        lat: float, 
-        lon: float
+        self,
+        lat: float,
+        lon: float,
+        force_refresh: bool = False,
     ) -> Dict:
         """
         Fetch weather data by coordinates.
-        
+
         Args:
             lat: Latitude
             lon: Longitude
-            
+            force_refresh: Skip cached responses and go upstream
+
         Returns:
             Dictionary containing weather data
         """
@@ -102,14 +371,396 @@ class WeatherService:
             "lat": lat,
             "lon": lon,
             "appid": self.api_key,
-            "units": Config.UNITS,
+            "units": self.units,
         }
-        
+
+        return await self._cached_request(
+            ResponseCache.coord_key(lat, lon, self.units),
+            params,
+            not_found_message=f"No weather data found for ({lat}, {lon}).",
+            force_refresh=force_refresh,
+        )
+
+    async def get_weather_many(
+        self,
+        cities: Iterable[str],
+        concurrency: Optional[int] = None,
+        force_refresh: bool = False,
+    ) -> List[BatchResult]:
+        """
+        Fetch weather for several cities concurrently.
+
+        Args:
+            cities: City names to look up
+            concurrency: Maximum simultaneous requests
+                (defaults to Config.BATCH_CONCURRENCY)
+            force_refresh: Skip cached responses and go upstream
+
+        Returns:
+            One BatchResult per city, in input order. Failed lookups carry
+            their WeatherServiceError instead of raising.
+        """
+        results = [
+            result async for result in
+            self.iter_weather_many(cities, concurrency, force_refresh)
+        ]
+        results.sort(key=lambda result: result.index)
+        return results
+
+    async def iter_weather_many(
+        self,
+        cities: Iterable[str],
+        concurrency: Optional[int] = None,
+        force_refresh: bool = False,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Fetch weather for several cities, yielding results as they complete.
+
+        Args:
+            cities: City names to look up
+            concurrency: Maximum simultaneous requests
+                (defaults to Config.BATCH_CONCURRENCY)
+            force_refresh: Skip cached responses and go upstream
+
+        Yields:
+            BatchResult for each city in completion order
+        """
+        semaphore = asyncio.Semaphore(concurrency or Config.BATCH_CONCURRENCY)
+
+        async def fetch(index: int, city: str) -> BatchResult:
+            async with semaphore:
+                try:
+                    data = await self.get_weather(city, force_refresh=force_refresh)
+                    return BatchResult(index, city, data, None)
+                except WeatherServiceError as e:
+                    return BatchResult(index, city, None, e)
+
+        tasks = [
+            asyncio.ensure_future(fetch(index, city))
+            for index, city in enumerate(cities)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding lookups if the caller stops iterating early
+            for task in tasks:
+                task.cancel()
+
+    async def _cached_request(
+        self,
+        key: Tuple,
+        params: Dict,
+        not_found_message: str,
+        force_refresh: bool = False,
+    ) -> Dict:
+        """
+        Serve a request from the cache, fetching on a miss.
+
+        Args:
+            key: Cache key for the request
+            params: Query parameters for the weather endpoint
+            not_found_message: Error message to use for a 404 response
+            force_refresh: Skip cached responses and go upstream
+
+        Returns:
+            Dictionary containing weather data
+        """
+        if not force_refresh:
+            entry = self.cache.get(key, allow_stale=self.stale_while_revalidate)
+            if entry is not None:
+                if not self.cache.is_fresh(entry):
+                    self._schedule_refresh(key, params, not_found_message)
+                return entry.data
+
+        task = self._single_flight(
+            key, lambda: self._load(key, params, not_found_message, force_refresh)
+        )
+        return await asyncio.shield(task)
+
+    def _single_flight(self, key: Tuple, factory: Callable) -> asyncio.Task:
+        """
+        Return the in-flight task for a key, starting one if needed.
+
+        Args:
+            key: Cache key for the request
+            factory: Zero-argument callable returning the coroutine to run
+
+        Returns:
+            Task shared by every caller for this key
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+            return task
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+
+        def release(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(release)
+        return task
+
+    async def _load(
+        self,
+        key: Tuple,
+        params: Dict,
+        not_found_message: str,
+        force_refresh: bool = False,
+    ) -> Dict:
+        """Load a response from the disk cache or the network."""
+        # Fall back to the persistent cache before going to the network
+        if self.disk_cache is not None and not force_refresh:
+            stored = await asyncio.to_thread(self.disk_cache.get, key)
+            if stored is not None:
+                data, fetched_at = stored
+                age = max(0.0, time.time() - fetched_at)
+                if age < self.cache.ttl:
+                    self.cache.set(key, data, age=age)
+                    return data
+
+        try:
+            data = await self._request(params, not_found_message)
+        except UpstreamUnavailableError:
+            # Serve the last cached response while upstream is down
+            fallback = await self._fallback(key)
+            if fallback is None:
+                raise
+            self.fallback_responses += 1
+            return fallback
+
+        await self._store(key, data)
+        return data
+
+    async def _fallback(self, key: Tuple) -> Optional[Dict]:
+        """Return the newest cached payload for a key, however old."""
+        entry = self.cache.peek(key)
+        if entry is not None:
+            return entry.data
+        if self.disk_cache is not None:
+            stored = await asyncio.to_thread(self.disk_cache.get, key)
+            if stored is not None:
+                return stored[0]
+        return None
+
+    async def _store(self, key: Tuple, data: Dict):
+        """Save a fresh response in the memory and disk caches."""
+        self.cache.set(key, data)
+        if self.disk_cache is not None:
+            try:
+                await asyncio.to_thread(self.disk_cache.put, key, data)
+            except Exception as e:
+                print(f"Error writing disk cache: {e}")
+
+    async def _remember_place(self, city: str, key: Tuple, data: Dict):
+        """Record where a city query resolved and seed its coordinate entry."""
+        entries = self.geocode.record(city, data)
+        if not entries:
+            return
+
+        place = entries[0][1]
+        coord_key = ResponseCache.coord_key(place.lat, place.lon, self.units)
+        if self.cache.peek(coord_key) is None:
+            entry = self.cache.peek(key)
+            age = entry.age(self.cache.clock()) if entry is not None else 0.0
+            self.cache.set(coord_key, data, age=age)
+        else:
+            age = None
+
+        try:
+            await asyncio.to_thread(self.geocode.save, entries)
+            if self.disk_cache is not None and age is not None:
+                await asyncio.to_thread(
+                    self.disk_cache.put, coord_key, data, time.time() - age
+                )
+        except Exception as e:
+            print(f"Error writing geocode cache: {e}")
+
+    @staticmethod
+    def _with_place_name(data: Dict, place: Place) -> Dict:
+        """Report the searched place's name for a coordinate response."""
+        if data.get("name") == place.name:
+            return data
+        return dict(data, name=place.name)
+
+    def get_last_known(self, city: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Return the last stored payload for a city without any network call.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            Tuple of (weather data, fetch time as a Unix timestamp) or None
+        """
+        if self.disk_cache is None or not city:
+            return None
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                return response.json()
-                
+            place = self.geocode.get(city)
+            if place is not None:
+                key = ResponseCache.coord_key(place.lat, place.lon, self.units)
+                stored = self.disk_cache.get(key)
+                if stored is not None:
+                    return self._with_place_name(stored[0], place), stored[1]
+            return self.disk_cache.last_known(city)
         except Exception as e:
-            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
\ No newline at end of file
+            print(f"Error reading disk cache: {e}")
+            return None
+
+    def _schedule_refresh(self, key: Tuple, params: Dict, not_found_message: str):
+        """Refresh a stale cache entry in the background (once per key)."""
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            data = await self._request(params, not_found_message)
+            await self._store(key, data)
+            return data
+
+        def report(task):
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Background refresh failed: {task.exception()}")
+
+        self._single_flight(key, refresh).add_done_callback(report)
+
+    async def _request(self, params: Dict, not_found_message: str) -> Dict:
+        """
+        Send a request through the shared client, retrying transient failures.
+
+        Args:
+            params: Query parameters for the weather endpoint
+            not_found_message: Error message to use for a 404 response
+
+        Returns:
+            Dictionary containing weather data
+
+        Raises:
+            RateLimitedError: If no rate limit token is available in time
+            CircuitOpenError: If the circuit breaker rejects the request
+            UpstreamUnavailableError: If retries are exhausted
+            WeatherServiceError: If the request fails otherwise
+        """
+        if not self.api_key:
+            raise WeatherServiceError(
+                "OPENWEATHER_API_KEY not found. "
+                "Please create a .env file with your API key."
+            )
+
+        attempt = 0
+        while True:
+            attempt += 1
+            # Fail fast before queueing for (and spending) a rate limit token
+            permit = self.circuit_breaker.allow()
+            if permit is None:
+                raise CircuitOpenError(
+                    "Weather service is temporarily unavailable. "
+                    "Please try again later."
+                )
+
+            retry_after = None
+            try:
+                try:
+                    await self.rate_limiter.acquire()
+                except RateLimitTimeout:
+                    raise RateLimitedError(
+                        "Too many weather requests right now. "
+                        "Please try again shortly."
+                    )
+
+                try:
+                    response = await self.client.get(self.base_url, params=params)
+                except httpx.TimeoutException:
+                    error = UpstreamUnavailableError(
+                        "Request timed out. Please check your internet connection."
+                    )
+                except httpx.NetworkError:
+                    error = UpstreamUnavailableError(
+                        "Network error. Please check your internet connection."
+                    )
+                except httpx.HTTPError as e:
+                    raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
+                except Exception as e:
+                    raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
+                else:
+                    if not self.retry_policy.should_retry_status(response.status_code):
+                        try:
+                            data = self._parse_response(response, not_found_message)
+                        except UpstreamUnavailableError:
+                            self.circuit_breaker.record_failure()
+                            raise
+                        except WeatherServiceError:
+                            # A definitive answer (404, 401, ...): upstream is up
+                            self.circuit_breaker.record_success()
+                            raise
+                        self.circuit_breaker.record_success()
+                        return data
+
+                    error = self._status_error(response.status_code)
+                    retry_after = RetryPolicy.parse_retry_after(
+                        response.headers.get("Retry-After")
+                    )
+
+                self.circuit_breaker.record_failure()
+            finally:
+                # A trial that ended without an outcome (no rate limit token,
+                # cancelled, client error) must not keep the breaker half-open
+                self.circuit_breaker.release(permit)
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if delay is None:
+                raise error
+            self.retries += 1
+            await self._sleep(delay)
+
+    def _parse_response(self, response: httpx.Response, not_found_message: str) -> Dict:
+        """
+        Map an HTTP response to weather data or an error.
+
+        Args:
+            response: Response from the weather endpoint
+            not_found_message: Error message to use for a 404 response
+
+        Returns:
+            Dictionary containing weather data
+
+        Raises:
+            WeatherServiceError: If the response is not a success
+        """
+        # Check for HTTP errors
+        if response.status_code == 404:
+            raise NotFoundError(not_found_message)
+        elif response.status_code == 401:
+            raise WeatherServiceError(
+                "Invalid API key. Please check your configuration."
+            )
+        elif response.status_code >= 500 or response.status_code == 429:
+            raise self._status_error(response.status_code)
+        elif response.status_code != 200:
+            raise WeatherServiceError(
+                f"Error fetching weather data: {response.status_code}"
+            )
+
+        # Parse JSON response
+        try:
+            return response.json()
+        except Exception as e:
+            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
+
+    @staticmethod
+    def _status_error(status_code: int) -> WeatherServiceError:
+        """Build the error for a retryable status code."""
+        if status_code == 429:
+            return UpstreamUnavailableError(
+                "Too many requests to the weather service. "
+                "Please try again shortly."
+            )
+        if status_code >= 500:
+            return UpstreamUnavailableError(
+                "Weather service is currently unavailable. "
+                "Please try again later."
+            )
+        return WeatherServiceError(
+            f"Error fetching weather data: {status_code}"
+        )
@@ -1,6 +1,7 @@
 import flet as ft
 import re
 from database import update_contact_db, delete_contact_db, add_contact_db, get_all_contacts_db
+from update_scheduler import scheduler_for
 
 # ---------------- Validation Helpers ----------------
 def is_valid_phone(phone: str) -> bool:
@@ -12,6 +13,12 @@ def is_valid_email(email: str) -> bool:
     return bool(re.fullmatch(r"[^@]+@[^@]+\.[^@]+", email.strip()))
 
 
+# ---------------- Page Updates ----------------
+def request_update(page):
+    """Mark the page dirty; all requests in one frame send a single update."""
+    scheduler_for(page).mark_dirty()
+
+
 # ---------------- Contact Display ----------------
 def display_contacts(page, contacts_list_view, db_conn, search_term=""):
     """Fetches and displays all contacts in styled cards."""
@@ -71,7 +78,7 @@ def display_contacts(page, contacts_list_view, db_conn, search_term=""):
 
         contacts_list_view.controls.append(contact_card)
 
-    page.update()
+    request_update(page)
 
 
 # ---------------- Add Contact ----------------
@@ -81,31 +88,31 @@ def add_contact(page, inputs, contacts_list_view, db_conn):
     # --- Validation ---
     if not name_input.value.strip():
         name_input.error_text = "Name cannot be empty"
-        page.update()
+        request_update(page)
         return
 
     if phone_input.value and not is_valid_phone(phone_input.value):
         phone_input.error_text = "Invalid phone number"
-        page.update()
+        request_update(page)
         return
 
     if email_input.value and not is_valid_email(email_input.value):
         email_input.error_text = "Invalid email address"
-        page.update()
+        request_update(page)
         return
 
     try:
         add_contact_db(db_conn, name_input.value.strip(), phone_input.value.strip(), email_input.value.strip())
     except ValueError as e:
         page.snack_bar = ft.SnackBar(ft.Text(str(e)), open=True)
-        page.update()
+        request_update(page)
         return
 
     for field in inputs:
         field.value, field.error_text = "", None
 
     display_contacts(page, contacts_list_view, db_conn)
-    page.update()
+    request_update(page)
 
 
 # ---------------- Delete with Confirmation ----------------
@@ -114,14 +121,14 @@ def confirm_delete(page, contact_id, db_conn, contacts_list_view):
         delete_contact_db(db_conn, contact_id)
         display_contacts(page, contacts_list_view, db_conn)
         dialog.open = False
-        page.update()
+        request_update(page)
 
     dialog = ft.AlertDialog(
         modal=True,
         title=ft.Text("Confirm Delete"),
         content=ft.Text("Are you sure you want to delete this contact?"),
         actions=[
-            ft.TextButton("Cancel", on_click=lambda e: setattr(dialog, 'open', False) or page.update()),
+            ft.TextButton("Cancel", on_click=lambda e: setattr(dialog, 'open', False) or request_update(page)),
             ft.TextButton("Delete", on_click=delete_and_close),
         ],
     )
@@ -139,22 +146,22 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view):
     def save_and_close(e):
         if not edit_name.value.strip():
             edit_name.error_text = "Name cannot be empty"
-            page.update()
+            request_update(page)
             return
 
         if edit_phone.value and not is_valid_phone(edit_phone.value):
             edit_phone.error_text = "Invalid phone number"
-            page.update()
+            request_update(page)
             return
 
         if edit_email.value and not is_valid_email(edit_email.value):
             edit_email.error_text = "Invalid email address"
-            page.update()
+            request_update(page)
             return
 
         update_contact_db(db_conn, contact_id, edit_name.value.strip(), edit_phone.value.strip(), edit_email.value.strip())
         dialog.open = False
-        page.update()
+        request_update(page)
         display_contacts(page, contacts_list_view, db_conn)
 
     dialog = ft.AlertDialog(
@@ -162,7 +169,7 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view):
         title=ft.Text("Edit Contact"),
         content=ft.Column([edit_name, edit_phone, edit_email]),
         actions=[
-            ft.TextButton("Cancel", on_click=lambda e: setattr(dialog, 'open', False) or page.update()),
+            ft.TextButton("Cancel", on_click=lambda e: setattr(dialog, 'open', False) or request_update(page)),
             ft.TextButton("Save", on_click=save_and_close),
         ],
     )
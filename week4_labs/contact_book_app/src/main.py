@@ -1,6 +1,6 @@
 import flet as ft
 from database import init_db
-from app_logic import display_contacts, add_contact
+from app_logic import display_contacts, add_contact, request_update
 
 def main(page: ft.Page):
     page.title = "Contact Book"
@@ -20,7 +20,7 @@ def main(page: ft.Page):
         else:
             page.theme_mode = ft.ThemeMode.LIGHT
             theme_btn.icon = ft.Icons.DARK_MODE    # 🌙 show moon when in light mode
-        page.update()
+        request_update(page)
 
     theme_btn = ft.IconButton(
         icon=ft.Icons.DARK_MODE,